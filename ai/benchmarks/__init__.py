@@ -0,0 +1,2 @@
+# Benchmarks
+# Latency benchmarks against local mock providers
@@ -0,0 +1,154 @@
+# feedback_ttft.py - Feedback Streaming Benchmark
+#
+# Time-to-first-token of streamed feedback against a local mock provider.
+
+"""
+Feedback TTFT Benchmark
+
+Compares how long a teacher waits before seeing feedback:
+- blocking: AIGrader.generate_feedback() returns the full completion
+- streaming: first "token" event of POST /analysis/feedback/stream
+
+The provider is a local mock of the OpenAI chat client with a configurable
+first-token latency and per-token delay, so results are reproducible and
+cost nothing. The SSE endpoint is driven through the ASGI interface
+directly, without a server or network in between.
+
+Usage (from the ai directory):
+    python -m benchmarks.feedback_ttft --tokens 150 --first-token-ms 300 --token-ms 30
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from types import SimpleNamespace
+from typing import List, Tuple
+
+from fastapi import FastAPI
+
+from homework_analysis.routes import get_grader, router
+
+
+class MockChatCompletions:
+    """Mimics openai.OpenAI().chat.completions with fixed token timing."""
+
+    def __init__(self, tokens: int, first_token_s: float, token_s: float):
+        self.tokens = tokens
+        self.first_token_s = first_token_s
+        self.token_s = token_s
+
+    def _words(self):
+        time.sleep(self.first_token_s)
+        for i in range(self.tokens):
+            if i:
+                time.sleep(self.token_s)
+            yield f"word{i} "
+
+    def create(self, model: str, messages: list, max_tokens: int = 0, stream: bool = False, **kwargs):
+        if not stream:
+            content = "".join(self._words())
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+        return _MockStream(
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=word))])
+            for word in self._words()
+        )
+
+
+class _MockStream:
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+
+    def __iter__(self):
+        return self._chunks
+
+    def close(self) -> None:
+        self._chunks.close()
+
+
+async def _stream_request(app: FastAPI, payload: dict) -> Tuple[float, float, int]:
+    """POST to the SSE endpoint over ASGI; returns (ttft, total, token events)."""
+    body = json.dumps(payload).encode()
+    finished = asyncio.Event()
+    sent_body = False
+    first_token = None
+    tokens = 0
+    start = time.perf_counter()
+
+    async def receive():
+        nonlocal sent_body
+        if not sent_body:
+            sent_body = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal first_token, tokens
+        if message["type"] == "http.response.body":
+            chunk = message.get("body", b"")
+            if b"event: token" in chunk:
+                tokens += chunk.count(b"event: token")
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+            if not message.get("more_body", False):
+                finished.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/analysis/feedback/stream",
+        "raw_path": b"/analysis/feedback/stream",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 0),
+        "server": ("127.0.0.1", 80),
+    }
+    await app(scope, receive, send)
+    return first_token or float("nan"), time.perf_counter() - start, tokens
+
+
+async def run(tokens: int, first_token_ms: float, token_ms: float, runs: int) -> None:
+    grader = get_grader()
+    grader.openai_client = SimpleNamespace(
+        chat=SimpleNamespace(completions=MockChatCompletions(tokens, first_token_ms / 1000, token_ms / 1000))
+    )
+    app = FastAPI()
+    app.include_router(router, prefix="/analysis")
+
+    payload = {"submission_text": "x = 3", "homework_description": "Solve 2x + 4 = 10", "grade": 90}
+    blocking: List[float] = []
+    streaming: List[Tuple[float, float, int]] = []
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        await grader.generate_feedback(payload["submission_text"], payload["homework_description"], payload["grade"])
+        blocking.append(time.perf_counter() - start)
+        streaming.append(await _stream_request(app, payload))
+
+    ttft = [r[0] for r in streaming]
+    total = [r[1] for r in streaming]
+    print(f"mock provider: {tokens} tokens, first token {first_token_ms:.0f} ms, {token_ms:.0f} ms/token, {runs} runs")
+    print(f"blocking  time to feedback : {statistics.median(blocking) * 1000:8.1f} ms (median)")
+    print(f"streaming time to 1st token: {statistics.median(ttft) * 1000:8.1f} ms (median)")
+    print(f"streaming total            : {statistics.median(total) * 1000:8.1f} ms (median), "
+          f"{streaming[-1][2]} token events")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tokens", type=int, default=150)
+    parser.add_argument("--first-token-ms", type=float, default=300)
+    parser.add_argument("--token-ms", type=float, default=30)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.tokens, args.first_token_ms, args.token_ms, args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,25 @@ Settings:
 - GOOGLE_VISION_API_KEY
 - TESSERACT_PATH
 - MODEL_CACHE_DIR
+- OCR_CACHE_ENABLED
+- OCR_CACHE_MAX_BYTES
+- MAX_DOWNLOAD_BYTES
+- OCR_PDF_CONCURRENCY
+- OCR_PROVIDER_TIMEOUT_SECONDS
+- OCR_HEDGE_ENABLED
+- PROVIDER_BREAKER_ERROR_RATE
+- TEXTBOOK_EXTRACT_WORKERS
+- TEXTBOOK_INDEX_DIR
+- EMBEDDING_BACKEND
+- EMBEDDING_MODEL
+- EMBEDDING_CACHE_ENABLED
+- VECTOR_INDEX_NPROBE
+- RELEVANCE_LOW_THRESHOLD
+- RELEVANCE_HIGH_THRESHOLD
+- GRADING_CONTEXT_CACHE_SIZE
+- SUMMARY_FAN_IN
+- SUMMARY_CONCURRENCY
+- SUMMARY_CACHE_MAX_BYTES
 """
 
 import os
@@ -30,6 +49,69 @@ TESSERACT_PATH = os.getenv("TESSERACT_PATH", "/usr/bin/tesseract")
 MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", "./models/cache")
 Path(MODEL_CACHE_DIR).mkdir(parents=True, exist_ok=True)
 
+# OCR Result Cache
+OCR_CACHE_ENABLED = os.getenv("OCR_CACHE_ENABLED", "true").lower() == "true"
+OCR_CACHE_MAX_BYTES = int(os.getenv("OCR_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# PDF Submission OCR
+OCR_PDF_CONCURRENCY = int(os.getenv("OCR_PDF_CONCURRENCY", "4"))
+OCR_PDF_MAX_PAGES = int(os.getenv("OCR_PDF_MAX_PAGES", "50"))
+OCR_PDF_RENDER_SCALE = float(os.getenv("OCR_PDF_RENDER_SCALE", "2.0"))
+
+# Vision Provider Resilience (per-provider circuit breakers, hedged OCR)
+OCR_PROVIDER_TIMEOUT_SECONDS = float(os.getenv("OCR_PROVIDER_TIMEOUT_SECONDS", "60"))
+OCR_HEDGE_ENABLED = os.getenv("OCR_HEDGE_ENABLED", "false").lower() == "true"
+OCR_HEDGE_MIN_DELAY_SECONDS = float(os.getenv("OCR_HEDGE_MIN_DELAY_SECONDS", "1.0"))
+OCR_HEDGE_DEFAULT_DELAY_SECONDS = float(os.getenv("OCR_HEDGE_DEFAULT_DELAY_SECONDS", "8.0"))
+PROVIDER_BREAKER_WINDOW = int(os.getenv("PROVIDER_BREAKER_WINDOW", "50"))
+PROVIDER_BREAKER_MIN_CALLS = int(os.getenv("PROVIDER_BREAKER_MIN_CALLS", "10"))
+PROVIDER_BREAKER_ERROR_RATE = float(os.getenv("PROVIDER_BREAKER_ERROR_RATE", "0.5"))
+PROVIDER_BREAKER_SLOW_CALL_SECONDS = float(os.getenv("PROVIDER_BREAKER_SLOW_CALL_SECONDS", "20"))
+PROVIDER_BREAKER_SLOW_RATE = float(os.getenv("PROVIDER_BREAKER_SLOW_RATE", "0.5"))
+PROVIDER_BREAKER_OPEN_SECONDS = float(os.getenv("PROVIDER_BREAKER_OPEN_SECONDS", "30"))
+
+# Textbook Extraction
+TEXTBOOK_EXTRACT_WORKERS = int(os.getenv("TEXTBOOK_EXTRACT_WORKERS", "1"))
+TEXTBOOK_PAGE_CHUNK = int(os.getenv("TEXTBOOK_PAGE_CHUNK", "25"))
+TEXTBOOK_MAX_BYTES = int(os.getenv("TEXTBOOK_MAX_BYTES", str(300 * 1024 * 1024)))
+TEXTBOOK_INDEX_DIR = os.getenv("TEXTBOOK_INDEX_DIR", str(Path(MODEL_CACHE_DIR) / "textbooks"))
+
+# Embeddings
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "local")  # local | openai
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+OPENAI_EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDING_BATCH_TOKENS = int(os.getenv("EMBEDDING_BATCH_TOKENS", "16384"))
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Textbook Semantic Search
+TEXTBOOK_CHUNK_CHARS = int(os.getenv("TEXTBOOK_CHUNK_CHARS", "1000"))
+TEXTBOOK_CHUNK_OVERLAP = int(os.getenv("TEXTBOOK_CHUNK_OVERLAP", "150"))
+VECTOR_INDEX_NPROBE = int(os.getenv("VECTOR_INDEX_NPROBE", "8"))
+VECTOR_INDEX_IVF_MIN_VECTORS = int(os.getenv("VECTOR_INDEX_IVF_MIN_VECTORS", "1024"))
+VECTOR_INDEX_RERANK_FACTOR = int(os.getenv("VECTOR_INDEX_RERANK_FACTOR", "4"))
+VECTOR_INDEX_CACHE_SHARDS = int(os.getenv("VECTOR_INDEX_CACHE_SHARDS", "32"))
+TEXTBOOK_SEARCH_KEYWORD_WEIGHT = float(os.getenv("TEXTBOOK_SEARCH_KEYWORD_WEIGHT", "1.0"))
+
+# Relevance Check (LLM only for scores between the thresholds)
+RELEVANCE_LOW_THRESHOLD = float(os.getenv("RELEVANCE_LOW_THRESHOLD", "0.25"))
+RELEVANCE_HIGH_THRESHOLD = float(os.getenv("RELEVANCE_HIGH_THRESHOLD", "0.65"))
+RELEVANCE_SEMANTIC_WEIGHT = float(os.getenv("RELEVANCE_SEMANTIC_WEIGHT", "0.7"))
+
+# Grading (per-homework prompt contexts kept in memory)
+GRADING_CONTEXT_CACHE_SIZE = int(os.getenv("GRADING_CONTEXT_CACHE_SIZE", "256"))
+
+# Class Summaries (map-reduce over submissions)
+SUMMARY_FAN_IN = int(os.getenv("SUMMARY_FAN_IN", "8"))
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "8"))
+SUMMARY_CACHE_ENABLED = os.getenv("SUMMARY_CACHE_ENABLED", "true").lower() == "true"
+SUMMARY_CACHE_MAX_BYTES = int(os.getenv("SUMMARY_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# Downloads (shared HTTP client)
+MAX_DOWNLOAD_BYTES = int(os.getenv("MAX_DOWNLOAD_BYTES", str(20 * 1024 * 1024)))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "30"))
+
 # Service Config
 AI_SERVICE_PORT = int(os.getenv("AI_SERVICE_PORT", "8001"))
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -6,20 +6,31 @@
 AI Grader
 
 Methods:
-- suggest_grade(submission_text, rubric) -> GradeSuggestion
+- suggest_grade(submission_text, homework_description, rubric, max_points, context) -> GradeSuggestion
 - analyze_completeness(submission_text, requirements) -> float
 - identify_errors(submission_text) -> List[Error]
+- generate_feedback(submission_text, homework_description, grade) -> str
+- stream_feedback(submission_text, homework_description, grade) -> AsyncIterator[str]
 
 GradeSuggestion:
 - suggested_grade: float
 - confidence: float
 - reasoning: str
 - improvements: List[str]
+
+Grading a class reuses one GradingContext per homework (see
+grading_context.py): the rubric, assigned questions and instructions are
+rendered once and each submission only appends its text.
+
+JSON answers go through models.structured_output: tolerant extraction,
+validation into the dataclasses below and one repair retry, instead of a
+silent grade of 0 whenever a response does not parse.
 """
 
+import asyncio
 import json
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Type, TypeVar
 from dataclasses import dataclass
 
 # OpenAI
@@ -36,10 +47,29 @@ try:
 except ImportError:
     ANTHROPIC_AVAILABLE = False
 
-from ai.config import settings
+from config import ANTHROPIC_API_KEY, OPENAI_API_KEY
+from homework_analysis.grading_context import GradingContext, build_grading_context
+from models.structured_output import generate_structured
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+_FEEDBACK_SYSTEM_PROMPT = "You are a supportive teacher providing feedback."
+
+# Marks the end of a blocking iterator in _iterate_in_thread
+_EXHAUSTED = object()
+
+
+async def _iterate_in_thread(iterator: Iterable) -> AsyncIterator[Any]:
+    """Consume a blocking (SDK stream) iterator without blocking the event loop."""
+    iterator = iter(iterator)
+    while True:
+        item = await asyncio.to_thread(next, iterator, _EXHAUSTED)
+        if item is _EXHAUSTED:
+            return
+        yield item
+
 
 @dataclass
 class GradeSuggestion:
@@ -51,6 +81,12 @@ class GradeSuggestion:
     errors_found: List[str]
 
 
+@dataclass
+class ErrorReport:
+    """Errors identified in a submission."""
+    errors: List[Dict[str, str]]
+
+
 @dataclass
 class CompletenessResult:
     """Completeness analysis result."""
@@ -70,20 +106,21 @@ class AIGrader:
         self.openai_client = None
         self.anthropic_client = None
 
-        if OPENAI_AVAILABLE and settings.openai_api_key:
-            self.openai_client = OpenAI(api_key=settings.openai_api_key)
+        if OPENAI_AVAILABLE and OPENAI_API_KEY:
+            self.openai_client = OpenAI(api_key=OPENAI_API_KEY)
             logger.info("OpenAI grader initialized")
 
-        if ANTHROPIC_AVAILABLE and settings.anthropic_api_key:
-            self.anthropic_client = Anthropic(api_key=settings.anthropic_api_key)
+        if ANTHROPIC_AVAILABLE and ANTHROPIC_API_KEY:
+            self.anthropic_client = Anthropic(api_key=ANTHROPIC_API_KEY)
             logger.info("Anthropic grader initialized")
 
     async def suggest_grade(
         self,
         submission_text: str,
-        homework_description: str,
+        homework_description: str = "",
         rubric: Optional[Dict[str, Any]] = None,
-        max_points: float = 100
+        max_points: float = 100,
+        context: Optional[GradingContext] = None
     ) -> GradeSuggestion:
         """
         Suggest a grade for a homework submission.
@@ -93,69 +130,59 @@ class AIGrader:
             homework_description: Description of the homework assignment
             rubric: Optional grading rubric
             max_points: Maximum possible points
+            context: Prebuilt grading context; replaces the three arguments above
 
         Returns:
             GradeSuggestion with grade, confidence, and feedback
         """
-        prompt = self._build_grading_prompt(
-            submission_text,
-            homework_description,
-            rubric,
-            max_points
-        )
+        if context is None:
+            context = build_grading_context("", "", homework_description, rubric, max_points)
+        max_points = context.max_points
+        prompt = context.build_prompt(submission_text)
 
-        try:
-            if self.openai_client:
-                result = await self._grade_with_openai(prompt)
-            elif self.anthropic_client:
-                result = await self._grade_with_anthropic(prompt)
-            else:
-                return self._default_grade_suggestion()
+        if not self.provider:
+            return self._default_grade_suggestion()
 
-            return self._parse_grading_response(result, max_points)
+        try:
+            return await self._structured(
+                prompt,
+                GradeSuggestion,
+                bounds={"suggested_grade": (0, max_points), "confidence": (0, 1)},
+                defaults={
+                    "confidence": 0.5,
+                    "reasoning": "Unable to provide reasoning",
+                    "improvements": [],
+                    "errors_found": []
+                }
+            )
         except Exception as e:
             logger.error(f"Grading failed: {e}")
             return self._default_grade_suggestion()
 
-    def _build_grading_prompt(
-        self,
-        submission_text: str,
-        homework_description: str,
-        rubric: Optional[Dict[str, Any]],
-        max_points: float
-    ) -> str:
-        """Build the grading prompt."""
-        rubric_text = ""
-        if rubric:
-            rubric_text = f"\n\nGrading Rubric:\n{json.dumps(rubric, indent=2)}"
-
-        return f"""You are an educational grading assistant. Analyze the following homework submission and provide a grade suggestion.
-
-Assignment Description:
-{homework_description}
-{rubric_text}
-
-Student Submission:
-{submission_text}
-
-Please evaluate this submission and respond in the following JSON format:
-{{
-    "suggested_grade": <number between 0 and {max_points}>,
-    "confidence": <number between 0 and 1>,
-    "reasoning": "<brief explanation of the grade>",
-    "improvements": ["<suggestion 1>", "<suggestion 2>"],
-    "errors_found": ["<error 1>", "<error 2>"]
-}}
-
-Be fair but thorough in your assessment. Focus on:
-1. Correctness of the content
-2. Completeness of the response
-3. Quality of explanation or work shown
-4. Adherence to assignment requirements"""
+    @property
+    def provider(self) -> Optional[Tuple[str, str]]:
+        """(provider, model) used for JSON tasks, or None if no client is configured."""
+        if self.openai_client:
+            return "openai", "gpt-4o"
+        if self.anthropic_client:
+            return "anthropic", "claude-sonnet-4-20250514"
+        return None
+
+    async def _complete_json(self, prompt: str) -> str:
+        """Send a JSON-answer prompt to the configured provider."""
+        if self.openai_client:
+            return await self._grade_with_openai(prompt)
+        return await self._grade_with_anthropic(prompt)
+
+    async def _structured(self, prompt: str, schema: Type[T], **kwargs) -> T:
+        """Prompt for JSON and validate it into schema (one repair retry)."""
+        provider, model = self.provider
+        return await generate_structured(self._complete_json, prompt, schema, provider, model, **kwargs)
 
     async def _grade_with_openai(self, prompt: str) -> str:
         """Grade using OpenAI."""
-        response = self.openai_client.chat.completions.create(
+        response = await asyncio.to_thread(
+            self.openai_client.chat.completions.create,
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": "You are an educational grading assistant. Always respond with valid JSON."},
@@ -168,7 +195,8 @@ Be fair but thorough in your assessment. Focus on:
 
     async def _grade_with_anthropic(self, prompt: str) -> str:
         """Grade using Anthropic Claude."""
-        response = self.anthropic_client.messages.create(
+        response = await asyncio.to_thread(
+            self.anthropic_client.messages.create,
             model="claude-sonnet-4-20250514",
             max_tokens=1000,
             messages=[
@@ -177,33 +205,6 @@ Be fair but thorough in your assessment. Focus on:
         )
         return response.content[0].text
 
-    def _parse_grading_response(
-        self,
-        response: str,
-        max_points: float
-    ) -> GradeSuggestion:
-        """Parse LLM response into GradeSuggestion."""
-        try:
-            # Clean up response if needed
-            response = response.strip()
-            if response.startswith("```json"):
-                response = response[7:]
-            if response.endswith("```"):
-                response = response[:-3]
-
-            data = json.loads(response)
-
-            return GradeSuggestion(
-                suggested_grade=min(max(float(data.get("suggested_grade", 0)), 0), max_points),
-                confidence=min(max(float(data.get("confidence", 0.5)), 0), 1),
-                reasoning=str(data.get("reasoning", "Unable to provide reasoning")),
-                improvements=list(data.get("improvements", [])),
-                errors_found=list(data.get("errors_found", []))
-            )
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse grading response: {e}")
-            return self._default_grade_suggestion()
-
     def _default_grade_suggestion(self) -> GradeSuggestion:
         """Return a default grade suggestion when AI fails."""
         return GradeSuggestion(
@@ -245,20 +246,15 @@ Respond in JSON format:
     "feedback": "<brief feedback on completeness>"
 }}"""
 
+        if not self.provider:
+            return CompletenessResult(0, [], requirements, "AI analysis unavailable")
+
         try:
-            if self.openai_client:
-                response = await self._grade_with_openai(prompt)
-            elif self.anthropic_client:
-                response = await self._grade_with_anthropic(prompt)
-            else:
-                return CompletenessResult(0, [], requirements, "AI analysis unavailable")
-
-            data = json.loads(response.strip())
-            return CompletenessResult(
-                score=float(data.get("score", 0)),
-                covered_topics=list(data.get("covered_topics", [])),
-                missing_topics=list(data.get("missing_topics", [])),
-                feedback=str(data.get("feedback", ""))
+            return await self._structured(
+                prompt,
+                CompletenessResult,
+                bounds={"score": (0, 100)},
+                defaults={"covered_topics": [], "missing_topics": [], "feedback": ""}
             )
         except Exception as e:
             logger.error(f"Completeness analysis failed: {e}")
@@ -298,20 +294,34 @@ Respond in JSON format:
 
 If no errors are found, return {{"errors": []}}"""
 
-        try:
-            if self.openai_client:
-                response = await self._grade_with_openai(prompt)
-            elif self.anthropic_client:
-                response = await self._grade_with_anthropic(prompt)
-            else:
-                return []
+        if not self.provider:
+            return []
 
-            data = json.loads(response.strip())
-            return list(data.get("errors", []))
+        try:
+            report = await self._structured(prompt, ErrorReport)
+            return report.errors
         except Exception as e:
             logger.error(f"Error identification failed: {e}")
             return []
 
+    def _feedback_prompt(self, submission_text: str, homework_description: str, grade: float) -> str:
+        """Build the feedback prompt."""
+        return f"""Generate constructive feedback for this homework submission.
+
+Assignment: {homework_description}
+Grade: {grade}/100
+
+Student Submission:
+{submission_text}
+
+Provide encouraging but helpful feedback that:
+1. Acknowledges what was done well
+2. Points out areas for improvement
+3. Gives specific suggestions
+4. Maintains a supportive tone
+
+Keep the feedback concise (2-3 paragraphs max)."""
+
     async def generate_feedback(
         self,
         submission_text: str,
@@ -329,35 +339,23 @@ If no errors are found, return {{"errors": []}}"""
         Returns:
             Constructive feedback text
         """
-        prompt = f"""Generate constructive feedback for this homework submission.
-
-Assignment: {homework_description}
-Grade: {grade}/100
-
-Student Submission:
-{submission_text}
-
-Provide encouraging but helpful feedback that:
-1. Acknowledges what was done well
-2. Points out areas for improvement
-3. Gives specific suggestions
-4. Maintains a supportive tone
-
-Keep the feedback concise (2-3 paragraphs max)."""
+        prompt = self._feedback_prompt(submission_text, homework_description, grade)
 
         try:
             if self.openai_client:
-                response = self.openai_client.chat.completions.create(
+                response = await asyncio.to_thread(
+                    self.openai_client.chat.completions.create,
                     model="gpt-4o",
                     messages=[
-                        {"role": "system", "content": "You are a supportive teacher providing feedback."},
+                        {"role": "system", "content": _FEEDBACK_SYSTEM_PROMPT},
                         {"role": "user", "content": prompt}
                     ],
                     max_tokens=500
                 )
                 return response.choices[0].message.content
             elif self.anthropic_client:
-                response = self.anthropic_client.messages.create(
+                response = await asyncio.to_thread(
+                    self.anthropic_client.messages.create,
                     model="claude-sonnet-4-20250514",
                     max_tokens=500,
                     messages=[{"role": "user", "content": prompt}]
@@ -368,3 +366,54 @@ Keep the feedback concise (2-3 paragraphs max)."""
         except Exception as e:
             logger.error(f"Feedback generation failed: {e}")
             return "Unable to generate feedback. Please review manually."
+
+    async def stream_feedback(
+        self,
+        submission_text: str,
+        homework_description: str,
+        grade: float
+    ) -> AsyncIterator[str]:
+        """
+        Generate feedback, yielding text as the model produces it.
+
+        Args:
+            submission_text: The student's submission
+            homework_description: Assignment description
+            grade: The grade given
+
+        Yields:
+            Feedback text fragments; provider errors propagate to the caller
+        """
+        prompt = self._feedback_prompt(submission_text, homework_description, grade)
+
+        if self.openai_client:
+            stream = await asyncio.to_thread(
+                self.openai_client.chat.completions.create,
+                model="gpt-4o",
+                messages=[
+                    {"role": "system", "content": _FEEDBACK_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=500,
+                stream=True
+            )
+            try:
+                async for chunk in _iterate_in_thread(stream):
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                stream.close()
+        elif self.anthropic_client:
+            manager = self.anthropic_client.messages.stream(
+                model="claude-sonnet-4-20250514",
+                max_tokens=500,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            stream = await asyncio.to_thread(manager.__enter__)
+            try:
+                async for text in _iterate_in_thread(stream.text_stream):
+                    yield text
+            finally:
+                await asyncio.to_thread(manager.__exit__, None, None, None)
+        else:
+            yield "AI feedback generation unavailable."
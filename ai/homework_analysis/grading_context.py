@@ -0,0 +1,217 @@
+# grading_context.py - Homework Grading Context
+#
+# Per-homework grading prompt material, built once and cached.
+
+"""
+Grading Context
+
+Methods:
+- build_grading_context(homework_id, version, description, ...) -> GradingContext
+- GradingContext.build_prompt(submission_text) -> str
+- get_grading_context(homework_id, version, description, ...) -> GradingContext
+- invalidate_grading_context(homework_id) -> None
+
+Everything in a grading prompt except the student's text depends only on
+the homework: the description, the rubric, the assigned textbook
+questions and their answer keys. GradingContext renders all of that once
+into a prompt prefix; grading a submission only appends the student
+text. Because the shared part comes first, providers that cache prompt
+prefixes can reuse it across a class's submissions too.
+
+Contexts are cached per homework and keyed by a version (the homework's
+updated_at), so editing a homework invalidates its context automatically.
+"""
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Union
+from uuid import UUID
+
+from config import GRADING_CONTEXT_CACHE_SIZE
+from textbook_parser.indexer import TextbookIndexer
+from textbook_parser.question_extractor import Question
+from utils.text_utils import parse_page_numbers
+
+logger = logging.getLogger(__name__)
+
+_INSTRUCTIONS = """Please evaluate the submission below and respond in the following JSON format:
+{{
+    "suggested_grade": <number between 0 and {max_points}>,
+    "confidence": <number between 0 and 1>,
+    "reasoning": "<brief explanation of the grade>",
+    "improvements": ["<suggestion 1>", "<suggestion 2>"],
+    "errors_found": ["<error 1>", "<error 2>"]
+}}
+
+Be fair but thorough in your assessment. Focus on:
+1. Correctness of the content
+2. Completeness of the response
+3. Quality of explanation or work shown
+4. Adherence to assignment requirements"""
+
+
+def _render_questions(questions: List[Question]) -> str:
+    lines = []
+    for question in questions:
+        lines.append(f"{question.number}. [{question.question_type.value}] {question.text}")
+        lines.extend(f"   {option}" for option in question.options)
+        if question.answer:
+            lines.append(f"   Expected answer: {question.answer}")
+    return "\n".join(lines)
+
+
+@dataclass
+class GradingContext:
+    """Homework-level grading material, rendered once."""
+    homework_id: str
+    version: str
+    max_points: float
+    rubric_text: str
+    questions: List[Question] = field(default_factory=list)
+    prompt_prefix: str = ""
+
+    @property
+    def answer_keys(self) -> Dict[str, str]:
+        """Expected answers by question number."""
+        return {q.number: q.answer for q in self.questions if q.answer}
+
+    def build_prompt(self, submission_text: str) -> str:
+        """
+        Complete grading prompt for one submission.
+
+        Args:
+            submission_text: The student's submission text
+
+        Returns:
+            Prompt with the cached prefix followed by the submission
+        """
+        return f"{self.prompt_prefix}\n\nStudent Submission:\n{submission_text}"
+
+
+def build_grading_context(
+    homework_id: str,
+    version: str,
+    description: str,
+    rubric: Optional[Dict[str, Any]] = None,
+    max_points: float = 100,
+    textbook_id: Optional[Union[str, UUID]] = None,
+    page_numbers: Optional[str] = None,
+    indexer: Optional[TextbookIndexer] = None
+) -> GradingContext:
+    """
+    Render the grading context of a homework.
+
+    Args:
+        homework_id: Homework UUID
+        version: Homework version (updated_at); a change invalidates the context
+        description: Homework title and description
+        rubric: Optional grading rubric
+        max_points: Maximum possible points
+        textbook_id: Assigned textbook, if any
+        page_numbers: Assigned pages, e.g. "45-47, 50"
+        indexer: Textbook indexer used to resolve questions
+
+    Returns:
+        GradingContext
+    """
+    rubric_text = json.dumps(rubric, indent=2) if rubric else ""
+
+    questions: List[Question] = []
+    pages = parse_page_numbers(page_numbers)
+    if textbook_id and pages:
+        questions = (indexer or TextbookIndexer()).get_questions(textbook_id, pages)
+
+    sections = [
+        "You are an educational grading assistant. Analyze the following homework "
+        "submission and provide a grade suggestion.",
+        f"Assignment Description:\n{description}",
+    ]
+    if rubric_text:
+        sections.append(f"Grading Rubric:\n{rubric_text}")
+    if questions:
+        sections.append(f"Assigned Textbook Questions (pages {page_numbers}):\n{_render_questions(questions)}")
+    sections.append(_INSTRUCTIONS.format(max_points=max_points))
+
+    return GradingContext(
+        homework_id=homework_id,
+        version=version,
+        max_points=max_points,
+        rubric_text=rubric_text,
+        questions=questions,
+        prompt_prefix="\n\n".join(sections)
+    )
+
+
+class GradingContextCache:
+    """
+    Small LRU of grading contexts keyed by homework ID.
+    An entry is only returned while its version still matches.
+    """
+
+    def __init__(self, max_entries: int = GRADING_CONTEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, GradingContext]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, homework_id: str, version: str) -> Optional[GradingContext]:
+        with self._lock:
+            context = self._entries.get(homework_id)
+            if context is None:
+                return None
+            if context.version != version:
+                del self._entries[homework_id]
+                return None
+            self._entries.move_to_end(homework_id)
+            return context
+
+    def put(self, context: GradingContext) -> None:
+        with self._lock:
+            self._entries[context.homework_id] = context
+            self._entries.move_to_end(context.homework_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, homework_id: str) -> None:
+        with self._lock:
+            self._entries.pop(homework_id, None)
+
+
+@lru_cache()
+def get_grading_context_cache() -> GradingContextCache:
+    """
+    Returns the process-wide grading context cache.
+    """
+    return GradingContextCache()
+
+
+def get_grading_context(homework_id: str, version: str, description: str, **kwargs) -> GradingContext:
+    """
+    Cached build_grading_context().
+
+    Args:
+        homework_id: Homework UUID
+        version: Homework version (updated_at)
+        description: Homework title and description
+        **kwargs: Remaining build_grading_context() arguments
+
+    Returns:
+        GradingContext for the current homework version
+    """
+    cache = get_grading_context_cache()
+    context = cache.get(homework_id, version)
+    if context is None:
+        context = build_grading_context(homework_id, version, description, **kwargs)
+        cache.put(context)
+        logger.debug(f"Built grading context for homework {homework_id} ({len(context.questions)} questions)")
+    return context
+
+
+def invalidate_grading_context(homework_id: str) -> None:
+    """
+    Drop the cached grading context of a homework.
+    """
+    get_grading_context_cache().invalidate(homework_id)
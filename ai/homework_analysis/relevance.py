@@ -6,7 +6,7 @@
 Relevance Checker
 
 Methods:
-- check_relevance(submission_text, homework_question) -> RelevanceScore
+- check_relevance(submission_text, homework_question, textbook_id, page_numbers) -> RelevanceScore
 - extract_topics(text) -> List[str]
 - compare_topics(submission_topics, homework_topics) -> float
 
@@ -15,8 +15,307 @@ RelevanceScore:
 - explanation: str
 - matching_topics: List[str]
 - missing_topics: List[str]
+- stage: "local" or "llm"
+
+Two stages:
+1. Local: embedding cosine between the submission and the homework
+   question plus the assigned textbook pages (Homework.textbook_id /
+   page_numbers), blended with keyword topic overlap. Takes milliseconds.
+2. LLM: only when the local score falls between RELEVANCE_LOW_THRESHOLD
+   and RELEVANCE_HIGH_THRESHOLD. Clearly on- or off-topic submissions
+   never reach an API.
 """
 
-# TODO: Implement topic extraction using NLP
-# TODO: Implement relevance scoring with LLM
-# TODO: Generate explanation
+import asyncio
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Sequence, Union
+from uuid import UUID
+
+import numpy as np
+
+# OpenAI
+try:
+    from openai import OpenAI
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+# Anthropic
+try:
+    from anthropic import Anthropic
+    ANTHROPIC_AVAILABLE = True
+except ImportError:
+    ANTHROPIC_AVAILABLE = False
+
+from config import (
+    ANTHROPIC_API_KEY,
+    OPENAI_API_KEY,
+    RELEVANCE_HIGH_THRESHOLD,
+    RELEVANCE_LOW_THRESHOLD,
+    RELEVANCE_SEMANTIC_WEIGHT,
+)
+from models.embedding import embed_batch
+from models.structured_output import generate_structured
+from textbook_parser.indexer import TextbookIndexer, chunk_spans
+from utils.text_utils import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Cosine similarities are rescaled from [floor, ceiling] to [0, 1]; below
+# the floor texts are unrelated, above the ceiling clearly the same topic.
+_COSINE_FLOOR = 0.15
+_COSINE_CEILING = 0.6
+
+# Only the start of long submissions is embedded
+_MAX_SUBMISSION_CHUNKS = 8
+
+# Textbook text included in the LLM prompt
+_MAX_REFERENCE_CHARS = 4000
+
+_STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before
+being below between both but by can could did do does doing down during each few for from
+further had has have having he her here hers herself him himself his how i if in into is it
+its itself just me more most my myself no nor not now of off on once only or other our ours
+ourselves out over own same she should so some such than that the their theirs them
+themselves then there these they this those through to too under until up very was we were
+what when where which while who whom why will with would you your yours yourself yourselves
+answer answers page pages question questions exercise exercises homework problem problems
+solve show explain write use using find following given
+""".split())
+
+
+@dataclass
+class RelevanceScore:
+    """Relevance check result."""
+    score: float
+    explanation: str
+    matching_topics: List[str] = field(default_factory=list)
+    missing_topics: List[str] = field(default_factory=list)
+    stage: str = "local"
+
+
+def _stem(token: str) -> str:
+    """Cheap plural folding so "equations" matches "equation"."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "is", "us")):
+        return token[:-1]
+    return token
+
+
+def extract_topics(text: str, limit: int = 20) -> List[str]:
+    """
+    Extract the most frequent content words of a text.
+
+    Args:
+        text: Input text
+        limit: Maximum number of topics
+
+    Returns:
+        Topic terms, most frequent first
+    """
+    counts = Counter(
+        _stem(token) for token in tokenize(text)
+        if len(token) > 2 and token not in _STOPWORDS and not token.replace(".", "").isdigit()
+    )
+    return [term for term, _ in counts.most_common(limit)]
+
+
+def compare_topics(submission_topics: Sequence[str], homework_topics: Sequence[str]) -> float:
+    """
+    Fraction of homework topics that the submission covers.
+
+    Args:
+        submission_topics: Topics of the submission
+        homework_topics: Topics of the homework and assigned pages
+
+    Returns:
+        Overlap score 0.0 - 1.0
+    """
+    if not homework_topics:
+        return 0.0
+    covered = set(submission_topics)
+    return sum(1 for topic in homework_topics if topic in covered) / len(homework_topics)
+
+
+def _rescale_cosine(cosine: float) -> float:
+    return float(np.clip((cosine - _COSINE_FLOOR) / (_COSINE_CEILING - _COSINE_FLOOR), 0.0, 1.0))
+
+
+class RelevanceChecker:
+    """
+    Two-stage submission relevance checker.
+    Uses local embeddings and keywords first, an LLM only when ambiguous.
+    """
+
+    def __init__(self, indexer: Optional[TextbookIndexer] = None, embedder=None):
+        self.indexer = indexer or TextbookIndexer()
+        self.embedder = embedder or embed_batch
+        self.openai_client = None
+        self.anthropic_client = None
+
+        if OPENAI_AVAILABLE and OPENAI_API_KEY:
+            self.openai_client = OpenAI(api_key=OPENAI_API_KEY)
+
+        if ANTHROPIC_AVAILABLE and ANTHROPIC_API_KEY:
+            self.anthropic_client = Anthropic(api_key=ANTHROPIC_API_KEY)
+
+    async def check_relevance(
+        self,
+        submission_text: str,
+        homework_question: str,
+        textbook_id: Optional[Union[str, UUID]] = None,
+        page_numbers: Optional[Iterable[int]] = None
+    ) -> RelevanceScore:
+        """
+        Check whether a submission addresses the assigned homework.
+
+        Args:
+            submission_text: Student submission text (e.g. OCR output)
+            homework_question: Homework title and description
+            textbook_id: Assigned textbook, if any
+            page_numbers: Assigned textbook pages
+
+        Returns:
+            RelevanceScore
+        """
+        page_numbers = list(page_numbers or [])
+        reference_text = homework_question
+        if textbook_id and page_numbers:
+            pages = [self.indexer.get_page_text(textbook_id, page) or "" for page in page_numbers]
+            reference_text = "\n".join([homework_question, *pages])
+
+        local = await asyncio.to_thread(
+            self._local_score, submission_text, homework_question, reference_text, textbook_id, page_numbers
+        )
+
+        if RELEVANCE_LOW_THRESHOLD < local.score < RELEVANCE_HIGH_THRESHOLD:
+            if self.openai_client or self.anthropic_client:
+                try:
+                    return await self._llm_score(submission_text, homework_question, reference_text, local)
+                except Exception as e:
+                    logger.warning(f"LLM relevance check failed, using local score: {e}")
+
+        return local
+
+    def _local_score(
+        self,
+        submission_text: str,
+        homework_question: str,
+        reference_text: str,
+        textbook_id: Optional[Union[str, UUID]],
+        page_numbers: List[int]
+    ) -> RelevanceScore:
+        """Embedding + keyword score, no network calls."""
+        homework_topics = extract_topics(reference_text)
+        submission_topics = extract_topics(submission_text, limit=100)
+        overlap = compare_topics(submission_topics, homework_topics)
+
+        covered = set(submission_topics)
+        matching = [t for t in homework_topics if t in covered]
+        missing = [t for t in homework_topics if t not in covered]
+
+        spans = chunk_spans(submission_text)[:_MAX_SUBMISSION_CHUNKS]
+        if not spans:
+            return RelevanceScore(0.0, "Submission contains no readable text.", [], homework_topics)
+
+        # Question first; textbook chunks come from the index (no re-embedding)
+        texts = [homework_question] + [submission_text[start:end] for start, end in spans]
+        vectors = self.embedder(texts)
+        reference = vectors[:1]
+        if textbook_id and page_numbers:
+            page_vectors = self.indexer.page_vectors(textbook_id, page_numbers)
+            if len(page_vectors):
+                reference = np.vstack([reference, page_vectors])
+
+        # Each submission chunk is judged by its closest reference passage
+        cosine = float((vectors[1:] @ reference.T).max(axis=1).mean())
+        semantic = _rescale_cosine(cosine)
+        score = RELEVANCE_SEMANTIC_WEIGHT * semantic + (1 - RELEVANCE_SEMANTIC_WEIGHT) * overlap
+
+        if score >= RELEVANCE_HIGH_THRESHOLD:
+            explanation = "Submission closely matches the assigned material."
+        elif score <= RELEVANCE_LOW_THRESHOLD:
+            explanation = "Submission does not appear to address the assigned material."
+        else:
+            explanation = "Submission partially matches the assigned material."
+
+        return RelevanceScore(
+            score=round(score, 3),
+            explanation=explanation,
+            matching_topics=matching,
+            missing_topics=missing,
+            stage="local"
+        )
+
+    async def _llm_score(
+        self,
+        submission_text: str,
+        homework_question: str,
+        reference_text: str,
+        local: RelevanceScore
+    ) -> RelevanceScore:
+        """Ask an LLM to settle an ambiguous local score."""
+        prompt = f"""Decide whether this student submission answers the assigned homework.
+
+Assigned homework:
+{homework_question}
+
+Assigned textbook material (excerpt):
+{reference_text[len(homework_question):][:_MAX_REFERENCE_CHARS]}
+
+Student submission:
+{submission_text}
+
+Respond in JSON format:
+{{
+    "score": <relevance between 0 and 1>,
+    "explanation": "<one or two sentences>",
+    "matching_topics": ["<topic addressed>", ...],
+    "missing_topics": ["<topic not addressed>", ...]
+}}"""
+
+        result = await generate_structured(
+            self._complete_json,
+            prompt,
+            RelevanceScore,
+            *self._provider(),
+            bounds={"score": (0.0, 1.0)},
+            defaults={
+                "explanation": local.explanation,
+                "matching_topics": local.matching_topics,
+                "missing_topics": local.missing_topics
+            }
+        )
+        result.stage = "llm"
+        return result
+
+    def _provider(self):
+        if self.openai_client:
+            return "openai", "gpt-4o-mini"
+        return "anthropic", "claude-sonnet-4-20250514"
+
+    async def _complete_json(self, prompt: str) -> str:
+        if self.openai_client:
+            response = await asyncio.to_thread(
+                self.openai_client.chat.completions.create,
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": "You check homework relevance. Always respond with valid JSON."},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=400,
+                response_format={"type": "json_object"}
+            )
+            return response.choices[0].message.content
+
+        response = await asyncio.to_thread(
+            self.anthropic_client.messages.create,
+            model="claude-sonnet-4-20250514",
+            max_tokens=400,
+            messages=[{"role": "user", "content": prompt + "\n\nRespond ONLY with valid JSON, no other text."}]
+        )
+        return response.content[0].text
@@ -0,0 +1,203 @@
+# routes.py - Homework Analysis API Routes
+#
+# Endpoints for submission analysis.
+
+"""
+Analysis Endpoints
+
+POST /analysis/relevance - Check if a submission matches its homework
+POST /analysis/grade - Extract (if given a file) and suggest a grade for a submission
+POST /analysis/feedback/stream - Stream suggested feedback (Server-Sent Events)
+DELETE /analysis/grading-context/{homework_id} - Drop a cached grading context
+GET /analysis/output-stats - Malformed LLM output rates per provider and model
+"""
+
+import asyncio
+import json
+import logging
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, model_validator
+
+from homework_analysis.grader import AIGrader
+from homework_analysis.grading_context import get_grading_context, invalidate_grading_context
+from homework_analysis.relevance import RelevanceChecker
+from models.structured_output import get_output_stats
+from ocr.extractor import TextExtractor
+from utils.http_client import download_bytes
+from utils.text_utils import parse_page_numbers
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+class RelevanceRequest(BaseModel):
+    """Relevance check request."""
+    submission_text: str = Field(..., description="Extracted submission text")
+    homework_question: str = Field(..., description="Homework title and description")
+    textbook_id: Optional[UUID] = Field(None, description="Assigned textbook UUID")
+    page_numbers: Optional[str] = Field(None, description="Assigned pages, e.g. \"45-47, 50\"")
+
+
+class RelevanceResponse(BaseModel):
+    """Relevance check result."""
+    score: float
+    explanation: str
+    matching_topics: List[str]
+    missing_topics: List[str]
+    stage: str
+
+
+class GradingHomework(BaseModel):
+    """Homework fields that make up a grading context."""
+    homework_id: str = Field(..., description="Homework UUID")
+    updated_at: str = Field(..., description="Homework.updated_at; a new value rebuilds the context")
+    description: str = Field(..., description="Homework title and description")
+    rubric: Optional[Dict[str, Any]] = None
+    max_points: float = 100
+    textbook_id: Optional[UUID] = None
+    page_numbers: Optional[str] = Field(None, description="Assigned pages, e.g. \"45-47, 50\"")
+
+
+class GradeRequest(BaseModel):
+    """Grade suggestion request; pass the submission text or its file."""
+    submission_text: Optional[str] = Field(None, description="Extracted submission text")
+    file_url: Optional[str] = Field(None, description="Submission file to extract the text from")
+    file_type: str = Field("image", description="Submission file type (image/pdf)")
+    homework: GradingHomework
+
+    @model_validator(mode="after")
+    def _text_or_file(self) -> "GradeRequest":
+        if self.submission_text is None and not self.file_url:
+            raise ValueError("submission_text or file_url is required")
+        return self
+
+
+class GradeResponse(BaseModel):
+    """Grade suggestion."""
+    extracted_text: str
+    suggested_grade: float
+    confidence: float
+    reasoning: str
+    improvements: List[str]
+    errors_found: List[str]
+
+
+class FeedbackRequest(BaseModel):
+    """Feedback suggestion request."""
+    submission_text: str = Field(..., description="Extracted submission text")
+    homework_description: str = Field(..., description="Homework title and description")
+    grade: float = Field(..., description="Grade given, out of 100")
+
+
+@lru_cache()
+def get_relevance_checker() -> RelevanceChecker:
+    return RelevanceChecker()
+
+
+@lru_cache()
+def get_grader() -> AIGrader:
+    return AIGrader()
+
+
+@lru_cache()
+def get_text_extractor() -> TextExtractor:
+    return TextExtractor()
+
+
+async def _extract_submission_text(file_url: str, file_type: str) -> str:
+    """OCR a submission file (one image, or every page of a PDF)."""
+    extractor = get_text_extractor()
+    if file_type == "pdf":
+        pages = await extractor.extract_from_pdf_url(file_url)
+        return "\n\n".join(page for page in pages if page)
+    image_bytes, _ = await download_bytes(file_url)
+    return await extractor.extract_from_image(image_bytes)
+
+
+@router.post("/relevance", response_model=RelevanceResponse)
+async def check_relevance(request: RelevanceRequest):
+    """Score how well a submission matches the assigned homework."""
+    result = await get_relevance_checker().check_relevance(
+        request.submission_text,
+        request.homework_question,
+        textbook_id=request.textbook_id,
+        page_numbers=parse_page_numbers(request.page_numbers)
+    )
+    return RelevanceResponse(**result.__dict__)
+
+
+@router.post("/grade", response_model=GradeResponse)
+async def suggest_grade(request: GradeRequest):
+    """
+    Suggest a grade, reusing the homework's cached grading context.
+
+    Given a file_url instead of text, the submission is OCR'd first; the
+    text is returned so the caller can store it with the analysis.
+    """
+    homework = request.homework
+    submission_text = request.submission_text
+    if submission_text is None:
+        submission_text = await _extract_submission_text(request.file_url, request.file_type)
+
+    context = await asyncio.to_thread(
+        get_grading_context,
+        homework.homework_id,
+        homework.updated_at,
+        homework.description,
+        rubric=homework.rubric,
+        max_points=homework.max_points,
+        textbook_id=homework.textbook_id,
+        page_numbers=homework.page_numbers
+    )
+    result = await get_grader().suggest_grade(submission_text, context=context)
+    return GradeResponse(extracted_text=submission_text, **result.__dict__)
+
+
+@router.delete("/grading-context/{homework_id}", status_code=204)
+async def drop_grading_context(homework_id: str):
+    """Forget a homework's grading context (e.g. after it was deleted)."""
+    invalidate_grading_context(homework_id)
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/feedback/stream")
+async def stream_feedback(request: FeedbackRequest):
+    """
+    Stream suggested feedback as Server-Sent Events.
+
+    Events: "token" ({"text": ...}) per fragment, then "done" ({}) or
+    "error" ({"message": ...}).
+    """
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for text in get_grader().stream_feedback(
+                request.submission_text,
+                request.homework_description,
+                request.grade
+            ):
+                yield _sse("token", {"text": text})
+            yield _sse("done", {})
+        except Exception as e:
+            logger.error(f"Feedback streaming failed: {e}")
+            yield _sse("error", {"message": "Unable to generate feedback. Please review manually."})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/output-stats")
+async def output_stats():
+    """Structured-output outcomes (ok / repaired / failed) per provider and model."""
+    return {"providers": get_output_stats()}
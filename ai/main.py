@@ -10,24 +10,37 @@ Endpoints:
 - POST /analysis/relevance - Check homework relevance
 - POST /analysis/grade - AI-assisted grading
 - POST /summarize - Generate submission summary
-- POST /textbook/index - Index textbook content
+- POST /textbook/index - Index textbook content (streams per-page progress)
+- POST /textbook/search - Hybrid keyword + semantic search within a textbook
 
 Usage:
     uvicorn main:app --host 0.0.0.0 --port 8001
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from config import AI_SERVICE_PORT, LOG_LEVEL
+from utils.circuit_breaker import get_breaker_stats
+from utils.http_client import close_http_client
 import os
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Release shared clients on shutdown."""
+    yield
+    await close_http_client()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="EduProof AI Service",
     description="AI microservice for OCR, homework analysis, and textbook processing",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Configure CORS - allow backend to communicate
@@ -43,11 +56,12 @@ app.add_middleware(
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    """Health check endpoint for monitoring"""
+    """Health check endpoint for monitoring (includes provider circuit breakers)"""
     return {
         "status": "healthy",
         "service": "EduProof AI Service",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "providers": get_breaker_stats()
     }
 
 # Root endpoint
@@ -61,22 +75,24 @@ async def root():
         "endpoints": {
             "health": "/health",
             "ocr": "/ocr/* (TODO)",
-            "analysis": "/analysis/* (TODO)",
+            "analysis": "/analysis/relevance",
             "summarize": "/summarize (TODO)",
-            "textbook": "/textbook/* (TODO)"
+            "textbook": "/textbook/index, /textbook/search"
         }
     }
 
+from homework_analysis.routes import router as analysis_router
+from textbook_parser.routes import router as textbook_router
+
+app.include_router(analysis_router, prefix="/analysis", tags=["Analysis"])
+app.include_router(textbook_router, prefix="/textbook", tags=["Textbook"])
+
 # TODO: Include routers when AI modules are fully implemented
 # from ocr.routes import router as ocr_router
-# from homework_analysis.routes import router as analysis_router
 # from summarization.routes import router as summary_router
-# from textbook_parser.routes import router as textbook_router
 #
 # app.include_router(ocr_router, prefix="/ocr", tags=["OCR"])
-# app.include_router(analysis_router, prefix="/analysis", tags=["Analysis"])
 # app.include_router(summary_router, prefix="/summarize", tags=["Summary"])
-# app.include_router(textbook_router, prefix="/textbook", tags=["Textbook"])
 
 if __name__ == "__main__":
     import uvicorn
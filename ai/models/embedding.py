@@ -6,10 +6,278 @@
 Embedding Generator
 
 Methods:
-- embed_text(text) -> List[float]
-- embed_batch(texts) -> List[List[float]]
-- similarity(embedding1, embedding2) -> float
+- embed_text(text) -> np.ndarray
+- embed_batch(texts) -> np.ndarray
+- similarity(query, embeddings) -> float | np.ndarray
+
+Backends (EMBEDDING_BACKEND):
+- local: sentence-transformers model on CPU (EMBEDDING_MODEL)
+- openai: OpenAI embeddings API (OPENAI_EMBEDDING_MODEL)
+
+Embeddings are L2-normalised float32 vectors, so cosine similarity is a
+plain dot product. Every vector is cached on disk by (model, text hash);
+only texts the cache has not seen reach the backend, grouped into
+batches that stay under the backend's token budget.
 """
 
-# TODO: Implement embedding generation
-# TODO: Add similarity calculation
+import logging
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+# sentence-transformers for local CPU embeddings
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+# OpenAI embeddings API
+try:
+    from openai import OpenAI
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+from config import (
+    EMBEDDING_BACKEND,
+    EMBEDDING_BATCH_TOKENS,
+    EMBEDDING_CACHE_ENABLED,
+    EMBEDDING_MODEL,
+    MODEL_CACHE_DIR,
+    OPENAI_API_KEY,
+    OPENAI_EMBEDDING_MODEL,
+)
+from models.embedding_cache import EmbeddingCache, get_embedding_cache
+from utils.text_utils import text_digest
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
+
+
+class EmbeddingBackend(ABC):
+    """
+    Base class for embedding providers.
+
+    Subclasses set name (used in cache keys), the per-request limits, and
+    implement embed().
+    """
+
+    name: str = ""
+    max_batch_tokens: int = EMBEDDING_BATCH_TOKENS
+    max_batch_size: int = 64
+
+    def count_tokens(self, text: str) -> int:
+        """Approximate token count (about four characters per token)."""
+        return max(1, len(text) // 4)
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed one batch of texts.
+
+        Returns:
+            float32 matrix of shape (len(texts), dim)
+        """
+
+
+class LocalEmbeddingBackend(EmbeddingBackend):
+    """sentence-transformers model running on CPU."""
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL):
+        if not SENTENCE_TRANSFORMERS_AVAILABLE:
+            raise RuntimeError("sentence-transformers is required for local embeddings")
+        self.name = model_name
+        self._model: Optional["SentenceTransformer"] = None
+
+    @property
+    def model(self) -> "SentenceTransformer":
+        if self._model is None:
+            logger.info(f"Loading embedding model {self.name}")
+            self._model = SentenceTransformer(self.name, cache_folder=MODEL_CACHE_DIR, device="cpu")
+        return self._model
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(
+            texts,
+            batch_size=len(texts),
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+
+
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    """OpenAI embeddings API."""
+
+    max_batch_tokens = 100_000
+    max_batch_size = 2048
+
+    def __init__(self, model_name: str = OPENAI_EMBEDDING_MODEL):
+        if not OPENAI_AVAILABLE or not OPENAI_API_KEY:
+            raise RuntimeError("openai and OPENAI_API_KEY are required for API embeddings")
+        self.name = f"openai/{model_name}"
+        self.model_name = model_name
+        self.client = OpenAI(api_key=OPENAI_API_KEY)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        response = self.client.embeddings.create(model=self.model_name, input=texts)
+        ordered = sorted(response.data, key=lambda item: item.index)
+        return np.array([item.embedding for item in ordered], dtype=np.float32)
+
+
+_BACKENDS = {
+    "local": LocalEmbeddingBackend,
+    "openai": OpenAIEmbeddingBackend,
+}
+
+
+class EmbeddingGenerator:
+    """
+    Embeds texts through a backend with caching and token-budget batching.
+    """
+
+    def __init__(
+        self,
+        backend: EmbeddingBackend,
+        cache: Optional[EmbeddingCache] = None
+    ):
+        self.backend = backend
+        self.cache = cache
+
+    def _batches(self, texts: Sequence[str]) -> Iterator[List[int]]:
+        """
+        Group text indices into batches under the backend's token budget.
+
+        Texts are ordered by length first so each batch holds similarly
+        sized inputs, which keeps padding (and wasted compute) low.
+        """
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        batch: List[int] = []
+        batch_tokens = 0
+
+        for i in order:
+            tokens = self.backend.count_tokens(texts[i])
+            if batch and (
+                batch_tokens + tokens > self.backend.max_batch_tokens
+                or len(batch) >= self.backend.max_batch_size
+            ):
+                yield batch
+                batch, batch_tokens = [], 0
+            batch.append(i)
+            batch_tokens += tokens
+
+        if batch:
+            yield batch
+
+    def embed_batch(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Embed several texts, reusing cached vectors.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            float32 matrix of shape (len(texts), dim), rows L2-normalised
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        digests = [text_digest(text) for text in texts]
+        vectors: Dict[str, np.ndarray] = {}
+        if self.cache is not None:
+            vectors = self.cache.get_many(self.backend.name, digests)
+
+        # Embed each distinct uncached text once
+        pending = {d: t for d, t in zip(digests, texts) if d not in vectors}
+        if pending:
+            pending_digests = list(pending)
+            pending_texts = list(pending.values())
+            for batch in self._batches(pending_texts):
+                embedded = _normalize(np.asarray(
+                    self.backend.embed([pending_texts[i] for i in batch]),
+                    dtype=np.float32
+                ))
+                fresh = [(pending_digests[i], vector) for i, vector in zip(batch, embedded)]
+                vectors.update(fresh)
+                if self.cache is not None:
+                    self.cache.put_many(self.backend.name, fresh)
+
+            logger.debug(f"Embedded {len(pending)} of {len(texts)} texts with {self.backend.name}")
+
+        return np.stack([vectors[d] for d in digests])
+
+    def embed_text(self, text: str) -> np.ndarray:
+        """
+        Embed a single text.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            L2-normalised float32 vector
+        """
+        return self.embed_batch([text])[0]
+
+
+@lru_cache()
+def get_embedding_generator() -> EmbeddingGenerator:
+    """
+    Returns the process-wide generator for EMBEDDING_BACKEND.
+    """
+    backend_class = _BACKENDS.get(EMBEDDING_BACKEND)
+    if backend_class is None:
+        raise ValueError(f"Unknown embedding backend: {EMBEDDING_BACKEND}")
+    cache = get_embedding_cache() if EMBEDDING_CACHE_ENABLED else None
+    return EmbeddingGenerator(backend_class(), cache=cache)
+
+
+def embed_batch(texts: Sequence[str]) -> np.ndarray:
+    """
+    Embed several texts with the configured backend.
+
+    Args:
+        texts: Texts to embed
+
+    Returns:
+        float32 matrix of shape (len(texts), dim), rows L2-normalised
+    """
+    return get_embedding_generator().embed_batch(texts)
+
+
+def embed_text(text: str) -> np.ndarray:
+    """
+    Embed a single text with the configured backend.
+
+    Args:
+        text: Text to embed
+
+    Returns:
+        L2-normalised float32 vector
+    """
+    return get_embedding_generator().embed_text(text)
+
+
+def similarity(query: np.ndarray, embeddings: np.ndarray):
+    """
+    Cosine similarity of a query against one embedding or a whole matrix.
+
+    Args:
+        query: Query vector
+        embeddings: One vector, or a (n, dim) matrix of vectors
+
+    Returns:
+        float for a single vector, otherwise an (n,) array of scores
+    """
+    query = _normalize(np.asarray(query, dtype=np.float32).ravel())
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+
+    if embeddings.ndim == 1:
+        return float(_normalize(embeddings) @ query)
+    return _normalize(embeddings) @ query
@@ -0,0 +1,99 @@
+# embedding_cache.py - Embedding Cache
+#
+# Persistent cache of embeddings keyed by model and text content.
+
+"""
+Embedding Cache
+
+Stores embedding vectors in a SQLite database under MODEL_CACHE_DIR so
+that unchanged text (re-indexing a textbook, repeated queries) is never
+embedded twice by the same model.
+
+Key:
+- model name + sha256(text)
+
+Methods:
+- get_many(model, digests) -> Dict[str, np.ndarray]
+- put_many(model, items) -> None
+- clear() -> None
+- stats() -> dict
+
+Eviction:
+- Least-recently-used entries are dropped once the stored vectors exceed
+  EMBEDDING_CACHE_MAX_BYTES (see utils/sqlite_cache.py).
+"""
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from config import EMBEDDING_CACHE_MAX_BYTES
+from utils.sqlite_cache import SQLiteCache
+
+
+class EmbeddingCache(SQLiteCache):
+    """
+    Size-bounded LRU cache for float32 embeddings backed by SQLite.
+    Safe to share between threads of one process.
+    """
+
+    table = "embedding_cache"
+    value_column = "vector"
+    value_type = "BLOB"
+
+    def __init__(
+        self,
+        db_path: Optional[Union[str, Path]] = None,
+        max_bytes: int = EMBEDDING_CACHE_MAX_BYTES
+    ):
+        super().__init__(db_path, max_bytes)
+
+    @staticmethod
+    def _make_key(model: str, digest: str) -> str:
+        return f"{model}:{digest}"
+
+    def get_many(self, model: str, digests: Sequence[str]) -> Dict[str, np.ndarray]:
+        """
+        Look up cached embeddings.
+
+        Args:
+            model: Embedding model name
+            digests: SHA-256 digests of the texts
+
+        Returns:
+            Dict of digest -> vector for the digests that were cached
+        """
+        prefix = len(model) + 1
+        keys = [self._make_key(model, digest) for digest in dict.fromkeys(digests)]
+        found = {
+            key[prefix:]: np.frombuffer(blob, dtype=np.float32)
+            for key, blob in self._fetch(keys).items()
+        }
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, model: str, items: Iterable[Tuple[str, np.ndarray]]) -> None:
+        """
+        Store embeddings and evict old entries if over budget.
+
+        Args:
+            model: Embedding model that produced the vectors
+            items: (digest, vector) pairs
+        """
+        rows = []
+        for digest, vector in items:
+            blob = np.asarray(vector, dtype=np.float32).tobytes()
+            rows.append((self._make_key(model, digest), blob, len(blob)))
+        self._store(rows)
+
+
+@lru_cache()
+def get_embedding_cache() -> EmbeddingCache:
+    """
+    Returns the process-wide embedding cache instance.
+    """
+    return EmbeddingCache()
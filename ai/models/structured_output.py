@@ -0,0 +1,374 @@
+# structured_output.py - Structured LLM Output
+#
+# Extract, validate and repair JSON answers from LLMs.
+
+"""
+Structured Output
+
+Methods:
+- extract_json(text) -> Optional[dict]
+- validate_output(data, schema, bounds, defaults) -> dataclass instance
+- generate_structured(complete, prompt, schema, provider, model, ...) -> dataclass instance
+- get_output_stats() -> List[dict]
+
+JSONExtractor scans text once, character by character, and returns the
+first complete JSON object it finds. Code fences and chatter around the
+object are skipped, trailing commas are tolerated, and an object cut off
+by the token limit is closed at finish(). Because it keeps its scan
+position between feed() calls it also works on a streamed response.
+
+Validation coerces the object into a dataclass using its type hints and
+reports every problem at once. When extraction or validation fails,
+generate_structured() asks the model once to fix its own output, sending
+only the broken response and the problems instead of repeating the whole
+task, and raises StructuredOutputError if the repair fails too.
+
+Malformed, repaired and failed responses are counted per provider and model.
+"""
+
+import dataclasses
+import json
+import logging
+import re
+import threading
+import typing
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Type, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class StructuredOutputError(ValueError):
+    """LLM output could not be turned into the expected structure."""
+
+    def __init__(self, problems: List[str], raw: str = ""):
+        super().__init__("; ".join(problems))
+        self.problems = problems
+        self.raw = raw
+
+
+def _loads_lenient(candidate: str) -> Any:
+    try:
+        return json.loads(candidate)
+    except json.JSONDecodeError:
+        return json.loads(_TRAILING_COMMA.sub(r"\1", candidate))
+
+
+class JSONExtractor:
+    """
+    Incremental extractor for the first JSON object in a text stream.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._start: Optional[int] = None
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self.result: Optional[dict] = None
+
+    def feed(self, chunk: str) -> Optional[dict]:
+        """
+        Add text and continue scanning where the last call stopped.
+
+        Args:
+            chunk: Next piece of the response
+
+        Returns:
+            The object once it is complete, otherwise None
+        """
+        if self.result is not None:
+            return self.result
+        self._text += chunk
+        text = self._text
+
+        while self._pos < len(text):
+            char = text[self._pos]
+
+            if self._start is None:
+                if char == "{":
+                    self._start = self._pos
+                    self._stack = ["{"]
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in _CLOSERS:
+                self._stack.append(char)
+            elif char in "}]":
+                self._stack.pop()
+                if not self._stack:
+                    if self._accept(text[self._start:self._pos + 1]):
+                        return self.result
+                    # Not an object after all; look for one further on
+                    self._pos = self._start
+                    self._start = None
+
+            self._pos += 1
+
+        return None
+
+    def finish(self) -> Optional[dict]:
+        """
+        End of input: close an object truncated by the token limit.
+
+        Returns:
+            The extracted object, or None if the text holds none
+        """
+        if self.result is None and self._start is not None:
+            tail = self._text[self._start:]
+            if self._in_string:
+                tail += '"'
+            tail = tail.rstrip().rstrip(",:")
+            self._accept(tail + "".join(_CLOSERS[opener] for opener in reversed(self._stack)))
+        return self.result
+
+    def _accept(self, candidate: str) -> bool:
+        try:
+            value = _loads_lenient(candidate)
+        except json.JSONDecodeError:
+            return False
+        if isinstance(value, dict):
+            self.result = value
+            return True
+        return False
+
+
+def extract_json(text: str) -> Optional[dict]:
+    """
+    Extract the first JSON object from an LLM response.
+
+    Args:
+        text: Raw response text
+
+    Returns:
+        Parsed object or None
+    """
+    extractor = JSONExtractor()
+    return extractor.feed(text) or extractor.finish()
+
+
+def _coerce(value: Any, hint: Any, name: str, problems: List[str]) -> Any:
+    """Coerce a JSON value to a type hint, appending problems."""
+    origin = typing.get_origin(hint)
+    args = typing.get_args(hint)
+
+    if origin is typing.Union:
+        if value is None and type(None) in args:
+            return None
+        hint = next(arg for arg in args if arg is not type(None))
+        return _coerce(value, hint, name, problems)
+
+    if hint is float or hint is int:
+        if isinstance(value, bool) or value is None:
+            problems.append(f"{name} must be a number")
+            return None
+        try:
+            return hint(float(value)) if hint is int else float(value)
+        except (TypeError, ValueError):
+            problems.append(f"{name} must be a number, got {value!r}")
+            return None
+
+    if hint is str:
+        if isinstance(value, (dict, list)):
+            problems.append(f"{name} must be a string")
+            return None
+        return "" if value is None else str(value)
+
+    if origin in (list, List):
+        if value is None:
+            return []
+        if not isinstance(value, list):
+            # A lone item where a list was expected
+            value = [value]
+        item_hint = args[0] if args else Any
+        return [_coerce(item, item_hint, f"{name}[{i}]", problems) for i, item in enumerate(value)]
+
+    if origin in (dict, Dict):
+        if not isinstance(value, dict):
+            problems.append(f"{name} must be an object")
+            return None
+        return value
+
+    return value
+
+
+def validate_output(
+    data: Dict[str, Any],
+    schema: Type[T],
+    bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+    defaults: Optional[Dict[str, Any]] = None
+) -> T:
+    """
+    Validate a parsed object into a dataclass.
+
+    Args:
+        data: Parsed JSON object
+        schema: Target dataclass
+        bounds: Numeric fields to clamp, name -> (low, high)
+        defaults: Values for fields the model may omit; fields with
+            neither a default here nor in the dataclass are required
+
+    Returns:
+        schema instance
+
+    Raises:
+        StructuredOutputError: listing every problem found
+    """
+    hints = typing.get_type_hints(schema)
+    defaults = defaults or {}
+    bounds = bounds or {}
+    problems: List[str] = []
+    values: Dict[str, Any] = {}
+
+    for field in dataclasses.fields(schema):
+        if field.name in data:
+            value = _coerce(data[field.name], hints[field.name], field.name, problems)
+            if field.name in bounds and isinstance(value, (int, float)):
+                low, high = bounds[field.name]
+                value = min(max(value, low), high)
+            values[field.name] = value
+        elif field.name in defaults:
+            values[field.name] = defaults[field.name]
+        elif field.default is dataclasses.MISSING and field.default_factory is dataclasses.MISSING:
+            problems.append(f"missing field {field.name}")
+
+    if problems:
+        raise StructuredOutputError(problems)
+    return schema(**values)
+
+
+def describe_schema(schema: Type) -> str:
+    """JSON skeleton of a dataclass, used in repair prompts."""
+    names = {float: "<number>", int: "<integer>", str: "<string>"}
+    hints = typing.get_type_hints(schema)
+    shape = {}
+    for field in dataclasses.fields(schema):
+        hint = hints[field.name]
+        if typing.get_origin(hint) in (list, List):
+            shape[field.name] = [names.get(typing.get_args(hint)[0], "<object>")]
+        else:
+            shape[field.name] = names.get(hint, "<value>")
+    return json.dumps(shape, indent=2)
+
+
+class OutputStats:
+    """Thread-safe structured-output counters per (provider, model)."""
+
+    OUTCOMES = ("ok", "repaired", "failed")
+
+    def __init__(self):
+        self._counts: Dict[Tuple[str, str], Dict[str, int]] = defaultdict(lambda: dict.fromkeys(self.OUTCOMES, 0))
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, model: str, outcome: str) -> None:
+        with self._lock:
+            self._counts[(provider, model)][outcome] += 1
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = []
+            for (provider, model), counts in sorted(self._counts.items()):
+                total = sum(counts.values())
+                malformed = counts["repaired"] + counts["failed"]
+                rows.append({
+                    "provider": provider,
+                    "model": model,
+                    "requests": total,
+                    **counts,
+                    "malformed_rate": round(malformed / total, 4) if total else 0.0
+                })
+            return rows
+
+
+_stats = OutputStats()
+
+
+def get_output_stats() -> List[Dict[str, Any]]:
+    """
+    Structured-output outcomes per provider and model.
+
+    Returns:
+        Rows with requests, ok, repaired, failed and malformed_rate
+    """
+    return _stats.snapshot()
+
+
+def _parse(raw: str, schema: Type[T], bounds, defaults) -> T:
+    data = extract_json(raw or "")
+    if data is None:
+        raise StructuredOutputError(["response contains no JSON object"], raw)
+    try:
+        return validate_output(data, schema, bounds, defaults)
+    except StructuredOutputError as e:
+        e.raw = raw
+        raise
+
+
+async def generate_structured(
+    complete: Callable[[str], Awaitable[str]],
+    prompt: str,
+    schema: Type[T],
+    provider: str,
+    model: str,
+    bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+    defaults: Optional[Dict[str, Any]] = None
+) -> T:
+    """
+    Run a prompt and validate the answer, with one targeted repair.
+
+    Args:
+        complete: Async function sending a prompt to the model
+        prompt: Prompt asking for JSON
+        schema: Dataclass the answer must fit
+        provider: Provider name, for statistics
+        model: Model name, for statistics
+        bounds: Numeric fields to clamp
+        defaults: Values for optional fields
+
+    Returns:
+        schema instance
+
+    Raises:
+        StructuredOutputError: if the repaired answer is still invalid
+    """
+    raw = await complete(prompt)
+    try:
+        result = _parse(raw, schema, bounds, defaults)
+        _stats.record(provider, model, "ok")
+        return result
+    except StructuredOutputError as e:
+        problems = e.problems
+        logger.warning(f"Malformed {schema.__name__} from {provider}/{model}: {e}")
+
+    repair_prompt = f"""Your previous response could not be used.
+
+Problems:
+{chr(10).join(f"- {problem}" for problem in problems)}
+
+Previous response:
+{raw}
+
+Return only a corrected JSON object with this shape:
+{describe_schema(schema)}
+
+Keep the values from your previous response; do not redo the task."""
+
+    try:
+        result = _parse(await complete(repair_prompt), schema, bounds, defaults)
+    except StructuredOutputError:
+        _stats.record(provider, model, "failed")
+        raise
+    _stats.record(provider, model, "repaired")
+    return result
@@ -0,0 +1,127 @@
+# cache.py - OCR Result Cache
+#
+# Persistent cache of OCR results keyed by image content.
+
+"""
+OCR Cache
+
+Stores recognized text in a SQLite database under MODEL_CACHE_DIR so that
+byte-identical images (re-triggered analysis, duplicate uploads, retries)
+never hit a vision model twice.
+
+Key:
+- sha256(image bytes) + backend + prompt version
+
+Methods:
+- image_digest(image_bytes) -> str
+- get(digest, backend, prompt_version) -> Optional[str]
+- get_any(digest, backends, prompt_version) -> Optional[Tuple[str, str]]
+- put(digest, backend, prompt_version, text) -> None
+- clear() -> None
+- stats() -> dict
+
+Eviction:
+- Least-recently-used entries are dropped once the stored text exceeds
+  OCR_CACHE_MAX_BYTES (see utils/sqlite_cache.py).
+"""
+
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Sequence, Tuple, Union
+
+from config import OCR_CACHE_MAX_BYTES
+from utils.sqlite_cache import SQLiteCache
+
+
+def image_digest(image_bytes: Union[bytes, bytearray, memoryview]) -> str:
+    """Return the SHA-256 hex digest of raw image bytes."""
+    return hashlib.sha256(image_bytes).hexdigest()
+
+
+class OCRCache(SQLiteCache):
+    """
+    Size-bounded LRU cache for OCR results backed by SQLite.
+    Safe to share between threads and coroutines of one process.
+    """
+
+    table = "ocr_cache"
+    value_column = "text"
+
+    def __init__(
+        self,
+        db_path: Optional[Union[str, Path]] = None,
+        max_bytes: int = OCR_CACHE_MAX_BYTES
+    ):
+        super().__init__(db_path, max_bytes)
+
+    @staticmethod
+    def _make_key(digest: str, backend: str, prompt_version: str) -> str:
+        return f"{digest}:{backend}:{prompt_version}"
+
+    def get(self, digest: str, backend: str, prompt_version: str) -> Optional[str]:
+        """
+        Look up cached text for an image.
+
+        Args:
+            digest: SHA-256 of the image bytes
+            backend: OCR backend name (openai, anthropic, tesseract)
+            prompt_version: Version of the prompt used for recognition
+
+        Returns:
+            Cached text or None on a miss
+        """
+        found = self.get_any(digest, [backend], prompt_version)
+        return found[1] if found else None
+
+    def get_any(
+        self,
+        digest: str,
+        backends: Sequence[str],
+        prompt_version: str
+    ) -> Optional[Tuple[str, str]]:
+        """
+        Look up cached text from the first of several backends that has it.
+        Counts as one hit or one miss.
+
+        Args:
+            digest: SHA-256 of the image bytes
+            backends: Backend names in preference order
+            prompt_version: Version of the prompt used for recognition
+
+        Returns:
+            (backend, text) or None on a miss
+        """
+        keys = [self._make_key(digest, backend, prompt_version) for backend in backends]
+        if not keys:
+            return None
+
+        rows = self._fetch(keys)
+        for backend, key in zip(backends, keys):
+            if key in rows:
+                self.hits += 1
+                return backend, rows[key]
+
+        self.misses += 1
+        return None
+
+    def put(self, digest: str, backend: str, prompt_version: str, text: str) -> None:
+        """
+        Store recognized text and evict old entries if over budget.
+
+        Args:
+            digest: SHA-256 of the image bytes
+            backend: OCR backend that produced the text
+            prompt_version: Version of the prompt used for recognition
+            text: Recognized text
+        """
+        key = self._make_key(digest, backend, prompt_version)
+        self._store([(key, text, len(text.encode("utf-8")))])
+
+
+@lru_cache()
+def get_ocr_cache() -> OCRCache:
+    """
+    Returns the process-wide OCR cache instance.
+    """
+    return OCRCache()
@@ -6,16 +6,216 @@
 Text Extractor
 
 Methods:
-- extract_from_image(image_path) -> str
-- extract_from_pdf(pdf_path) -> List[str]
-- extract_batch(image_paths) -> List[str]
+- extract_from_image(image) -> str
+- extract_from_pdf(pdf) -> List[str]
+- extract_from_pdf_url(url) -> List[str]
+- stream_pdf(pdf) -> AsyncIterator[PageText]
+- extract_batch(images) -> List[str]
 
 Supports:
-- Tesseract OCR (local)
-- Google Vision API (cloud)
-- Handwriting recognition
+- Handwriting recognition (vision models with Tesseract fallback)
+- Multi-page PDF submissions
+
+PDF pages are rendered lazily, one at a time, only when a concurrency
+slot frees up, and OCR'd in parallel with at most OCR_PDF_CONCURRENCY
+pages in flight. Results are yielded strictly in page order as soon as
+every earlier page is done, so a long PDF finishes in roughly the time
+of its slowest page rather than the sum of all pages.
 """
 
-# TODO: Implement Tesseract OCR extraction
+import asyncio
+import io
+import logging
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Sequence
+
+# pypdfium2 renders PDF pages to images (installed with pdfplumber)
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    PDFIUM_AVAILABLE = False
+
+from config import OCR_PDF_CONCURRENCY, OCR_PDF_MAX_PAGES, OCR_PDF_RENDER_SCALE
+from ocr.handwriting import HandwritingRecognizer, ImageBytes, ImageInput
+from utils.http_client import download_bytes
+
+logger = logging.getLogger(__name__)
+
 # TODO: Implement Google Vision API fallback
 # TODO: Add image preprocessing
+
+
+@dataclass
+class PageText:
+    """OCR result for a single PDF page."""
+    page_number: int
+    text: str
+
+
+class TextExtractor:
+    """
+    Extracts text from submission images and multi-page PDFs.
+    Delegates per-image recognition to HandwritingRecognizer.
+    """
+
+    def __init__(
+        self,
+        recognizer: Optional[HandwritingRecognizer] = None,
+        max_concurrency: int = OCR_PDF_CONCURRENCY
+    ):
+        self.recognizer = recognizer or HandwritingRecognizer()
+        self.max_concurrency = max(1, max_concurrency)
+
+    async def extract_from_image(self, image: ImageInput) -> str:
+        """
+        Extract text from a single image.
+
+        Args:
+            image: Path to image file, or raw image bytes
+
+        Returns:
+            Extracted text
+        """
+        return await self.recognizer.recognize(image)
+
+    async def extract_batch(self, images: Sequence[ImageInput]) -> List[str]:
+        """
+        Extract text from several images concurrently.
+
+        Args:
+            images: Image paths or raw image bytes
+
+        Returns:
+            Extracted text for each image, in input order
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _extract(image: ImageInput) -> str:
+            async with semaphore:
+                return await self.extract_from_image(image)
+
+        return list(await asyncio.gather(*(_extract(image) for image in images)))
+
+    def _render_pages(self, pdf: ImageInput) -> Iterator[bytes]:
+        """
+        Lazily render PDF pages to PNG bytes, one page per iteration.
+
+        Only the page currently being rendered is held in memory.
+        """
+        if not PDFIUM_AVAILABLE:
+            raise RuntimeError("pypdfium2 is required for PDF OCR")
+
+        if isinstance(pdf, (bytearray, memoryview)):
+            pdf = bytes(pdf)
+
+        document = pdfium.PdfDocument(pdf)
+        try:
+            page_count = len(document)
+            if page_count > OCR_PDF_MAX_PAGES:
+                logger.warning(
+                    f"PDF has {page_count} pages, only the first {OCR_PDF_MAX_PAGES} will be processed"
+                )
+
+            for index in range(min(page_count, OCR_PDF_MAX_PAGES)):
+                page = document[index]
+                try:
+                    image = page.render(scale=OCR_PDF_RENDER_SCALE).to_pil()
+                    buffer = io.BytesIO()
+                    image.save(buffer, format="PNG")
+                    yield buffer.getvalue()
+                finally:
+                    page.close()
+        finally:
+            document.close()
+
+    async def stream_pdf(self, pdf: ImageInput) -> AsyncIterator[PageText]:
+        """
+        OCR a PDF page by page, yielding results in page order.
+
+        Args:
+            pdf: Path to PDF file, or raw PDF bytes
+
+        Yields:
+            PageText for each page, in order, as soon as it is ready
+        """
+        pages = self._render_pages(pdf)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks: Dict[int, asyncio.Task] = {}
+        next_page = 1
+
+        async def _ocr_page(page_number: int, image_bytes: ImageBytes) -> PageText:
+            try:
+                text = await self.recognizer.recognize(image_bytes)
+            except Exception as e:
+                logger.error(f"OCR failed for page {page_number}: {e}")
+                text = ""
+            finally:
+                semaphore.release()
+            return PageText(page_number=page_number, text=text)
+
+        render: Optional[asyncio.Task] = None
+        try:
+            page_number = 0
+            while True:
+                await semaphore.acquire()
+
+                # Yield whatever leading pages finished while we were waiting
+                while next_page in tasks and tasks[next_page].done():
+                    yield tasks.pop(next_page).result()
+                    next_page += 1
+
+                # Render in a worker thread; pages are rendered sequentially
+                # since pdfium is not safe for concurrent use. Shielded, so
+                # a cancelled consumer leaves the render to finish.
+                render = asyncio.ensure_future(asyncio.to_thread(next, pages, None))
+                image_bytes = await asyncio.shield(render)
+                if image_bytes is None:
+                    semaphore.release()
+                    break
+
+                page_number += 1
+                tasks[page_number] = asyncio.create_task(_ocr_page(page_number, image_bytes))
+
+            while next_page in tasks:
+                yield await tasks.pop(next_page)
+                next_page += 1
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            if render is not None and not render.done():
+                # The generator is still executing in the worker thread;
+                # close it (and the pdfium document) once the page is done.
+                def _close(finished: asyncio.Future) -> None:
+                    if not finished.cancelled():
+                        finished.exception()
+                    pages.close()
+
+                render.add_done_callback(_close)
+            else:
+                pages.close()
+
+    async def extract_from_pdf(self, pdf: ImageInput) -> List[str]:
+        """
+        Extract text from every page of a PDF.
+
+        Args:
+            pdf: Path to PDF file, or raw PDF bytes
+
+        Returns:
+            List of page texts, in page order
+        """
+        return [page.text async for page in self.stream_pdf(pdf)]
+
+    async def extract_from_pdf_url(self, pdf_url: str) -> List[str]:
+        """
+        Download a PDF submission and extract text from every page.
+
+        Args:
+            pdf_url: URL of the PDF
+
+        Returns:
+            List of page texts, in page order
+        """
+        pdf_bytes, _ = await download_bytes(pdf_url)
+        return await self.extract_from_pdf(pdf_bytes)
@@ -12,23 +12,38 @@ Methods:
 - detect_language(image) -> str
 - confidence_score(image) -> float
 - extract_from_url(url) -> dict
+
+Results are cached by image content hash (see ocr/cache.py), so repeat
+analyses of the same image skip the vision call entirely.
+
+Each vision provider has a circuit breaker (utils/circuit_breaker.py):
+providers that are failing or slow are skipped until they recover, and
+every call is bounded by OCR_PROVIDER_TIMEOUT_SECONDS. With
+OCR_HEDGE_ENABLED the second provider is started as well once the first
+has run longer than its recent p95 latency; whichever answers first wins
+and the other is cancelled, which aborts its HTTP request (the async SDK
+clients are used for that) and counts as a slow call on its breaker.
+Breaker states are reported by GET /health.
 """
 
+import asyncio
 import base64
+import io
 import logging
-from typing import Optional, Tuple
+import time
+from typing import Awaitable, Callable, Optional, Tuple, List, Union
 from pathlib import Path
 
 # OpenAI for GPT-4 Vision
 try:
-    from openai import OpenAI
+    from openai import AsyncOpenAI
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
 
 # Anthropic for Claude Vision
 try:
-    from anthropic import Anthropic
+    from anthropic import AsyncAnthropic
     ANTHROPIC_AVAILABLE = True
 except ImportError:
     ANTHROPIC_AVAILABLE = False
@@ -41,10 +56,35 @@ try:
 except ImportError:
     TESSERACT_AVAILABLE = False
 
-from ai.config import settings
+from config import (
+    ANTHROPIC_API_KEY,
+    OCR_CACHE_ENABLED,
+    OCR_HEDGE_DEFAULT_DELAY_SECONDS,
+    OCR_HEDGE_ENABLED,
+    OCR_HEDGE_MIN_DELAY_SECONDS,
+    OCR_PROVIDER_TIMEOUT_SECONDS,
+    OPENAI_API_KEY,
+)
+from ocr.cache import get_ocr_cache, image_digest
+from utils.circuit_breaker import get_circuit_breaker
+from utils.http_client import download_bytes
 
 logger = logging.getLogger(__name__)
 
+ImageBytes = Union[bytes, bytearray, memoryview]
+ImageInput = Union[str, Path, ImageBytes]
+
+# Bump OCR_PROMPT_VERSION whenever OCR_PROMPT changes so cached results
+# produced with the old prompt are no longer served.
+OCR_PROMPT = "Please extract and transcribe all handwritten text from this image. Return only the extracted text, preserving line breaks where appropriate."
+OCR_PROMPT_VERSION = "v1"
+
+VisionCall = Callable[[ImageBytes, str], Awaitable[str]]
+
+
+class ProviderUnavailableError(RuntimeError):
+    """A provider's circuit breaker refused the call."""
+
 
 class HandwritingRecognizer:
     """
@@ -53,22 +93,36 @@ class HandwritingRecognizer:
     Fallback: Tesseract OCR
     """
 
-    def __init__(self):
+    def __init__(self, hedge: bool = OCR_HEDGE_ENABLED):
         self.openai_client = None
         self.anthropic_client = None
+        self.cache = get_ocr_cache() if OCR_CACHE_ENABLED else None
+        self.hedge = hedge
 
-        if OPENAI_AVAILABLE and settings.openai_api_key:
-            self.openai_client = OpenAI(api_key=settings.openai_api_key)
+        if OPENAI_AVAILABLE and OPENAI_API_KEY:
+            self.openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
             logger.info("OpenAI client initialized")
 
-        if ANTHROPIC_AVAILABLE and settings.anthropic_api_key:
-            self.anthropic_client = Anthropic(api_key=settings.anthropic_api_key)
+        if ANTHROPIC_AVAILABLE and ANTHROPIC_API_KEY:
+            self.anthropic_client = AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
             logger.info("Anthropic client initialized")
 
-    def _encode_image(self, image_path: str) -> str:
-        """Encode image to base64."""
-        with open(image_path, "rb") as f:
-            return base64.b64encode(f.read()).decode("utf-8")
+    def _load_image(self, image: ImageInput) -> Tuple[ImageBytes, str]:
+        """
+        Resolve an image argument to raw bytes and a MIME type.
+
+        Paths are read once; in-memory buffers are used as-is without copying.
+        """
+        if isinstance(image, (bytes, bytearray, memoryview)):
+            return image, self._sniff_mime_type(image)
+
+        with open(image, "rb") as f:
+            data = f.read()
+        return data, self._get_mime_type(str(image))
+
+    def _encode_image(self, image_bytes: ImageBytes) -> str:
+        """Encode image bytes to base64."""
+        return base64.b64encode(image_bytes).decode("utf-8")
 
     def _get_mime_type(self, image_path: str) -> str:
         """Get MIME type from file extension."""
@@ -82,45 +136,182 @@ class HandwritingRecognizer:
         }
         return mime_types.get(ext, "image/jpeg")
 
-    async def recognize(self, image_path: str) -> str:
+    def _sniff_mime_type(self, image_bytes: ImageBytes) -> str:
+        """Get MIME type from the image's magic bytes."""
+        header = bytes(image_bytes[:12])
+        if header.startswith(b"\x89PNG"):
+            return "image/png"
+        if header.startswith((b"GIF87a", b"GIF89a")):
+            return "image/gif"
+        if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+            return "image/webp"
+        return "image/jpeg"
+
+    async def recognize(self, image: ImageInput) -> str:
         """
         Recognize handwritten text from an image.
 
         Args:
-            image_path: Path to image file
+            image: Path to image file, or raw image bytes already in memory
 
         Returns:
             Extracted text
         """
-        # Try OpenAI GPT-4 Vision first
-        if self.openai_client:
-            try:
-                return await self._recognize_with_openai(image_path)
-            except Exception as e:
-                logger.warning(f"OpenAI OCR failed: {e}")
+        image_bytes, mime_type = self._load_image(image)
+
+        digest = None
+        if self.cache:
+            digest = image_digest(image_bytes)
+            cached = await self._get_cached(digest)
+            if cached is not None:
+                return cached
 
-        # Try Anthropic Claude Vision
+        # Vision providers in preference order; breakers are asked per call
+        providers: List[Tuple[str, VisionCall]] = []
+        if self.openai_client:
+            providers.append(("openai", self._recognize_with_openai))
         if self.anthropic_client:
+            providers.append(("anthropic", self._recognize_with_anthropic))
+
+        if self.hedge and len(providers) >= 2:
+            result = await self._recognize_hedged(providers[0], providers[1], image_bytes, mime_type)
+            if result is not None:
+                backend, text = result
+                await self._store_cached(digest, backend, text)
+                return text
+            providers = providers[2:]
+
+        for backend, call in providers:
             try:
-                return await self._recognize_with_anthropic(image_path)
+                text = await self._call_provider(backend, call, image_bytes, mime_type)
+                await self._store_cached(digest, backend, text)
+                return text
             except Exception as e:
-                logger.warning(f"Anthropic OCR failed: {e}")
+                logger.warning(f"{backend} OCR failed: {e!r}")
 
         # Fallback to Tesseract
         if TESSERACT_AVAILABLE:
             try:
-                return await self._recognize_with_tesseract(image_path)
+                text = await self._recognize_with_tesseract(image_bytes)
+                await self._store_cached(digest, "tesseract", text)
+                return text
             except Exception as e:
                 logger.error(f"Tesseract OCR failed: {e}")
 
         return ""
 
-    async def _recognize_with_openai(self, image_path: str) -> str:
+    async def _call_provider(
+        self,
+        backend: str,
+        call: VisionCall,
+        image_bytes: ImageBytes,
+        mime_type: str
+    ) -> str:
+        """Run one provider call under its timeout and record the outcome on its breaker."""
+        breaker = get_circuit_breaker(backend)
+        if not breaker.allow():
+            raise ProviderUnavailableError(f"{backend} circuit breaker is open")
+        start = time.monotonic()
+        try:
+            text = await asyncio.wait_for(call(image_bytes, mime_type), OCR_PROVIDER_TIMEOUT_SECONDS)
+        except asyncio.CancelledError:
+            breaker.cancel()
+            raise
+        except Exception:
+            breaker.record(time.monotonic() - start, ok=False)
+            raise
+        breaker.record(time.monotonic() - start, ok=True)
+        return text
+
+    async def _recognize_hedged(
+        self,
+        primary: Tuple[str, VisionCall],
+        secondary: Tuple[str, VisionCall],
+        image_bytes: ImageBytes,
+        mime_type: str
+    ) -> Optional[Tuple[str, str]]:
+        """
+        Race two providers: start the secondary once the primary runs past
+        its p95 latency (or fails), keep the first success, cancel the other
+        and record it on its breaker as abandoned (a slow call).
+
+        Returns:
+            (backend, text), or None if both failed
+        """
+        p95 = get_circuit_breaker(primary[0]).p95()
+        delay = max(OCR_HEDGE_MIN_DELAY_SECONDS, p95 if p95 is not None else OCR_HEDGE_DEFAULT_DELAY_SECONDS)
+
+        tasks = {asyncio.create_task(self._call_provider(*primary, image_bytes, mime_type)): primary[0]}
+        started = {backend: time.monotonic() for backend in tasks.values()}
+        hedged = False
+        won = False
+
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            while True:
+                for task in done:
+                    backend = tasks.pop(task)
+                    if task.exception() is None:
+                        won = True
+                        return backend, task.result()
+                    logger.warning(f"{backend} OCR failed: {task.exception()!r}")
+
+                # Primary is past its p95 or already failed: bring in the secondary
+                if not hedged:
+                    hedged = True
+                    if tasks:
+                        logger.info(f"Hedging {primary[0]} OCR with {secondary[0]} after {delay:.1f}s")
+                    task = asyncio.create_task(self._call_provider(*secondary, image_bytes, mime_type))
+                    tasks[task] = secondary[0]
+                    started[secondary[0]] = time.monotonic()
+
+                if not tasks:
+                    return None
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task, backend in tasks.items():
+                task.cancel()
+                if won:
+                    get_circuit_breaker(backend).abandon(time.monotonic() - started[backend])
+
+    def _available_backends(self) -> List[str]:
+        """Backends in the order recognize() tries them."""
+        backends = []
+        if self.openai_client:
+            backends.append("openai")
+        if self.anthropic_client:
+            backends.append("anthropic")
+        if TESSERACT_AVAILABLE:
+            backends.append("tesseract")
+        return backends
+
+    async def _get_cached(self, digest: str) -> Optional[str]:
+        """
+        Return a cached result from the most preferred backend, if any.
+        The SQLite lookup runs in a worker thread, off the event loop.
+        """
+        cached = await asyncio.to_thread(
+            self.cache.get_any, digest, self._available_backends(), OCR_PROMPT_VERSION
+        )
+        if cached is None:
+            return None
+        backend, text = cached
+        logger.debug(f"OCR cache hit ({backend}) for {digest[:12]}")
+        return text
+
+    async def _store_cached(self, digest: Optional[str], backend: str, text: str) -> None:
+        """Cache a non-empty recognition result (in a worker thread)."""
+        if self.cache and digest and text:
+            try:
+                await asyncio.to_thread(self.cache.put, digest, backend, OCR_PROMPT_VERSION, text)
+            except Exception as e:
+                logger.warning(f"OCR cache write failed: {e}")
+
+    async def _recognize_with_openai(self, image_bytes: ImageBytes, mime_type: str) -> str:
         """Use GPT-4 Vision for handwriting recognition."""
-        base64_image = self._encode_image(image_path)
-        mime_type = self._get_mime_type(image_path)
+        base64_image = self._encode_image(image_bytes)
 
-        response = self.openai_client.chat.completions.create(
+        response = await self.openai_client.chat.completions.create(
             model="gpt-4o",
             messages=[
                 {
@@ -128,7 +319,7 @@ class HandwritingRecognizer:
                     "content": [
                         {
                             "type": "text",
-                            "text": "Please extract and transcribe all handwritten text from this image. Return only the extracted text, preserving line breaks where appropriate."
+                            "text": OCR_PROMPT
                         },
                         {
                             "type": "image_url",
@@ -144,12 +335,11 @@ class HandwritingRecognizer:
 
         return response.choices[0].message.content
 
-    async def _recognize_with_anthropic(self, image_path: str) -> str:
+    async def _recognize_with_anthropic(self, image_bytes: ImageBytes, mime_type: str) -> str:
         """Use Claude Vision for handwriting recognition."""
-        base64_image = self._encode_image(image_path)
-        mime_type = self._get_mime_type(image_path)
+        base64_image = self._encode_image(image_bytes)
 
-        response = self.anthropic_client.messages.create(
+        response = await self.anthropic_client.messages.create(
             model="claude-sonnet-4-20250514",
             max_tokens=2000,
             messages=[
@@ -166,7 +356,7 @@ class HandwritingRecognizer:
                         },
                         {
                             "type": "text",
-                            "text": "Please extract and transcribe all handwritten text from this image. Return only the extracted text, preserving line breaks where appropriate."
+                            "text": OCR_PROMPT
                         }
                     ]
                 }
@@ -175,26 +365,26 @@ class HandwritingRecognizer:
 
         return response.content[0].text
 
-    async def _recognize_with_tesseract(self, image_path: str) -> str:
+    async def _recognize_with_tesseract(self, image_bytes: ImageBytes) -> str:
         """Use Tesseract OCR as fallback."""
-        image = Image.open(image_path)
+        image = Image.open(io.BytesIO(image_bytes))
         text = pytesseract.image_to_string(image)
         return text.strip()
 
     async def recognize_with_confidence(
         self,
-        image_path: str
+        image: ImageInput
     ) -> Tuple[str, float]:
         """
         Recognize text and return confidence score.
 
         Args:
-            image_path: Path to image file
+            image: Path to image file, or raw image bytes
 
         Returns:
             Tuple of (extracted text, confidence score 0-1)
         """
-        text = await self.recognize(image_path)
+        text = await self.recognize(image)
 
         # Calculate simple confidence based on text quality
         if not text:
@@ -224,27 +414,18 @@ class HandwritingRecognizer:
 
         Returns:
             Dict with extracted_text, confidence, and metadata
-        """
-        import httpx
-        import tempfile
-
-        # Download image
-        async with httpx.AsyncClient() as client:
-            response = await client.get(image_url)
-            response.raise_for_status()
 
-        # Save to temp file
-        with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as f:
-            f.write(response.content)
-            temp_path = f.name
-
-        try:
-            text, confidence = await self.recognize_with_confidence(temp_path)
-            return {
-                "extracted_text": text,
-                "confidence": confidence,
-                "source_url": image_url,
-                "word_count": len(text.split()) if text else 0
-            }
-        finally:
-            Path(temp_path).unlink(missing_ok=True)
+        Raises:
+            DownloadTooLargeError: If the image exceeds MAX_DOWNLOAD_BYTES
+        """
+        # Stream straight into memory; recognition works on the buffer
+        # directly, so there is no temp file round trip.
+        image_bytes, _ = await download_bytes(image_url)
+
+        text, confidence = await self.recognize_with_confidence(image_bytes)
+        return {
+            "extracted_text": text,
+            "confidence": confidence,
+            "source_url": image_url,
+            "word_count": len(text.split()) if text else 0
+        }
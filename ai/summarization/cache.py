@@ -0,0 +1,93 @@
+# cache.py - Summary Cache
+#
+# Persistent cache of per-submission key points keyed by text content.
+
+"""
+Summary Cache
+
+Stores the key points extracted from a submission in a SQLite database
+under MODEL_CACHE_DIR, so re-summarizing a class only calls the LLM for
+new or changed submissions.
+
+Key:
+- model name + prompt version + sha256(text)
+
+Methods:
+- get(digest, model, prompt_version) -> Optional[str]
+- put(digest, model, prompt_version, value) -> None
+- clear() -> None
+- stats() -> dict
+
+Eviction:
+- Least-recently-used entries are dropped once the stored values exceed
+  SUMMARY_CACHE_MAX_BYTES (see utils/sqlite_cache.py).
+"""
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Union
+
+from config import SUMMARY_CACHE_MAX_BYTES
+from utils.sqlite_cache import SQLiteCache
+
+
+class SummaryCache(SQLiteCache):
+    """
+    Size-bounded LRU cache for summarization results backed by SQLite.
+    Safe to share between threads and coroutines of one process.
+    """
+
+    table = "summary_cache"
+    value_column = "value"
+
+    def __init__(
+        self,
+        db_path: Optional[Union[str, Path]] = None,
+        max_bytes: int = SUMMARY_CACHE_MAX_BYTES
+    ):
+        super().__init__(db_path, max_bytes)
+
+    @staticmethod
+    def _make_key(digest: str, model: str, prompt_version: str) -> str:
+        return f"{model}:{prompt_version}:{digest}"
+
+    def get(self, digest: str, model: str, prompt_version: str) -> Optional[str]:
+        """
+        Look up a cached result.
+
+        Args:
+            digest: SHA-256 of the summarized text
+            model: Model that produced the result
+            prompt_version: Version of the prompt used
+
+        Returns:
+            Cached value or None on a miss
+        """
+        key = self._make_key(digest, model, prompt_version)
+        value = self._fetch([key]).get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, digest: str, model: str, prompt_version: str, value: str) -> None:
+        """
+        Store a result and evict old entries if over budget.
+
+        Args:
+            digest: SHA-256 of the summarized text
+            model: Model that produced the result
+            prompt_version: Version of the prompt used
+            value: Serialized result
+        """
+        key = self._make_key(digest, model, prompt_version)
+        self._store([(key, value, len(value.encode("utf-8")))])
+
+
+@lru_cache()
+def get_summary_cache() -> SummaryCache:
+    """
+    Returns the process-wide summary cache instance.
+    """
+    return SummaryCache()
@@ -15,8 +15,336 @@ ClassSummary:
 - overall_performance: str
 - common_issues: List[str]
 - recommendations: List[str]
+- submission_count: int
+
+Class summaries are map-reduce:
+1. Map: key points of every submission, extracted concurrently and cached
+   by content hash, so re-summarizing a class only pays for new or
+   changed submissions.
+2. Reduce: groups of SUMMARY_FAN_IN key-point lists are merged into
+   partial summaries, then groups of partials are merged again, until one
+   summary is left. All merges of a level run concurrently, so latency
+   grows with log(class size) rather than class size.
+
+At most SUMMARY_CONCURRENCY LLM calls are in flight at once.
 """
 
-# TODO: Implement text summarization with LLM
-# TODO: Implement class-level summaries
-# TODO: Extract key points
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+from typing import List, Optional, Sequence, Type, TypeVar
+
+# OpenAI
+try:
+    from openai import OpenAI
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+# Anthropic
+try:
+    from anthropic import Anthropic
+    ANTHROPIC_AVAILABLE = True
+except ImportError:
+    ANTHROPIC_AVAILABLE = False
+
+from config import (
+    ANTHROPIC_API_KEY,
+    OPENAI_API_KEY,
+    SUMMARY_CACHE_ENABLED,
+    SUMMARY_CONCURRENCY,
+    SUMMARY_FAN_IN,
+)
+from models.structured_output import generate_structured
+from summarization.cache import SummaryCache, get_summary_cache
+from utils.text_utils import text_digest
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Bump when the key-point prompt changes so cached results are not reused
+KEY_POINTS_PROMPT_VERSION = "key-points-v1"
+
+# Long submissions are cut before extracting key points
+_MAX_SUBMISSION_CHARS = 8000
+
+
+@dataclass
+class ClassSummary:
+    """Summary of a class's submissions for one homework."""
+    overall_performance: str
+    common_issues: List[str] = field(default_factory=list)
+    recommendations: List[str] = field(default_factory=list)
+    submission_count: int = 0
+
+
+@dataclass
+class KeyPoints:
+    """Key points of one submission."""
+    key_points: List[str]
+
+
+class Summarizer:
+    """
+    LLM summarizer with cached key points and tree-merged class summaries.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[SummaryCache] = None,
+        fan_in: int = SUMMARY_FAN_IN,
+        concurrency: int = SUMMARY_CONCURRENCY
+    ):
+        self.cache = cache
+        self.fan_in = max(2, fan_in)
+        self.concurrency = max(1, concurrency)
+        self.openai_client = None
+        self.anthropic_client = None
+
+        if OPENAI_AVAILABLE and OPENAI_API_KEY:
+            self.openai_client = OpenAI(api_key=OPENAI_API_KEY)
+
+        if ANTHROPIC_AVAILABLE and ANTHROPIC_API_KEY:
+            self.anthropic_client = Anthropic(api_key=ANTHROPIC_API_KEY)
+
+    @property
+    def model_name(self) -> str:
+        """Model that produces cached key points (part of the cache key)."""
+        if self.openai_client:
+            return "gpt-4o-mini"
+        if self.anthropic_client:
+            return "claude-sonnet-4-20250514"
+        return ""
+
+    @property
+    def available(self) -> bool:
+        return bool(self.model_name)
+
+    async def _complete(self, prompt: str, max_tokens: int = 500, json_output: bool = False) -> str:
+        """Run one completion off the event loop."""
+        if self.openai_client:
+            kwargs = {"response_format": {"type": "json_object"}} if json_output else {}
+            response = await asyncio.to_thread(
+                self.openai_client.chat.completions.create,
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": "You summarize student work for teachers."},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=max_tokens,
+                **kwargs
+            )
+            return response.choices[0].message.content
+
+        if json_output:
+            prompt += "\n\nRespond ONLY with valid JSON, no other text."
+        response = await asyncio.to_thread(
+            self.anthropic_client.messages.create,
+            model="claude-sonnet-4-20250514",
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        return response.content[0].text
+
+    async def _structured(self, prompt: str, schema: Type[T], max_tokens: int, **kwargs) -> T:
+        """Prompt for JSON and validate it into schema (one repair retry)."""
+        provider = "openai" if self.openai_client else "anthropic"
+        return await generate_structured(
+            partial(self._complete, max_tokens=max_tokens, json_output=True),
+            prompt,
+            schema,
+            provider,
+            self.model_name,
+            **kwargs
+        )
+
+    async def summarize_submission(self, text: str) -> str:
+        """
+        Summarize one submission in a few sentences.
+
+        Args:
+            text: Submission text
+
+        Returns:
+            Summary text
+        """
+        if not self.available:
+            return "AI summarization unavailable."
+        return await self._complete(
+            f"Summarize this homework submission in 2-3 sentences:\n\n{text[:_MAX_SUBMISSION_CHARS]}",
+            max_tokens=200
+        )
+
+    async def summarize_textbook_page(self, text: str) -> str:
+        """
+        Summarize the content of a textbook page.
+
+        Args:
+            text: Page text
+
+        Returns:
+            Summary text
+        """
+        if not self.available:
+            return "AI summarization unavailable."
+        return await self._complete(
+            f"Summarize the key concepts on this textbook page in 2-3 sentences:\n\n{text}",
+            max_tokens=200
+        )
+
+    async def extract_key_points(self, text: str) -> List[str]:
+        """
+        Key points of a submission, cached by content hash.
+
+        Args:
+            text: Submission text
+
+        Returns:
+            Short key points: what was done, what went wrong
+        """
+        if not text.strip() or not self.available:
+            return []
+
+        digest = text_digest(text)
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get, digest, self.model_name, KEY_POINTS_PROMPT_VERSION)
+            if cached is not None:
+                return json.loads(cached)
+
+        result = await self._structured(
+            f"""List the key points of this homework submission for a teacher: what the student
+got right, what is wrong or missing, and any misconceptions.
+
+Submission:
+{text[:_MAX_SUBMISSION_CHARS]}
+
+Respond in JSON format:
+{{"key_points": ["<short point>", ...]}}""",
+            KeyPoints,
+            max_tokens=300
+        )
+        points = result.key_points
+
+        if self.cache is not None:
+            await asyncio.to_thread(
+                self.cache.put, digest, self.model_name, KEY_POINTS_PROMPT_VERSION, json.dumps(points)
+            )
+        return points
+
+    async def summarize_class_submissions(self, submissions: Sequence[str]) -> ClassSummary:
+        """
+        Summarize how a class did on a homework.
+
+        Args:
+            submissions: Submission texts, one per student
+
+        Returns:
+            ClassSummary
+        """
+        if not submissions:
+            return ClassSummary("No submissions yet.")
+        if not self.available:
+            return ClassSummary("AI summarization unavailable.", submission_count=len(submissions))
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(coro):
+            async with semaphore:
+                return await coro
+
+        # Map: per-submission key points
+        key_points = await asyncio.gather(*(bounded(self.extract_key_points(text)) for text in submissions))
+
+        # First reduce level: groups of key-point lists -> partial summaries
+        groups = [
+            list(enumerate(key_points[start:start + self.fan_in], start=start + 1))
+            for start in range(0, len(key_points), self.fan_in)
+        ]
+        partials = await asyncio.gather(*(bounded(self._summarize_group(group)) for group in groups))
+
+        # Further levels: merge partials fan_in at a time until one is left
+        while len(partials) > 1:
+            partials = await asyncio.gather(*(
+                bounded(self._merge_partials(partials[start:start + self.fan_in]))
+                for start in range(0, len(partials), self.fan_in)
+            ))
+
+        return partials[0]
+
+    async def _summarize_group(self, group: List[tuple]) -> ClassSummary:
+        """Summarize the key points of a group of submissions."""
+        listing = "\n".join(
+            f"Submission {number}:\n" + "\n".join(f"- {point}" for point in points or ["(no readable content)"])
+            for number, points in group
+        )
+        return await self._request_summary(
+            f"Key points of {len(group)} student submissions for the same homework:\n\n{listing}",
+            len(group)
+        )
+
+    async def _merge_partials(self, partials: List[ClassSummary]) -> ClassSummary:
+        """Merge partial summaries of disjoint groups of submissions."""
+        if len(partials) == 1:
+            return partials[0]
+        count = sum(partial.submission_count for partial in partials)
+        listing = "\n\n".join(
+            f"Group of {partial.submission_count} submissions:\n"
+            f"Performance: {partial.overall_performance}\n"
+            f"Issues: {json.dumps(partial.common_issues)}\n"
+            f"Recommendations: {json.dumps(partial.recommendations)}"
+            for partial in partials
+        )
+        return await self._request_summary(
+            f"Partial summaries of {count} student submissions for the same homework. "
+            f"Merge them, weighting each by its group size:\n\n{listing}",
+            count
+        )
+
+    async def _request_summary(self, material: str, count: int) -> ClassSummary:
+        return await self._structured(
+            f"""{material}
+
+Summarize the class's performance for the teacher. Keep issues that affect
+many students, drop one-offs when space is short.
+
+Respond in JSON format:
+{{
+    "overall_performance": "<2-3 sentences>",
+    "common_issues": ["<issue shared by several students>", ...],
+    "recommendations": ["<what to review or reteach>", ...]
+}}""",
+            ClassSummary,
+            max_tokens=600,
+            defaults={"submission_count": count}
+        )
+
+
+@lru_cache()
+def get_summarizer() -> Summarizer:
+    """
+    Returns the process-wide summarizer.
+    """
+    return Summarizer(cache=get_summary_cache() if SUMMARY_CACHE_ENABLED else None)
+
+
+async def summarize_submission(text: str) -> str:
+    """Summarize one submission with the process-wide summarizer."""
+    return await get_summarizer().summarize_submission(text)
+
+
+async def summarize_textbook_page(text: str) -> str:
+    """Summarize a textbook page with the process-wide summarizer."""
+    return await get_summarizer().summarize_textbook_page(text)
+
+
+async def summarize_class_submissions(submissions: Sequence[str]) -> ClassSummary:
+    """Summarize a class's submissions with the process-wide summarizer."""
+    return await get_summarizer().summarize_class_submissions(submissions)
+
+
+async def extract_key_points(text: str) -> List[str]:
+    """Extract submission key points with the process-wide summarizer."""
+    return await get_summarizer().extract_key_points(text)
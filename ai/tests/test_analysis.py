@@ -6,8 +6,194 @@
 Analysis Tests
 
 - test_relevance_check
+- test_grading_context
+- test_grade_route_extracts_file
+- test_class_summary_tree
+- test_structured_output_repair
 - test_grade_suggestion
 - test_feedback_generation
 """
 
-# TODO: Implement analysis tests
+import asyncio
+import json
+import zlib
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from homework_analysis import routes as analysis_routes
+from homework_analysis.grader import GradeSuggestion
+from homework_analysis.grading_context import get_grading_context
+from models.structured_output import JSONExtractor, extract_json, generate_structured, get_output_stats
+from homework_analysis.relevance import RelevanceChecker, compare_topics, extract_topics
+from summarization.cache import SummaryCache
+from summarization.summarizer import Summarizer
+from textbook_parser.indexer import TextbookIndexer
+from textbook_parser.pdf_extractor import PageContent
+from textbook_parser.question_extractor import QuestionScanner
+
+
+def _bag_of_words(texts):
+    """Deterministic stand-in for a sentence embedding model."""
+    vectors = np.zeros((len(texts), 256), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in text.lower().split():
+            vectors[row, zlib.crc32(word.encode()) % 256] += 1
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9)
+
+
+def test_extract_and_compare_topics():
+    """Topics skip stopwords and fold plurals before comparison."""
+    topics = extract_topics("The quadratic equations and the quadratic formula")
+    assert topics[0] == "quadratic"
+    assert "equation" in topics and "the" not in topics
+    assert compare_topics(["equation"], ["equation", "formula"]) == 0.5
+
+
+def test_relevance_check(tmp_path):
+    """Clear matches and clear mismatches resolve locally."""
+    checker = RelevanceChecker(
+        indexer=TextbookIndexer(index_dir=tmp_path, embedder=_bag_of_words),
+        embedder=_bag_of_words
+    )
+    checker.openai_client = checker.anthropic_client = None
+    question = "Photosynthesis: explain how plants convert sunlight into chemical energy"
+
+    on_topic = asyncio.run(checker.check_relevance(
+        "Plants convert sunlight into chemical energy through photosynthesis in chloroplasts",
+        question
+    ))
+    off_topic = asyncio.run(checker.check_relevance(
+        "My summer holiday at the beach was fun and sunny",
+        question
+    ))
+
+    assert on_topic.stage == off_topic.stage == "local"
+    assert on_topic.score > 0.65
+    assert off_topic.score < 0.25
+    assert "photosynthesis" in on_topic.matching_topics
+
+
+def test_grading_context(tmp_path):
+    """Contexts carry textbook questions and rebuild when the homework changes."""
+    indexer = TextbookIndexer(index_dir=tmp_path, embedder=_bag_of_words)
+    scanner = QuestionScanner()
+    indexer._save_page_questions("book", scanner, PageContent(12, "Exercise 3.1 Solve 2x + 4 = 10"))
+    indexer._save_page_questions("book", scanner, PageContent(13, "Answers\n3.1 x = 3"))
+    indexer.build_question_index("book")
+
+    kwargs = dict(rubric={"work shown": 5}, max_points=10, textbook_id="book", page_numbers="12", indexer=indexer)
+    context = get_grading_context("hw-1", "v1", "Linear equations", **kwargs)
+
+    assert get_grading_context("hw-1", "v1", "Linear equations", **kwargs) is context
+    assert context.answer_keys == {"3.1": "x = 3"}
+    prompt = context.build_prompt("x = 3 because 2x = 6")
+    assert prompt.startswith(context.prompt_prefix)
+    assert "Expected answer: x = 3" in prompt and '"work shown": 5' in prompt
+    assert prompt.endswith("x = 3 because 2x = 6")
+
+    updated = get_grading_context("hw-1", "v2", "Linear equations, show all steps", **kwargs)
+    assert updated is not context and "show all steps" in updated.prompt_prefix
+
+
+class _FakeExtractor:
+    async def extract_from_pdf_url(self, url):
+        return ["Page one: x = 3", "", "Page two: checked"]
+
+
+class _PromptGrader:
+    """Grader that records the prompt it was given."""
+
+    def __init__(self):
+        self.prompts = []
+
+    async def suggest_grade(self, submission_text, context=None):
+        self.prompts.append(context.build_prompt(submission_text))
+        return GradeSuggestion(8.0, 0.9, "correct", [], [])
+
+
+def test_grade_route_extracts_file(monkeypatch):
+    """A file URL is OCR'd, graded with the homework context and the text returned."""
+    grader = _PromptGrader()
+    monkeypatch.setattr(analysis_routes, "get_text_extractor", lambda: _FakeExtractor())
+    monkeypatch.setattr(analysis_routes, "get_grader", lambda: grader)
+    app = FastAPI()
+    app.include_router(analysis_routes.router, prefix="/analysis")
+    client = TestClient(app)
+    homework = {"homework_id": "hw-route", "updated_at": "2026-01-05T10:00:00+00:00", "description": "Solve 2x = 6"}
+
+    response = client.post("/analysis/grade", json={
+        "file_url": "https://files.test/answer.pdf",
+        "file_type": "pdf",
+        "homework": homework
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["extracted_text"] == "Page one: x = 3\n\nPage two: checked"
+    assert body["suggested_grade"] == 8.0
+    assert "Solve 2x = 6" in grader.prompts[0] and grader.prompts[0].endswith("Page two: checked")
+    assert client.post("/analysis/grade", json={"homework": homework}).status_code == 422
+
+
+class _ScriptedSummarizer(Summarizer):
+    """Summarizer whose LLM answers from a script and records prompts."""
+
+    model_name = "scripted"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.prompts = []
+
+    async def _complete(self, prompt, max_tokens=500, json_output=False):
+        self.prompts.append(prompt)
+        if "key points of this homework submission" in prompt:
+            return json.dumps({"key_points": ["forgot units"]})
+        return json.dumps({"overall_performance": "ok", "common_issues": ["units"], "recommendations": []})
+
+
+def test_class_summary_tree(tmp_path):
+    """Key points are cached by content and merged in a fan-in tree."""
+    cache = SummaryCache(db_path=tmp_path / "summary.sqlite3")
+    summarizer = _ScriptedSummarizer(cache=cache, fan_in=3)
+    submissions = [f"answer {i}" for i in range(10)]
+
+    summary = asyncio.run(summarizer.summarize_class_submissions(submissions))
+
+    # 10 key-point calls, 4 group summaries, 1 merge (the 4th partial has
+    # no siblings), 1 final merge
+    assert len(summarizer.prompts) == 16
+    assert summary.submission_count == 10 and summary.common_issues == ["units"]
+
+    summarizer.prompts.clear()
+    asyncio.run(summarizer.summarize_class_submissions(submissions[:3]))
+    assert len(summarizer.prompts) == 1
+
+
+def test_structured_output_repair():
+    """Fenced, chatty, truncated and streamed JSON parse; bad answers get one repair."""
+    assert extract_json('Sure!\n```json\n{"a": [1, 2,], "b": "x}"}\n```') == {"a": [1, 2], "b": "x}"}
+    assert extract_json('{"reasoning": "cut off mid') == {"reasoning": "cut off mid"}
+
+    extractor = JSONExtractor()
+    assert extractor.feed('{"suggested_grade": ') is None
+    assert extractor.feed('8, "x": {}} trailing') == {"suggested_grade": 8, "x": {}}
+
+    replies = iter(['{"confidence": 0.9}', '{"suggested_grade": "12", "confidence": 0.9}'])
+    prompts = []
+
+    async def complete(prompt):
+        prompts.append(prompt)
+        return next(replies)
+
+    grade = asyncio.run(generate_structured(
+        complete, "grade it", GradeSuggestion, "mock", "m1",
+        bounds={"suggested_grade": (0, 10)},
+        defaults={"reasoning": "", "improvements": [], "errors_found": []}
+    ))
+
+    assert grade.suggested_grade == 10 and grade.confidence == 0.9
+    assert len(prompts) == 2 and "missing field suggested_grade" in prompts[1]
+    stats = next(row for row in get_output_stats() if row["model"] == "m1")
+    assert stats["repaired"] == 1 and stats["malformed_rate"] == 1.0
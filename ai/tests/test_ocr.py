@@ -9,6 +9,285 @@ OCR Tests
 - test_extract_handwritten_text
 - test_image_preprocessing
 - test_batch_extraction
+- test_ocr_cache_*
+- test_recognizer_cache_runs_off_event_loop
+- test_circuit_breaker_opens_on_slow_calls
+- test_hedged_recognition
+- test_circuit_breaker_opens_on_abandoned_calls
+- test_stream_pdf_*
+- test_stream_pdf_cancelled_mid_render_closes_document
 """
 
+import asyncio
+import threading
+
+from ocr import handwriting
+from ocr.extractor import TextExtractor
+from ocr.cache import OCRCache, image_digest
+from utils import circuit_breaker
+from utils.circuit_breaker import CircuitBreaker
+
 # TODO: Implement OCR tests with sample images
+
+
+def test_ocr_cache_hit_and_miss(tmp_path):
+    """Cached text is returned only for the same image, backend and prompt."""
+    cache = OCRCache(db_path=tmp_path / "ocr.sqlite3")
+    digest = image_digest(b"fake image bytes")
+
+    assert cache.get(digest, "openai", "v1") is None
+    cache.put(digest, "openai", "v1", "x = 42")
+
+    assert cache.get(digest, "openai", "v1") == "x = 42"
+    assert cache.get(digest, "openai", "v2") is None
+    assert cache.get(digest, "anthropic", "v1") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
+    assert stats["entries"] == 1
+
+
+def test_ocr_cache_get_any_counts_one_lookup(tmp_path):
+    """A lookup across several backends is one hit or one miss."""
+    cache = OCRCache(db_path=tmp_path / "ocr.sqlite3")
+    cache.put("e", "anthropic", "v1", "from anthropic")
+    cache.put("e", "tesseract", "v1", "from tesseract")
+
+    assert cache.get_any("e", ["openai", "anthropic", "tesseract"], "v1") == ("anthropic", "from anthropic")
+    assert cache.get_any("f", ["openai", "anthropic", "tesseract"], "v1") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_ocr_cache_lru_eviction(tmp_path):
+    """Least recently used entries are evicted once over the byte budget."""
+    cache = OCRCache(db_path=tmp_path / "ocr.sqlite3", max_bytes=20)
+
+    cache.put("a", "openai", "v1", "0123456789")
+    cache.put("b", "openai", "v1", "0123456789")
+    cache.get("a", "openai", "v1")  # touch "a" so "b" is the LRU entry
+    cache.put("c", "openai", "v1", "0123456789")
+
+    assert cache.get("a", "openai", "v1") is not None
+    assert cache.get("b", "openai", "v1") is None
+    assert cache.get("c", "openai", "v1") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ocr_cache_persists_across_instances(tmp_path):
+    """Entries survive process restarts."""
+    db_path = tmp_path / "ocr.sqlite3"
+    OCRCache(db_path=db_path).put("d", "tesseract", "v1", "hello")
+
+    assert OCRCache(db_path=db_path).get("d", "tesseract", "v1") == "hello"
+
+
+def test_recognizer_cache_runs_off_event_loop(monkeypatch, tmp_path):
+    """SQLite lookups and writes of the recognizer run in worker threads."""
+    monkeypatch.setattr(circuit_breaker, "_breakers", {})
+    threads = []
+
+    class RecordingCache(OCRCache):
+        def get_any(self, *args):
+            threads.append(threading.get_ident())
+            return super().get_any(*args)
+
+        def put(self, *args):
+            threads.append(threading.get_ident())
+            super().put(*args)
+
+    async def openai(image_bytes, mime_type):
+        return "x = 42"
+
+    recognizer = handwriting.HandwritingRecognizer(hedge=False)
+    recognizer.cache = RecordingCache(db_path=tmp_path / "ocr.sqlite3")
+    recognizer.openai_client = object()
+    recognizer.anthropic_client = None
+    recognizer._recognize_with_openai = openai
+
+    async def run():
+        first = await recognizer.recognize(b"\x89PNG fake")
+        second = await recognizer.recognize(b"\x89PNG fake")
+        return first, second, threading.get_ident()
+
+    first, second, loop_thread = asyncio.run(run())
+
+    assert first == second == "x = 42"
+    assert len(threads) == 3  # miss, write, hit
+    assert loop_thread not in threads
+    assert recognizer.cache.stats()["hits"] == 1
+
+
+def test_circuit_breaker_opens_on_slow_calls():
+    """A provider that answers, but slowly, is skipped like a failing one."""
+    breaker = CircuitBreaker("slow", window=10, min_calls=4, slow_call_seconds=5, open_seconds=60)
+    for _ in range(4):
+        assert breaker.allow()
+        breaker.record(9.0, ok=True)
+
+    assert breaker.state == "open" and not breaker.allow()
+
+    breaker.opened_at -= 60
+    assert breaker.allow() and not breaker.allow()  # a single half-open probe
+    breaker.record(0.5, ok=True)
+    assert breaker.state == "closed"
+
+
+def test_hedged_recognition(monkeypatch):
+    """The secondary provider answers while the primary hangs; the loser is cancelled and counted slow."""
+    monkeypatch.setattr(circuit_breaker, "_breakers", {})
+    monkeypatch.setattr(handwriting, "OCR_HEDGE_MIN_DELAY_SECONDS", 0.01)
+    monkeypatch.setattr(handwriting, "OCR_HEDGE_DEFAULT_DELAY_SECONDS", 0.05)
+    cancelled = []
+
+    async def hanging(image_bytes, mime_type):
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def quick(image_bytes, mime_type):
+        return "x = 42"
+
+    recognizer = handwriting.HandwritingRecognizer(hedge=True)
+    recognizer.cache = None
+    recognizer.openai_client = recognizer.anthropic_client = object()
+    recognizer._recognize_with_openai = hanging
+    recognizer._recognize_with_anthropic = quick
+
+    text = asyncio.run(asyncio.wait_for(recognizer.recognize(b"\x89PNG fake"), 5))
+
+    assert text == "x = 42"
+    assert cancelled == [True]
+    primary = circuit_breaker.get_circuit_breaker("openai")
+    assert primary.snapshot()["calls"] == 1 and primary.snapshot()["abandoned"] == 1
+    assert primary.p95() is None
+    assert circuit_breaker.get_circuit_breaker("anthropic").snapshot()["calls"] == 1
+
+
+def test_circuit_breaker_opens_on_abandoned_calls():
+    """Calls that keep losing hedges open the breaker like slow calls."""
+    breaker = CircuitBreaker("hedged", window=10, min_calls=4, slow_call_seconds=30, slow_rate=0.5)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record(1.0, ok=True)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.abandon(2.0)
+
+    assert breaker.state == "open"
+    assert breaker.snapshot()["error_rate"] == 0.0
+
+
+class FakePageRecognizer:
+    """Recognizer whose early pages are slowest, tracking concurrency."""
+
+    def __init__(self, pages: int):
+        self.pages = pages
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.started = []
+
+    async def recognize(self, image_bytes):
+        page = int(image_bytes.decode())
+        self.started.append(page)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.005 * (self.pages - page + 1))
+            return f"page {page}"
+        finally:
+            self.in_flight -= 1
+
+
+def _fake_pdf_extractor(monkeypatch, pages: int, concurrency: int):
+    recognizer = FakePageRecognizer(pages)
+    extractor = TextExtractor(recognizer=recognizer, max_concurrency=concurrency)
+    rendered = []
+
+    def render(pdf):
+        for page in range(1, pages + 1):
+            rendered.append(page)
+            yield str(page).encode()
+
+    monkeypatch.setattr(extractor, "_render_pages", render)
+    return extractor, recognizer, rendered
+
+
+def test_stream_pdf_yields_pages_in_order(monkeypatch):
+    """Pages finishing out of order are still yielded in page order."""
+    extractor, recognizer, _ = _fake_pdf_extractor(monkeypatch, pages=8, concurrency=4)
+
+    texts = asyncio.run(extractor.extract_from_pdf(b"%PDF"))
+
+    assert texts == [f"page {page}" for page in range(1, 9)]
+    assert recognizer.max_in_flight > 1
+
+
+def test_stream_pdf_bounds_concurrency(monkeypatch):
+    """No more than max_concurrency pages are recognized at once."""
+    extractor, recognizer, _ = _fake_pdf_extractor(monkeypatch, pages=12, concurrency=3)
+
+    asyncio.run(extractor.extract_from_pdf(b"%PDF"))
+
+    assert recognizer.max_in_flight == 3
+
+
+def test_stream_pdf_early_break_stops_work(monkeypatch):
+    """Breaking out of the stream stops rendering and cancels pending pages."""
+    extractor, recognizer, rendered = _fake_pdf_extractor(monkeypatch, pages=20, concurrency=2)
+
+    async def first_two():
+        pages = []
+        stream = extractor.stream_pdf(b"%PDF")
+        async for page in stream:
+            pages.append(page.page_number)
+            if len(pages) == 2:
+                break
+        await stream.aclose()
+        await asyncio.sleep(0.05)
+        return pages
+
+    assert asyncio.run(first_two()) == [1, 2]
+    assert len(rendered) < 20
+    assert recognizer.in_flight == 0
+
+
+def test_stream_pdf_cancelled_mid_render_closes_document(monkeypatch):
+    """Cancelling while a page renders closes the renderer once the page is done."""
+    extractor = TextExtractor(recognizer=FakePageRecognizer(3), max_concurrency=2)
+    rendering = threading.Event()
+    release = threading.Event()
+    closed = []
+
+    def render(pdf):
+        try:
+            rendering.set()
+            release.wait(5)
+            yield b"1"
+        finally:
+            closed.append(True)
+
+    monkeypatch.setattr(extractor, "_render_pages", render)
+
+    async def run():
+        consumer = asyncio.create_task(extractor.extract_from_pdf(b"%PDF"))
+        await asyncio.to_thread(rendering.wait, 5)
+        consumer.cancel()
+        try:
+            await consumer
+        except asyncio.CancelledError:
+            pass
+        assert closed == []  # the page is still rendering
+        release.set()
+        for _ in range(100):
+            if closed:
+                break
+            await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    assert closed == [True]
@@ -0,0 +1,93 @@
+# test_service.py - Service Tests
+#
+# Service startup and the shared HTTP client.
+
+"""
+Service Tests
+
+- test_main_imports_as_deployed
+- test_download_bytes_*
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+from utils import http_client
+from utils.http_client import DownloadTooLargeError, download_bytes
+
+AI_DIR = Path(__file__).resolve().parent.parent
+
+
+def test_main_imports_as_deployed():
+    """`uvicorn main:app` runs from the ai directory with only it on sys.path."""
+    env = {key: value for key, value in os.environ.items() if key != "PYTHONPATH"}
+    script = (
+        "import sys, main\n"
+        "import utils.http_client\n"
+        "assert main.app is not None\n"
+        "from fastapi.testclient import TestClient\n"
+        "assert 'providers' in TestClient(main.app).get('/health').json()\n"
+        "assert not [name for name in sys.modules if name == 'ai' or name.startswith('ai.')]\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=AI_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def _mock_client(monkeypatch, handler) -> None:
+    """Route the shared client through an in-process transport."""
+    monkeypatch.setattr(http_client, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+
+def test_download_bytes_reuses_shared_client(monkeypatch):
+    """Downloads go through the one pooled client."""
+    _mock_client(monkeypatch, lambda request: httpx.Response(200, content=b"page", headers={"content-type": "image/png"}))
+    client = http_client.get_http_client()
+
+    async def run():
+        first = await download_bytes("https://files.test/a.png")
+        second = await download_bytes("https://files.test/b.png")
+        assert http_client.get_http_client() is client
+        await http_client.close_http_client()
+        return first, second
+
+    (data, content_type), (again, _) = asyncio.run(run())
+    assert data == b"page" and again == b"page"
+    assert content_type == "image/png"
+    assert http_client._client is None
+
+
+def test_download_bytes_rejects_oversized_stream(monkeypatch):
+    """A body without Content-Length is aborted once it passes the limit."""
+    produced = []
+
+    async def body():
+        for _ in range(100):
+            produced.append(1)
+            yield b"x" * 1024
+
+    _mock_client(monkeypatch, lambda request: httpx.Response(200, content=body()))
+
+    with pytest.raises(DownloadTooLargeError):
+        asyncio.run(download_bytes("https://files.test/huge.pdf", max_bytes=4096))
+    assert len(produced) < 100
+
+
+def test_download_bytes_rejects_large_content_length(monkeypatch):
+    """A declared size over the limit is rejected before reading the body."""
+    _mock_client(monkeypatch, lambda request: httpx.Response(200, content=b"x" * 10_000))
+
+    with pytest.raises(DownloadTooLargeError):
+        asyncio.run(download_bytes("https://files.test/big.png", max_bytes=1000))
@@ -0,0 +1,353 @@
+# test_textbook.py - Textbook Parser Tests
+#
+# Unit tests for textbook indexing and search.
+
+"""
+Textbook Tests
+
+- test_vector_index_*
+- test_keyword_index_*
+- test_embedding_generator_*
+- test_question_scanner_*
+- test_pdf_extractor_*
+- test_indexer_*
+- test_index_route_*
+- test_text_utils_*
+"""
+
+import uuid
+from pathlib import Path
+from typing import List, Sequence
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from models.embedding import EmbeddingBackend, EmbeddingGenerator, similarity
+from models.embedding_cache import EmbeddingCache
+from textbook_parser import routes as textbook_routes
+from textbook_parser.indexer import TextbookIndexer
+from textbook_parser.keyword_index import KeywordIndex, is_exact_lookup
+from textbook_parser.pdf_extractor import PDFExtractor
+from textbook_parser.question_extractor import QuestionScanner, QuestionType, iter_page_questions
+from textbook_parser.vector_index import VectorIndex
+from utils.text_utils import clean_text, remove_punctuation
+
+
+def _clustered_vectors(count: int, dim: int = 64, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((40, dim))
+    vectors = centers[rng.integers(0, len(centers), count)] + 0.3 * rng.standard_normal((count, dim))
+    return vectors.astype(np.float32)
+
+
+def test_vector_index_matches_exact_search(tmp_path):
+    """IVF search with re-ranking returns the exact top results."""
+    vectors = _clustered_vectors(2000)
+    pages = np.arange(len(vectors)) // 3 + 1
+    VectorIndex.build(tmp_path / "vectors", vectors, pages, np.zeros((len(vectors), 2)))
+
+    index = VectorIndex.load(tmp_path / "vectors")
+    assert index.nlist > 1
+    assert isinstance(index.vectors_f32, np.memmap)
+
+    query = vectors[7]
+    hits = index.search(query, top_k=5)
+    exact = np.argsort(-(index.vectors_f32 @ (query / np.linalg.norm(query))))[:5]
+
+    assert [row for row, _ in hits] == exact.tolist()
+    assert index.chunk_pages[hits[0][0]] == pages[7]
+
+
+def test_vector_index_restricted_rows(tmp_path):
+    """Searching a subset of rows only returns rows from that subset."""
+    vectors = _clustered_vectors(50)
+    VectorIndex.build(tmp_path / "vectors", vectors, np.arange(50), np.zeros((50, 2)))
+
+    index = VectorIndex.load(tmp_path / "vectors")
+    rows = np.flatnonzero(np.isin(index.chunk_pages, [10, 11, 12]))
+    hits = index.search(vectors[30], top_k=5, rows=rows)
+
+    assert len(hits) == 3
+    assert {int(index.chunk_pages[row]) for row, _ in hits} == {10, 11, 12}
+
+
+def test_keyword_index_exact_reference(tmp_path):
+    """A reference like "Exercise 4.2" ranks the page containing it first."""
+    pages = [
+        (1, "Exercise 1.2 covers 4.2 grams of salt."),
+        (2, "Exercise 2.1 asks about the exercise bike."),
+        (300, "Exercise 4.2: balance H2SO4 + NaOH."),
+    ]
+    KeywordIndex.build(tmp_path / "keywords", pages)
+    index = KeywordIndex.load(tmp_path / "keywords")
+
+    assert is_exact_lookup("Exercise 4.2")
+    assert not is_exact_lookup("how do plants make food")
+    assert index.search("Exercise 4.2")[0][0] == 300
+    assert [page for page, _ in index.search("h2so4")] == [300]
+    assert index.search("Exercise 4.2", page_numbers=[1, 2])[0][0] == 1
+
+    # Postings are delta-encoded but decode to absolute page numbers
+    decoded, _ = index.postings("exercise")
+    assert decoded.tolist() == [1, 2, 300]
+
+
+class _CountingBackend(EmbeddingBackend):
+    """Deterministic fake backend recording every batch it embeds."""
+
+    name = "fake"
+    max_batch_tokens = 10
+    max_batch_size = 8
+
+    def __init__(self):
+        self.batches = []
+
+    def embed(self, texts):
+        self.batches.append(list(texts))
+        return np.array([[len(t), t.count("a") + 1, 1.0] for t in texts], dtype=np.float32)
+
+
+def test_embedding_generator_cache_and_token_batches(tmp_path):
+    """Only uncached texts are embedded, in batches under the token budget."""
+    backend = _CountingBackend()
+    generator = EmbeddingGenerator(backend, cache=EmbeddingCache(db_path=tmp_path / "emb.sqlite3"))
+
+    texts = ["a" * 16, "b" * 16, "c" * 16, "a" * 16]
+    first = generator.embed_batch(texts)
+    assert first.shape == (4, 3)
+    assert np.allclose(first[0], first[3])
+    assert sum(len(batch) for batch in backend.batches) == 3
+    assert all(sum(backend.count_tokens(t) for t in batch) <= 10 for batch in backend.batches)
+
+    backend.batches.clear()
+    second = generator.embed_batch(["b" * 16, "new text"])
+    assert backend.batches == [["new text"]]
+    assert np.allclose(second[0], first[1])
+
+    scores = similarity(first[0], first)
+    assert scores.shape == (4,)
+    assert np.isclose(scores[0], 1.0)
+
+
+def test_question_scanner_questions_and_options():
+    """Numbered and labelled questions are found and classified in one pass."""
+    page = "\n".join([
+        "Exercise 4.1 Solve x^2 - 5x + 6 = 0.",
+        "Exercise 4.2 Which of these is a root of x^2 = 9?",
+        "a) 2",
+        "b) 3",
+        "1. What is a parabola?",
+        "Answer: a U-shaped curve",
+    ])
+    found = QuestionScanner().scan(12, page)
+
+    assert [q.number for q in found.questions] == ["4.1", "4.2", "1"]
+    assert found.questions[0].question_type == QuestionType.PROBLEM_SOLVING
+    assert found.questions[1].question_type == QuestionType.MULTIPLE_CHOICE
+    assert found.questions[1].options == ["A) 2", "B) 3"]
+    assert found.questions[2].answer == "a U-shaped curve"
+    assert all(q.page_number == 12 for q in found.questions)
+
+
+def test_question_scanner_answer_key_spans_pages():
+    """An answer key continues onto the next page until a new heading."""
+    pages = [
+        (30, "Answer Key\n4.1 x = 2 or x = 3"),
+        (31, "4.2 B\n\nChapter 5\n1. Define a function."),
+    ]
+    first, second = iter_page_questions(pages)
+
+    assert first.answers == {"4.1": "x = 2 or x = 3"}
+    assert second.answers == {"4.2": "B"}
+    assert [q.text for q in second.questions] == ["Define a function."]
+
+
+def _write_pdf(path: Path, texts: List[str]) -> Path:
+    """Write a minimal PDF with one line of Helvetica text per page."""
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    ]
+    kids = []
+    for text in texts:
+        stream = f"BT /F1 24 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    path.write_bytes(bytes(out))
+    return path
+
+
+def test_pdf_extractor_mapped_pages(tmp_path):
+    """The memory-mapped reader serves page ranges and the page count."""
+    pdf = _write_pdf(tmp_path / "book.pdf", [f"Page {n}" for n in range(1, 6)])
+    extractor = PDFExtractor(workers=1)
+
+    assert extractor.get_page_count(pdf) == 5
+    pages = list(extractor.iter_pages(pdf, start=2, end=4))
+    assert [page.page_number for page in pages] == [2, 3, 4]
+    assert [page.text.strip() for page in pages] == ["Page 2", "Page 3", "Page 4"]
+
+
+def test_pdf_extractor_parallel_page_order(tmp_path):
+    """Worker processes return every page exactly once, in page order."""
+    pdf = _write_pdf(tmp_path / "book.pdf", [f"Page {n}" for n in range(1, 12)])
+    extractor = PDFExtractor(workers=2, chunk_pages=2)
+
+    pages = list(extractor.iter_pages_parallel(pdf))
+
+    assert [page.page_number for page in pages] == list(range(1, 12))
+    assert [page.text.strip() for page in pages] == [f"Page {n}" for n in range(1, 12)]
+
+
+class RecordingEmbedder:
+    """Deterministic embedder that records every text it embeds."""
+
+    def __init__(self):
+        self.texts: List[str] = []
+
+    def __call__(self, texts: Sequence[str]) -> np.ndarray:
+        self.texts.extend(texts)
+        rng = np.random.default_rng(len(self.texts))
+        return rng.standard_normal((len(texts), 16)).astype(np.float32)
+
+
+def _indexer(tmp_path: Path, embedder: RecordingEmbedder) -> TextbookIndexer:
+    return TextbookIndexer(tmp_path / "index", extractor=PDFExtractor(workers=1), embedder=embedder)
+
+
+def test_indexer_resumes_from_checkpoint(tmp_path):
+    """start_page skips checkpointed pages; unchanged hashes are not re-embedded."""
+    pdf = _write_pdf(tmp_path / "book.pdf", [f"Page {n} text" for n in range(1, 6)])
+    embedder = RecordingEmbedder()
+    indexer = _indexer(tmp_path, embedder)
+
+    first = list(indexer.index_textbook("book", pdf))
+    assert [r.page_number for r in first] == [1, 2, 3, 4, 5]
+    hashes = {r.page_number: r.content_hash for r in first}
+
+    # Interrupted after page 3 was checkpointed
+    embedder.texts.clear()
+    resumed = list(indexer.index_textbook("book", pdf, start_page=4, page_hashes={p: hashes[p] for p in (1, 2, 3)}))
+    assert [r.page_number for r in resumed] == [4, 5]
+    assert embedder.texts == ["Page 4 text", "Page 5 text"]
+
+    embedder.texts.clear()
+    again = list(indexer.index_textbook("book", pdf, page_hashes=hashes))
+    assert all(r.skipped for r in again)
+    assert embedder.texts == []
+
+
+def test_indexer_rebuilds_after_crash_past_last_page(tmp_path, monkeypatch):
+    """A run that stops after its last page checkpoint still rebuilds the indexes on resume."""
+    embedder = RecordingEmbedder()
+    indexer = _indexer(tmp_path, embedder)
+    pdf = _write_pdf(tmp_path / "book.pdf", ["Cells divide", "Rocks erode", "Stars shine"])
+    hashes = {r.page_number: r.content_hash for r in indexer.index_textbook("book", pdf)}
+
+    pdf = _write_pdf(tmp_path / "book.pdf", ["Cells divide", "Photosynthesis makes sugar", "Stars shine"])
+
+    def crash(textbook_id):
+        raise RuntimeError("killed")
+
+    monkeypatch.setattr(indexer, "build_vector_index", crash)
+    results = indexer.index_textbook("book", pdf, page_hashes=hashes)
+    checkpoints = {}
+    with pytest.raises(RuntimeError):
+        for result in results:
+            checkpoints[result.page_number] = result.content_hash
+    assert (indexer.textbook_dir("book") / "rebuild.pending").exists()
+    assert not indexer.keyword_search("photosynthesis", "book")
+
+    monkeypatch.undo()
+    assert list(indexer.index_textbook("book", pdf, start_page=4, page_hashes=checkpoints)) == []
+    assert [page for page, _ in indexer.keyword_search("photosynthesis", "book")] == [2]
+    assert {r.page_number for r in indexer.semantic_search("sugar", "book", top_k=10)} == {1, 2, 3}
+    assert not (indexer.textbook_dir("book") / "rebuild.pending").exists()
+
+
+def test_indexer_prunes_pages_of_shorter_pdf(tmp_path):
+    """Pages past the end of a replaced, shorter PDF leave every index."""
+    indexer = _indexer(tmp_path, RecordingEmbedder())
+    pdf = _write_pdf(tmp_path / "book.pdf", ["Cells divide", "Rocks erode", "Exercise 1.1 Name a volcano"])
+    hashes = {r.page_number: r.content_hash for r in indexer.index_textbook("book", pdf)}
+    assert indexer.keyword_search("volcano", "book")
+
+    pdf = _write_pdf(tmp_path / "book.pdf", ["Cells divide", "Rocks erode"])
+    results = list(indexer.index_textbook("book", pdf, page_hashes=hashes))
+
+    assert all(r.skipped for r in results)
+    assert not indexer.keyword_search("volcano", "book")
+    assert {r.page_number for r in indexer.semantic_search("volcano", "book", top_k=10)} == {1, 2}
+    assert indexer.get_questions("book", [3]) == []
+    root = indexer.textbook_dir("book")
+    assert sorted(path.name for path in (root / "pages").iterdir()) == ["00001.txt", "00002.txt"]
+    assert not (root / "rebuild.pending").exists()
+
+
+def _index_client(tmp_path: Path, monkeypatch, pdf: Path) -> tuple:
+    """Index route with a temporary index directory and a counting downloader."""
+    downloads = []
+
+    async def download(url, path, max_bytes=None):
+        downloads.append(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(pdf.read_bytes())
+
+    embedder = RecordingEmbedder()
+    monkeypatch.setattr(textbook_routes, "TextbookIndexer", lambda: _indexer(tmp_path, embedder))
+    monkeypatch.setattr(textbook_routes, "download_to_file", download)
+    app = FastAPI()
+    app.include_router(textbook_routes.router, prefix="/textbook")
+    return TestClient(app), downloads
+
+
+def test_index_route_rejects_non_uuid_ids(tmp_path, monkeypatch):
+    """Textbook IDs become directory names, so only UUIDs are accepted."""
+    client, downloads = _index_client(tmp_path, monkeypatch, tmp_path / "unused.pdf")
+
+    response = client.post("/textbook/index", json={"textbook_id": "../../etc", "file_url": "https://files.test/a.pdf"})
+    assert response.status_code == 422
+    assert client.get("/textbook/..-etc/questions", params={"pages": "1"}).status_code == 422
+    assert downloads == []
+
+
+def test_index_route_force_downloads_again(tmp_path, monkeypatch):
+    """Resumed runs reuse the cached PDF; force replaces it and its index files."""
+    pdf = _write_pdf(tmp_path / "book.pdf", ["Page 1", "Page 2"])
+    client, downloads = _index_client(tmp_path, monkeypatch, pdf)
+    textbook_id = str(uuid.uuid4())
+    body = {"textbook_id": textbook_id, "file_url": "https://files.test/book.pdf"}
+    stale = tmp_path / "index" / textbook_id / "pages" / "00099.txt"
+
+    for force in (False, False, True):
+        stale.parent.mkdir(parents=True, exist_ok=True)
+        stale.write_text("left over", encoding="utf-8")
+        events = client.post("/textbook/index", json={**body, "force": force}).text.splitlines()
+        assert '"completed"' in events[-1]
+
+    assert len(downloads) == 2
+    assert sorted(path.name for path in stale.parent.iterdir()) == ["00001.txt", "00002.txt"]
+
+
+def test_text_utils_clean_and_remove_punctuation():
+    """Extracted text is normalised; punctuation goes, symbols and digits stay."""
+    assert clean_text("\ufb01nd  the\x00 area\n\n of \uff14.2 ") == "find the area of 4.2"
+    assert remove_punctuation("Exercise 4.2: \u201cx + y = 5!\u201d") == "Exercise 42 x + y = 5"
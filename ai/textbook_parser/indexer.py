@@ -6,15 +6,644 @@
 Textbook Indexer
 
 Methods:
-- index_textbook(textbook_id, pages) -> Index
-- search(query, textbook_id) -> List[SearchResult]
-- get_questions(textbook_id, page_range) -> List[Question]
+- index_textbook(textbook_id, pdf_path, start_page, page_hashes) -> Iterator[PageIndexResult]
+- discard_index(textbook_id) -> None
+- build_vector_index(textbook_id) -> int
+- build_keyword_index(textbook_id) -> int
+- page_vectors(textbook_id, page_numbers) -> np.ndarray
+- search(query, textbook_id, top_k, page_numbers) -> List[SearchResult]
+- build_question_index(textbook_id) -> int
+- get_questions(textbook_id, page_numbers) -> List[Question]
 
 Index:
 - embeddings for semantic search
 - keyword index for exact matches
+
+Indexing is incremental and resumable. Each textbook has its own
+directory under TEXTBOOK_INDEX_DIR, pages are processed one at a time,
+and every page reports a PageIndexResult the backend stores as a
+checkpoint. A restarted job passes start_page to skip pages already
+done, and page_hashes so pages whose content hash is unchanged are not
+re-indexed. A marker file is written before the first changed page is
+stored and removed once the shard, keyword and question indexes are
+rebuilt, so a job that stops after its last page checkpoint still
+rebuilds them when it resumes. Per-page files numbered past the PDF's
+page count (left by a longer earlier version of the book) are pruned
+before the rebuild, and a forced re-index starts from an empty directory
+via discard_index().
+
+Pages are split into overlapping chunks whose embeddings are stored per
+page (chunks/NNNNN.npz). Chunks of consecutive changed pages are embedded
+together, and the embedding cache means a re-index after a parser change
+only embeds chunks whose text actually changed. Once a pass finishes, the
+per-page embeddings are compacted into the textbook's vector shard (see
+vector_index.py), which search() memory-maps and probes without touching
+other books.
+
+A BM25 inverted index over the same pages (see keyword_index.py) sits
+next to it. search() fuses the two rankings per page with reciprocal
+rank fusion; reference-style queries ("Exercise 4.2", "H2SO4") that hit
+the keyword index are answered from it alone, without embedding.
+
+Questions and answer keys are scanned from the same page stream (see
+question_extractor.py), stored per page and compacted into
+questions/index.json, so get_questions() resolves Homework.page_numbers
+to concrete questions with a dictionary lookup.
 """
 
-# TODO: Implement embedding generation
-# TODO: Create vector index for semantic search
-# TODO: Implement question extraction
+import hashlib
+import json
+import logging
+import re
+import shutil
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from uuid import UUID
+
+import numpy as np
+
+from config import (
+    EMBEDDING_BATCH_TOKENS,
+    TEXTBOOK_CHUNK_CHARS,
+    TEXTBOOK_CHUNK_OVERLAP,
+    TEXTBOOK_INDEX_DIR,
+    TEXTBOOK_SEARCH_KEYWORD_WEIGHT,
+)
+from models.embedding import embed_batch
+from textbook_parser.keyword_index import KeywordIndex, is_exact_lookup
+from textbook_parser.pdf_extractor import PDFExtractor, PageContent
+from textbook_parser.question_extractor import Question, QuestionScanner, QuestionType
+from textbook_parser.vector_index import VectorIndex
+from utils.text_utils import tokenize
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Page text buffered before embedding (about four characters per token)
+_EMBED_BUFFER_CHARS = EMBEDDING_BATCH_TOKENS * 4
+
+# Reciprocal rank fusion constant; dampens the weight of top ranks
+RRF_K = 60
+
+# Maps a batch of texts to an (n, dim) float32 embedding matrix
+Embedder = Callable[[Sequence[str]], np.ndarray]
+
+
+@dataclass
+class PageIndexResult:
+    """Outcome of indexing one page."""
+    page_number: int
+    content_hash: str
+    skipped: bool
+
+
+@dataclass
+class SearchResult:
+    """A textbook passage matching a search query."""
+    page_number: int
+    score: float
+    text: str
+
+
+def chunk_spans(
+    text: str,
+    max_chars: int = TEXTBOOK_CHUNK_CHARS,
+    overlap: int = TEXTBOOK_CHUNK_OVERLAP
+) -> List[Tuple[int, int]]:
+    """
+    Split text into overlapping chunks, breaking on whitespace.
+
+    Returns:
+        (start, end) character spans
+    """
+    spans = []
+    length = len(text)
+    start = 0
+
+    while start < length:
+        while start < length and text[start].isspace():
+            start += 1
+        if start >= length:
+            break
+
+        end = min(start + max_chars, length)
+        if end < length:
+            cut = max(text.rfind(" ", start + max_chars // 2, end), text.rfind("\n", start + max_chars // 2, end))
+            if cut > start:
+                end = cut
+        spans.append((start, end))
+
+        if end >= length:
+            break
+        start = max(end - overlap, start + 1)
+
+    return spans
+
+
+def page_content_hash(text: str) -> str:
+    """
+    Hash page text for change detection.
+
+    Whitespace is normalised so re-extraction noise does not force a
+    re-index.
+    """
+    normalized = _WHITESPACE.sub(" ", text).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class TextbookIndexer:
+    """
+    Builds per-textbook indexes from PDF pages.
+    One directory (shard) per textbook keeps searches and rebuilds local.
+    """
+
+    def __init__(
+        self,
+        index_dir: Union[str, Path] = TEXTBOOK_INDEX_DIR,
+        extractor: Optional[PDFExtractor] = None,
+        embedder: Optional[Embedder] = None
+    ):
+        self.index_dir = Path(index_dir)
+        self.extractor = extractor or PDFExtractor()
+        self.embedder = embedder or embed_batch
+
+    def textbook_dir(self, textbook_id: Union[str, UUID]) -> Path:
+        """Directory holding one textbook's index files."""
+        return self.index_dir / str(textbook_id)
+
+    def source_path(self, textbook_id: Union[str, UUID]) -> Path:
+        """Local copy of the textbook PDF."""
+        return self.textbook_dir(textbook_id) / "source.pdf"
+
+    def _page_path(self, textbook_id: Union[str, UUID], page_number: int) -> Path:
+        return self.textbook_dir(textbook_id) / "pages" / f"{page_number:05d}.txt"
+
+    def _questions_path(self, textbook_id: Union[str, UUID], page_number: int) -> Path:
+        return self.textbook_dir(textbook_id) / "questions" / "pages" / f"{page_number:05d}.json"
+
+    def _question_index_path(self, textbook_id: Union[str, UUID]) -> Path:
+        return self.textbook_dir(textbook_id) / "questions" / "index.json"
+
+    def _chunks_path(self, textbook_id: Union[str, UUID], page_number: int) -> Path:
+        return self.textbook_dir(textbook_id) / "chunks" / f"{page_number:05d}.npz"
+
+    def _vector_dir(self, textbook_id: Union[str, UUID]) -> Path:
+        return self.textbook_dir(textbook_id) / "vectors"
+
+    def _keyword_dir(self, textbook_id: Union[str, UUID]) -> Path:
+        return self.textbook_dir(textbook_id) / "keywords"
+
+    def _rebuild_marker_path(self, textbook_id: Union[str, UUID]) -> Path:
+        return self.textbook_dir(textbook_id) / "rebuild.pending"
+
+    def discard_index(self, textbook_id: Union[str, UUID]) -> None:
+        """Remove the cached PDF and every index file, for a rebuild from scratch."""
+        shutil.rmtree(self.textbook_dir(textbook_id), ignore_errors=True)
+
+    def _prune_pages(self, textbook_id: Union[str, UUID], page_count: int) -> bool:
+        """
+        Delete per-page files of pages past page_count.
+
+        Returns:
+            Whether anything was deleted
+        """
+        root = self.textbook_dir(textbook_id)
+        pruned = False
+        for directory, pattern in (
+            (root / "pages", "[0-9]*.txt"),
+            (root / "chunks", "[0-9]*.npz"),
+            (root / "questions" / "pages", "[0-9]*.json"),
+        ):
+            for path in directory.glob(pattern):
+                if int(path.stem) > page_count:
+                    path.unlink(missing_ok=True)
+                    pruned = True
+        return pruned
+
+    def get_page_count(self, pdf_path: Union[str, Path]) -> int:
+        """Number of pages in the textbook PDF."""
+        return self.extractor.get_page_count(pdf_path)
+
+    def index_textbook(
+        self,
+        textbook_id: Union[str, UUID],
+        pdf_path: Union[str, Path],
+        start_page: int = 1,
+        page_hashes: Optional[Dict[int, str]] = None
+    ) -> Iterator[PageIndexResult]:
+        """
+        Index a textbook page by page.
+
+        Args:
+            textbook_id: Textbook UUID
+            pdf_path: Path to the textbook PDF
+            start_page: First page to process (earlier pages are already done)
+            page_hashes: Content hashes of previously indexed pages
+
+        Yields:
+            PageIndexResult for each processed page, in page order
+        """
+        page_hashes = page_hashes or {}
+        marker = self._rebuild_marker_path(textbook_id)
+        # Set when an earlier run stored pages but stopped before rebuilding
+        changed = marker.exists()
+
+        # A replaced, shorter PDF leaves pages that no longer exist
+        if self._prune_pages(textbook_id, self.get_page_count(pdf_path)):
+            marker.parent.mkdir(parents=True, exist_ok=True)
+            marker.touch()
+            changed = True
+
+        # Changed pages are buffered so their chunks are embedded in a few
+        # large batches; results are still yielded strictly in page order.
+        scanner = QuestionScanner()
+        queued: List[Tuple[Optional[PageContent], PageIndexResult]] = []
+        queued_chars = 0
+
+        for page in self.extractor.iter_pages(pdf_path, start=max(1, start_page)):
+            content_hash = page_content_hash(page.text)
+
+            if page_hashes.get(page.page_number) == content_hash:
+                queued.append((None, PageIndexResult(page.page_number, content_hash, skipped=True)))
+            else:
+                if not changed:
+                    marker.parent.mkdir(parents=True, exist_ok=True)
+                    marker.touch()
+                    changed = True
+                queued.append((page, PageIndexResult(page.page_number, content_hash, skipped=False)))
+                queued_chars += len(page.text)
+
+            if queued_chars == 0 or queued_chars >= _EMBED_BUFFER_CHARS:
+                yield from self._flush(textbook_id, queued, scanner)
+                queued, queued_chars = [], 0
+
+        yield from self._flush(textbook_id, queued, scanner)
+
+        if changed or not VectorIndex.exists(self._vector_dir(textbook_id)):
+            self.build_vector_index(textbook_id)
+        if changed or not KeywordIndex.exists(self._keyword_dir(textbook_id)):
+            self.build_keyword_index(textbook_id)
+        if changed or not self._question_index_path(textbook_id).exists():
+            self.build_question_index(textbook_id)
+        marker.unlink(missing_ok=True)
+
+        logger.info(f"Indexed textbook {textbook_id} from page {start_page}")
+
+    def _flush(
+        self,
+        textbook_id: Union[str, UUID],
+        queued: List[Tuple[Optional[PageContent], PageIndexResult]],
+        scanner: QuestionScanner
+    ) -> Iterator[PageIndexResult]:
+        """Index the buffered changed pages, then report every queued page."""
+        for page, _ in queued:
+            if page is None:
+                # Scanner state cannot carry across a page that was not re-read
+                scanner.reset()
+            else:
+                self._save_page_questions(textbook_id, scanner, page)
+
+        self._index_pages(textbook_id, [page for page, _ in queued if page is not None])
+        for _, result in queued:
+            yield result
+
+    def _save_page_questions(
+        self,
+        textbook_id: Union[str, UUID],
+        scanner: QuestionScanner,
+        page: PageContent
+    ) -> None:
+        """Scan one page for questions and answer-key entries and store them."""
+        found = scanner.scan(page.page_number, page.text)
+        path = self._questions_path(textbook_id, page.page_number)
+        if not found.questions and not found.answers:
+            path.unlink(missing_ok=True)
+            return
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix(".part")
+        partial.write_text(json.dumps({
+            "questions": [asdict(question) for question in found.questions],
+            "answers": found.answers
+        }), encoding="utf-8")
+        partial.replace(path)
+
+    def _index_pages(self, textbook_id: Union[str, UUID], pages: List[PageContent]) -> None:
+        """Persist pages' text and embed all their chunks in one batch."""
+        spans_by_page = []
+        texts = []
+
+        for page in pages:
+            path = self._page_path(textbook_id, page.page_number)
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+            # Write then rename so a crash never leaves a half-written page
+            partial = path.with_suffix(".part")
+            partial.write_text(page.text, encoding="utf-8")
+            partial.replace(path)
+
+            spans = chunk_spans(page.text)
+            spans_by_page.append(spans)
+            texts.extend(page.text[start:end] for start, end in spans)
+
+        vectors = np.asarray(self.embedder(texts), dtype=np.float32) if texts else None
+        offset = 0
+
+        for page, spans in zip(pages, spans_by_page):
+            chunks_path = self._chunks_path(textbook_id, page.page_number)
+            if not spans:
+                chunks_path.unlink(missing_ok=True)
+                continue
+
+            chunks_path.parent.mkdir(parents=True, exist_ok=True)
+            partial = chunks_path.with_name(chunks_path.stem + ".part.npz")
+            np.savez(
+                partial,
+                vectors=vectors[offset:offset + len(spans)],
+                spans=np.asarray(spans, dtype=np.int32)
+            )
+            partial.replace(chunks_path)
+            offset += len(spans)
+
+    def build_vector_index(self, textbook_id: Union[str, UUID]) -> int:
+        """
+        Compact the per-page chunk embeddings into the textbook's vector shard.
+
+        Args:
+            textbook_id: Textbook UUID
+
+        Returns:
+            Number of indexed chunks
+        """
+        vectors, pages, spans = [], [], []
+        chunks_dir = self.textbook_dir(textbook_id) / "chunks"
+
+        for path in sorted(chunks_dir.glob("[0-9]*.npz")):
+            with np.load(path) as data:
+                vectors.append(data["vectors"])
+                spans.append(data["spans"])
+            pages.append(np.full(len(spans[-1]), int(path.stem), dtype=np.int32))
+
+        if not vectors:
+            VectorIndex.build(self._vector_dir(textbook_id), np.zeros((0, 0), np.float32), [], [])
+            return 0
+
+        VectorIndex.build(
+            self._vector_dir(textbook_id),
+            np.concatenate(vectors),
+            np.concatenate(pages),
+            np.concatenate(spans)
+        )
+        return sum(len(v) for v in vectors)
+
+    def build_keyword_index(self, textbook_id: Union[str, UUID]) -> int:
+        """
+        Rebuild the textbook's BM25 inverted index from the stored page text.
+
+        Args:
+            textbook_id: Textbook UUID
+
+        Returns:
+            Number of indexed pages
+        """
+        pages_dir = self.textbook_dir(textbook_id) / "pages"
+        paths = sorted(pages_dir.glob("[0-9]*.txt"))
+        KeywordIndex.build(
+            self._keyword_dir(textbook_id),
+            ((int(path.stem), path.read_text(encoding="utf-8")) for path in paths)
+        )
+        return len(paths)
+
+    def build_question_index(self, textbook_id: Union[str, UUID]) -> int:
+        """
+        Compact per-page question files into one index keyed by page.
+
+        Args:
+            textbook_id: Textbook UUID
+
+        Returns:
+            Number of indexed questions
+        """
+        pages: Dict[str, list] = {}
+        answers: Dict[str, List[Tuple[int, str]]] = defaultdict(list)
+        pages_dir = self.textbook_dir(textbook_id) / "questions" / "pages"
+
+        for path in sorted(pages_dir.glob("[0-9]*.json")):
+            data = json.loads(path.read_text(encoding="utf-8"))
+            page_number = int(path.stem)
+            if data["questions"]:
+                pages[str(page_number)] = data["questions"]
+            for number, answer in data["answers"].items():
+                answers[number].append((page_number, answer))
+
+        path = self._question_index_path(textbook_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix(".part")
+        partial.write_text(json.dumps({"pages": pages, "answers": answers}), encoding="utf-8")
+        partial.replace(path)
+
+        count = sum(len(questions) for questions in pages.values())
+        logger.info(f"Built question index for textbook {textbook_id} ({count} questions)")
+        return count
+
+    def get_questions(
+        self,
+        textbook_id: Union[str, UUID],
+        page_numbers: Iterable[int]
+    ) -> List[Question]:
+        """
+        Questions on the given pages, with answers attached where known.
+
+        An inline "Answer:" wins; otherwise the answer-key entry with the
+        same number on the nearest page at or after the question is used.
+
+        Args:
+            textbook_id: Textbook UUID
+            page_numbers: Pages to look up (e.g. parsed Homework.page_numbers)
+
+        Returns:
+            Questions in page order
+        """
+        path = self._question_index_path(textbook_id)
+        if not path.exists():
+            return []
+
+        index = _load_question_index(str(path), path.stat().st_mtime_ns)
+        questions = []
+
+        for page_number in sorted(set(page_numbers)):
+            for data in index["pages"].get(str(page_number), []):
+                question = Question(**{**data, "question_type": QuestionType(data["question_type"])})
+                if question.answer is None:
+                    candidates = [
+                        (page, answer) for page, answer in index["answers"].get(question.number, [])
+                        if page >= page_number
+                    ]
+                    if candidates:
+                        question.answer = min(candidates)[1]
+                questions.append(question)
+
+        return questions
+
+    def search(
+        self,
+        query: str,
+        textbook_id: Union[str, UUID],
+        top_k: int = 5,
+        page_numbers: Optional[Iterable[int]] = None
+    ) -> List[SearchResult]:
+        """
+        Hybrid keyword + semantic search within one textbook.
+
+        Args:
+            query: Search text
+            textbook_id: Textbook UUID
+            top_k: Number of results (one per page)
+            page_numbers: Only search these pages
+
+        Returns:
+            Matching passages, best first
+        """
+        if page_numbers is not None:
+            page_numbers = list(page_numbers)
+
+        keyword_hits = self.keyword_search(query, textbook_id, top_k * 2, page_numbers)
+
+        # References are answered by the inverted index; no embedding needed
+        if keyword_hits and is_exact_lookup(query):
+            return [
+                SearchResult(page, score, self._snippet(textbook_id, page, query))
+                for page, score in keyword_hits[:top_k]
+            ]
+
+        vector_hits = self.semantic_search(query, textbook_id, top_k * 2, page_numbers)
+
+        fused: Dict[int, float] = defaultdict(float)
+        passages: Dict[int, SearchResult] = {}
+        for result in vector_hits:
+            if result.page_number in passages:
+                continue
+            passages[result.page_number] = result
+            fused[result.page_number] += 1.0 / (RRF_K + len(passages))
+        for rank, (page, _) in enumerate(keyword_hits, start=1):
+            fused[page] += TEXTBOOK_SEARCH_KEYWORD_WEIGHT / (RRF_K + rank)
+
+        ranked = sorted(fused, key=fused.get, reverse=True)[:top_k]
+        return [
+            SearchResult(
+                page_number=page,
+                score=fused[page],
+                text=passages[page].text if page in passages else self._snippet(textbook_id, page, query)
+            )
+            for page in ranked
+        ]
+
+    def keyword_search(
+        self,
+        query: str,
+        textbook_id: Union[str, UUID],
+        top_k: int = 10,
+        page_numbers: Optional[Iterable[int]] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        BM25 page ranking from the inverted index.
+
+        Returns:
+            (page number, score) pairs, best first
+        """
+        keyword_dir = self._keyword_dir(textbook_id)
+        if not KeywordIndex.exists(keyword_dir):
+            return []
+        return KeywordIndex.load(keyword_dir).search(query, top_k=top_k, page_numbers=page_numbers)
+
+    def semantic_search(
+        self,
+        query: str,
+        textbook_id: Union[str, UUID],
+        top_k: int = 10,
+        page_numbers: Optional[Iterable[int]] = None
+    ) -> List[SearchResult]:
+        """
+        Nearest chunks by embedding similarity.
+
+        Returns:
+            Matching chunks (possibly several per page), best first
+        """
+        vector_dir = self._vector_dir(textbook_id)
+        if not VectorIndex.exists(vector_dir):
+            return []
+
+        index = VectorIndex.load(vector_dir)
+        rows = None
+        if page_numbers is not None:
+            rows = np.flatnonzero(np.isin(index.chunk_pages, list(page_numbers)))
+
+        query_vector = self.embedder([query])[0]
+        page_texts: Dict[int, str] = {}
+        results = []
+
+        for row, score in index.search(query_vector, top_k=top_k, rows=rows):
+            page_number = int(index.chunk_pages[row])
+            if page_number not in page_texts:
+                page_texts[page_number] = self.get_page_text(textbook_id, page_number) or ""
+            start, end = index.chunk_spans[row]
+            results.append(SearchResult(
+                page_number=page_number,
+                score=score,
+                text=page_texts[page_number][start:end]
+            ))
+
+        return results
+
+    def page_vectors(
+        self,
+        textbook_id: Union[str, UUID],
+        page_numbers: Iterable[int]
+    ) -> np.ndarray:
+        """
+        Chunk embeddings of the given pages, read from the vector shard.
+
+        Returns:
+            float32 (n, dim) matrix; empty if the textbook is not indexed
+        """
+        vector_dir = self._vector_dir(textbook_id)
+        if not VectorIndex.exists(vector_dir):
+            return np.zeros((0, 0), dtype=np.float32)
+
+        index = VectorIndex.load(vector_dir)
+        rows = np.flatnonzero(np.isin(index.chunk_pages, list(page_numbers)))
+        return np.asarray(index.vectors_f32[rows])
+
+    def _snippet(self, textbook_id: Union[str, UUID], page_number: int, query: str) -> str:
+        """Chunk-sized excerpt of a page around the first query match."""
+        text = self.get_page_text(textbook_id, page_number) or ""
+        lowered = text.lower()
+
+        # Prefer the whole phrase, then the longest (most specific) token
+        tokens = tokenize(query)
+        candidates = [" ".join(tokens)] + sorted(tokens, key=len, reverse=True)
+        position = next((p for p in (lowered.find(c) for c in candidates if c) if p >= 0), 0)
+
+        start = max(0, position - TEXTBOOK_CHUNK_CHARS // 4)
+        return text[start:start + TEXTBOOK_CHUNK_CHARS].strip()
+
+    def get_page_text(self, textbook_id: Union[str, UUID], page_number: int) -> Optional[str]:
+        """
+        Read back the indexed text of a page.
+
+        Returns:
+            Page text or None if the page has not been indexed
+        """
+        path = self._page_path(textbook_id, page_number)
+        if not path.exists():
+            return None
+        return path.read_text(encoding="utf-8")
+
+
+@lru_cache(maxsize=32)
+def _load_question_index(path: str, mtime_ns: int) -> dict:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
@@ -0,0 +1,244 @@
+# keyword_index.py - Textbook Keyword Index
+#
+# Compact inverted index with BM25 scoring for exact-term lookups.
+
+"""
+Keyword Index
+
+- KeywordIndex.build(index_dir, pages) -> None
+- KeywordIndex.load(index_dir) -> KeywordIndex
+- KeywordIndex.search(query, top_k, page_numbers) -> List[Tuple[int, float]]
+- query_terms(text) -> List[str]
+- is_exact_lookup(query) -> bool
+
+One index per textbook, with pages as documents:
+
+    vocab.json        sorted list of terms
+    term_offsets.npy  int64 (terms + 1,)  postings of term i are offsets[i]:offsets[i+1]
+    postings_gaps.npy uint16/uint32       page numbers, delta-encoded per term
+    postings_tf.npy   uint16              term frequency in each posting
+    doc_lengths.npy   int32 (pages + 1,)  token count of each page (index = page number)
+
+Terms are lowercase tokens plus bigrams that contain a number
+("exercise 4.2", "table 3"), so references like "Exercise 4.2" or a
+formula like "H2SO4" resolve to the right page instead of every page
+that mentions "exercise" or "4.2" separately.
+"""
+
+import json
+import logging
+import shutil
+from collections import Counter, defaultdict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from config import VECTOR_INDEX_CACHE_SHARDS
+from utils.text_utils import tokenize
+
+logger = logging.getLogger(__name__)
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def _has_digit(token: str) -> bool:
+    return any(c.isdigit() for c in token)
+
+
+def is_exact_lookup(query: str) -> bool:
+    """
+    Whether a query reads as a reference rather than a concept, e.g.
+    "Exercise 4.2", "Table 3" or "H2SO4": short and containing a number.
+    """
+    tokens = tokenize(query)
+    return 0 < len(tokens) <= 4 and any(_has_digit(token) for token in tokens)
+
+
+def query_terms(text: str) -> List[str]:
+    """
+    Index terms of a text: tokens plus bigrams containing a number.
+
+    Args:
+        text: Page or query text
+
+    Returns:
+        Terms in order of appearance (with repeats)
+    """
+    tokens = tokenize(text)
+    terms = list(tokens)
+    for first, second in zip(tokens, tokens[1:]):
+        if _has_digit(first) or _has_digit(second):
+            terms.append(f"{first} {second}")
+    return terms
+
+
+class KeywordIndex:
+    """
+    BM25 inverted index over the pages of one textbook.
+    Use KeywordIndex.load() to open an index written by KeywordIndex.build().
+    """
+
+    def __init__(
+        self,
+        vocab: Dict[str, int],
+        term_offsets: np.ndarray,
+        postings_gaps: np.ndarray,
+        postings_tf: np.ndarray,
+        doc_lengths: np.ndarray
+    ):
+        self.vocab = vocab
+        self.term_offsets = term_offsets
+        self.postings_gaps = postings_gaps
+        self.postings_tf = postings_tf
+        self.doc_lengths = doc_lengths
+        self.doc_count = int(np.count_nonzero(doc_lengths))
+        self.avg_length = float(doc_lengths.sum()) / self.doc_count if self.doc_count else 0.0
+
+    @staticmethod
+    def build(index_dir: Union[str, Path], pages: Iterable[Tuple[int, str]]) -> None:
+        """
+        Build an index and atomically replace any existing one.
+
+        Args:
+            index_dir: Index directory (removed if no page has text)
+            pages: (page number, text) pairs
+        """
+        index_dir = Path(index_dir)
+        postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        lengths: Dict[int, int] = {}
+
+        for page_number, text in sorted(pages):
+            terms = query_terms(text)
+            if not terms:
+                continue
+            lengths[page_number] = len(terms)
+            for term, tf in Counter(terms).items():
+                postings[term].append((page_number, tf))
+
+        if not lengths:
+            shutil.rmtree(index_dir, ignore_errors=True)
+            return
+
+        vocab = sorted(postings)
+        offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        gaps: List[int] = []
+        tfs: List[int] = []
+
+        for i, term in enumerate(vocab):
+            previous = 0
+            for page_number, tf in postings[term]:
+                gaps.append(page_number - previous)
+                tfs.append(min(tf, np.iinfo(np.uint16).max))
+                previous = page_number
+            offsets[i + 1] = len(gaps)
+
+        max_gap = max(gaps, default=0)
+        gap_dtype = np.uint16 if max_gap <= np.iinfo(np.uint16).max else np.uint32
+        doc_lengths = np.zeros(max(lengths, default=0) + 1, dtype=np.int32)
+        for page_number, length in lengths.items():
+            doc_lengths[page_number] = length
+
+        partial = index_dir.with_name(index_dir.name + ".tmp")
+        shutil.rmtree(partial, ignore_errors=True)
+        partial.mkdir(parents=True)
+
+        (partial / "vocab.json").write_text(json.dumps(vocab), encoding="utf-8")
+        np.save(partial / "term_offsets.npy", offsets)
+        np.save(partial / "postings_gaps.npy", np.asarray(gaps, dtype=gap_dtype))
+        np.save(partial / "postings_tf.npy", np.asarray(tfs, dtype=np.uint16))
+        np.save(partial / "doc_lengths.npy", doc_lengths)
+
+        stale = index_dir.with_name(index_dir.name + ".old")
+        shutil.rmtree(stale, ignore_errors=True)
+        if index_dir.exists():
+            index_dir.rename(stale)
+        partial.rename(index_dir)
+        shutil.rmtree(stale, ignore_errors=True)
+
+        logger.info(f"Built keyword index {index_dir} ({len(vocab)} terms, {len(gaps)} postings)")
+
+    @staticmethod
+    def exists(index_dir: Union[str, Path]) -> bool:
+        return (Path(index_dir) / "vocab.json").exists()
+
+    @staticmethod
+    def load(index_dir: Union[str, Path]) -> "KeywordIndex":
+        """
+        Open an index. Repeated loads of an unchanged index return the
+        cached instance.
+        """
+        vocab_path = Path(index_dir) / "vocab.json"
+        return _load_index(str(index_dir), vocab_path.stat().st_mtime_ns)
+
+    def postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Decode the postings of a term.
+
+        Returns:
+            (page numbers, term frequencies); empty arrays if unknown
+        """
+        term_id = self.vocab.get(term)
+        if term_id is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint16)
+        start, end = self.term_offsets[term_id], self.term_offsets[term_id + 1]
+        pages = np.cumsum(self.postings_gaps[start:end], dtype=np.int64)
+        return pages, self.postings_tf[start:end]
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        page_numbers: Optional[Iterable[int]] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Rank pages by BM25 against the query terms.
+
+        Args:
+            query: Search text
+            top_k: Number of results
+            page_numbers: Only score these pages
+
+        Returns:
+            (page number, score) pairs, best first
+        """
+        if not self.doc_count or top_k <= 0:
+            return []
+
+        scores = np.zeros(len(self.doc_lengths), dtype=np.float32)
+        for term in set(query_terms(query)):
+            pages, tf = self.postings(term)
+            if not len(pages):
+                continue
+            idf = np.log(1 + (self.doc_count - len(pages) + 0.5) / (len(pages) + 0.5))
+            tf = tf.astype(np.float32)
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[pages] / self.avg_length)
+            scores[pages] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        if page_numbers is not None:
+            mask = np.zeros_like(scores, dtype=bool)
+            allowed = [p for p in page_numbers if 0 < p < len(scores)]
+            mask[allowed] = True
+            scores[~mask] = 0
+
+        matched = np.flatnonzero(scores)
+        if not len(matched):
+            return []
+        top = matched[np.argsort(-scores[matched], kind="stable")[:top_k]]
+        return [(int(page), float(scores[page])) for page in top]
+
+
+@lru_cache(maxsize=VECTOR_INDEX_CACHE_SHARDS)
+def _load_index(index_dir: str, mtime_ns: int) -> KeywordIndex:
+    directory = Path(index_dir)
+    vocab = json.loads((directory / "vocab.json").read_text(encoding="utf-8"))
+    return KeywordIndex(
+        vocab={term: i for i, term in enumerate(vocab)},
+        term_offsets=np.load(directory / "term_offsets.npy"),
+        postings_gaps=np.load(directory / "postings_gaps.npy", mmap_mode="r"),
+        postings_tf=np.load(directory / "postings_tf.npy", mmap_mode="r"),
+        doc_lengths=np.load(directory / "doc_lengths.npy")
+    )
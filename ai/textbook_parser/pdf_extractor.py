@@ -6,17 +6,326 @@
 PDF Extractor
 
 Methods:
-- extract_text(pdf_path) -> List[PageContent]
-- extract_images(pdf_path) -> List[Image]
+- iter_pages(pdf_path, start, end, include_images) -> Iterator[PageContent]
+- iter_pages_parallel(pdf_path, workers) -> Iterator[PageContent]
+- extract_text(pdf_path) -> Iterator[PageContent]
+- extract_images(pdf_path) -> Iterator[PageImage]
 - extract_metadata(pdf_path) -> Metadata
 - get_page_count(pdf_path) -> int
 
 PageContent:
 - page_number: int
 - text: str
-- images: List[Image]
+- images: List[PageImage]
+
+Textbooks routinely run to 600+ pages, so everything here is a generator:
+the PDF is memory-mapped and handed to pdfium, which pulls only the bytes
+it needs, and at most one page (or one page range per worker process)
+of text and images is materialised at a time.
 """
 
-# TODO: Implement PDF text extraction with PyPDF2/pdfplumber
-# TODO: Extract embedded images
-# TODO: Handle different PDF formats
+import io
+import logging
+import mmap
+from concurrent.futures import ProcessPoolExecutor, Future
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Deque, Iterator, List, Optional, Union
+
+# pypdfium2 for fast, incremental PDF access (installed with pdfplumber)
+try:
+    import pypdfium2 as pdfium
+    import pypdfium2.raw as pdfium_c
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    PDFIUM_AVAILABLE = False
+
+from config import TEXTBOOK_EXTRACT_WORKERS, TEXTBOOK_PAGE_CHUNK
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, Path]
+
+
+@dataclass
+class PageImage:
+    """Image embedded in a PDF page."""
+    page_number: int
+    index: int
+    width: int
+    height: int
+    data: bytes  # PNG encoded
+
+
+@dataclass
+class PageContent:
+    """Extracted content of a single PDF page."""
+    page_number: int
+    text: str
+    images: List[PageImage] = field(default_factory=list)
+
+
+@dataclass
+class Metadata:
+    """PDF document metadata."""
+    title: Optional[str]
+    author: Optional[str]
+    subject: Optional[str]
+    creator: Optional[str]
+    page_count: int
+
+
+class _MappedReader:
+    """
+    Minimal read-only file object over an mmap.
+
+    pdfium reads through seek()/readinto(), so pages are served straight
+    from the OS page cache without loading the whole file.
+    """
+
+    def __init__(self, mapped: mmap.mmap):
+        self._view = memoryview(mapped)
+        self._pos = 0
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        else:
+            self._pos = len(self._view) + offset
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._view) if size < 0 else self._pos + size
+        data = self._view[self._pos:end].tobytes()
+        self._pos += len(data)
+        return data
+
+    def readinto(self, buffer) -> int:
+        chunk = self._view[self._pos:self._pos + len(buffer)]
+        buffer[:len(chunk)] = chunk
+        self._pos += len(chunk)
+        return len(chunk)
+
+    def release(self) -> None:
+        self._view.release()
+
+
+class _MappedDocument:
+    """Context manager opening a memory-mapped PdfDocument."""
+
+    def __init__(self, pdf_path: PathLike):
+        self.pdf_path = Path(pdf_path)
+
+    def __enter__(self) -> "pdfium.PdfDocument":
+        if not PDFIUM_AVAILABLE:
+            raise RuntimeError("pypdfium2 is required for PDF extraction")
+
+        self._file = open(self.pdf_path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._reader = _MappedReader(self._mmap)
+        self._document = pdfium.PdfDocument(self._reader)
+        return self._document
+
+    def __exit__(self, *exc) -> None:
+        self._document.close()
+        self._reader.release()
+        self._mmap.close()
+        self._file.close()
+
+
+def _page_images(page, page_number: int) -> List[PageImage]:
+    """Extract embedded images of one page as PNG."""
+    images = []
+    objects = page.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_IMAGE], max_depth=2)
+    for index, image_obj in enumerate(objects):
+        try:
+            pil_image = image_obj.get_bitmap().to_pil()
+        except Exception as e:
+            logger.debug(f"Skipping unreadable image {index} on page {page_number}: {e}")
+            continue
+        buffer = io.BytesIO()
+        pil_image.save(buffer, format="PNG")
+        images.append(PageImage(
+            page_number=page_number,
+            index=index,
+            width=pil_image.width,
+            height=pil_image.height,
+            data=buffer.getvalue()
+        ))
+    return images
+
+
+def _iter_range(
+    document,
+    start: int,
+    end: int,
+    include_images: bool
+) -> Iterator[PageContent]:
+    """Yield pages start..end (1-based, inclusive) from an open document."""
+    for page_number in range(start, end + 1):
+        page = document[page_number - 1]
+        textpage = page.get_textpage()
+        try:
+            text = textpage.get_text_range()
+            images = _page_images(page, page_number) if include_images else []
+        finally:
+            textpage.close()
+            page.close()
+        yield PageContent(page_number=page_number, text=text, images=images)
+
+
+def _extract_range(
+    pdf_path: str,
+    start: int,
+    end: int,
+    include_images: bool
+) -> List[PageContent]:
+    """Process-pool worker: extract one bounded page range."""
+    with _MappedDocument(pdf_path) as document:
+        return list(_iter_range(document, start, end, include_images))
+
+
+class PDFExtractor:
+    """
+    Streaming PDF textbook extractor.
+    Yields one PageContent at a time from a memory-mapped PDF.
+    """
+
+    def __init__(
+        self,
+        workers: int = TEXTBOOK_EXTRACT_WORKERS,
+        chunk_pages: int = TEXTBOOK_PAGE_CHUNK
+    ):
+        self.workers = workers
+        self.chunk_pages = max(1, chunk_pages)
+
+    def get_page_count(self, pdf_path: PathLike) -> int:
+        """
+        Get number of pages in a PDF.
+
+        Args:
+            pdf_path: Path to PDF file
+
+        Returns:
+            Page count
+        """
+        with _MappedDocument(pdf_path) as document:
+            return len(document)
+
+    def extract_metadata(self, pdf_path: PathLike) -> Metadata:
+        """
+        Read document metadata.
+
+        Args:
+            pdf_path: Path to PDF file
+
+        Returns:
+            Metadata object
+        """
+        with _MappedDocument(pdf_path) as document:
+            info = document.get_metadata_dict(skip_empty=True)
+            return Metadata(
+                title=info.get("Title"),
+                author=info.get("Author"),
+                subject=info.get("Subject"),
+                creator=info.get("Creator"),
+                page_count=len(document)
+            )
+
+    def iter_pages(
+        self,
+        pdf_path: PathLike,
+        start: int = 1,
+        end: Optional[int] = None,
+        include_images: bool = False
+    ) -> Iterator[PageContent]:
+        """
+        Stream pages of a PDF in order.
+
+        Args:
+            pdf_path: Path to PDF file
+            start: First page (1-based)
+            end: Last page, inclusive (defaults to the last page)
+            include_images: Also extract embedded images
+
+        Yields:
+            PageContent for each page
+        """
+        with _MappedDocument(pdf_path) as document:
+            end = min(end or len(document), len(document))
+            yield from _iter_range(document, start, end, include_images)
+
+    def iter_pages_parallel(
+        self,
+        pdf_path: PathLike,
+        include_images: bool = False,
+        workers: Optional[int] = None
+    ) -> Iterator[PageContent]:
+        """
+        Stream pages using a process pool across page ranges.
+
+        Ranges of chunk_pages pages are extracted in worker processes and
+        yielded in page order. At most two ranges per worker are in
+        flight, so memory stays bounded regardless of document size.
+        Falls back to iter_pages() when workers <= 1.
+
+        Args:
+            pdf_path: Path to PDF file
+            include_images: Also extract embedded images
+            workers: Worker processes (defaults to TEXTBOOK_EXTRACT_WORKERS)
+
+        Yields:
+            PageContent for each page
+        """
+        workers = self.workers if workers is None else workers
+        if workers <= 1:
+            yield from self.iter_pages(pdf_path, include_images=include_images)
+            return
+
+        page_count = self.get_page_count(pdf_path)
+        ranges = (
+            (start, min(start + self.chunk_pages - 1, page_count))
+            for start in range(1, page_count + 1, self.chunk_pages)
+        )
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            in_flight: Deque[Future] = deque()
+            for start, end in ranges:
+                in_flight.append(
+                    executor.submit(_extract_range, str(pdf_path), start, end, include_images)
+                )
+                if len(in_flight) >= workers * 2:
+                    yield from in_flight.popleft().result()
+            while in_flight:
+                yield from in_flight.popleft().result()
+
+    def extract_text(self, pdf_path: PathLike) -> Iterator[PageContent]:
+        """
+        Stream the text of every page.
+
+        Args:
+            pdf_path: Path to PDF file
+
+        Yields:
+            PageContent (without images) for each page
+        """
+        return self.iter_pages_parallel(pdf_path, include_images=False)
+
+    def extract_images(self, pdf_path: PathLike) -> Iterator[PageImage]:
+        """
+        Stream embedded images page by page.
+
+        Args:
+            pdf_path: Path to PDF file
+
+        Yields:
+            PageImage for each embedded image
+        """
+        for page in self.iter_pages(pdf_path, include_images=True):
+            yield from page.images
@@ -6,17 +6,235 @@
 Question Extractor
 
 Methods:
-- extract_questions(page_text) -> List[Question]
+- extract_questions(page_text, page_number) -> List[Question]
 - classify_question(question) -> QuestionType
-- extract_answer_key(page_text) -> Dict[int, str]
+- extract_answer_key(page_text) -> Dict[str, str]
+- QuestionScanner.scan(page_number, page_text) -> PageQuestions
+- iter_page_questions(pages) -> Iterator[PageQuestions]
 
 QuestionType:
 - multiple_choice
 - short_answer
 - essay
 - problem_solving
+
+Every line is matched once against a single combined regex built from
+the pattern table below, so a page is scanned in one pass regardless of
+how many patterns there are. The scanner keeps a little state between
+pages (an answer key that continues onto the next page), so pages must
+be fed in order; iter_page_questions() does that lazily for a stream.
 """
 
-# TODO: Implement question pattern recognition
-# TODO: Classify question types
-# TODO: Extract answer keys if available
+import re
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class QuestionType(str, Enum):
+    """Question categories."""
+    MULTIPLE_CHOICE = "multiple_choice"
+    SHORT_ANSWER = "short_answer"
+    ESSAY = "essay"
+    PROBLEM_SOLVING = "problem_solving"
+
+
+@dataclass
+class Question:
+    """A question or exercise found on a textbook page."""
+    number: str
+    text: str
+    page_number: int
+    question_type: QuestionType = QuestionType.SHORT_ANSWER
+    options: List[str] = field(default_factory=list)
+    answer: Optional[str] = None
+
+
+@dataclass
+class PageQuestions:
+    """Questions and answer-key entries found on one page."""
+    page_number: int
+    questions: List[Question] = field(default_factory=list)
+    answers: Dict[str, str] = field(default_factory=dict)
+
+
+_NUMBER = r"\d+(?:\.\d+)*[a-z]?"
+
+# (kind, pattern) — order matters: the first alternative that matches wins
+_LINE_PATTERNS: List[Tuple[str, str]] = [
+    ("answer_header", r"(?:answer\s+key|answers|solutions)(?:\s+(?:to|for)\s+[\w .-]{1,40})?:?"),
+    ("heading", r"(?:chapter|unit|lesson|section)\s+\d+\b.*"),
+    ("inline_answer", r"(?:answer|ans)\s*[:.]\s*(?P<inline_answer_text>.+)"),
+    (
+        "labeled",
+        rf"(?:exercise|question|problem|q)\.?\s*(?P<labeled_num>{_NUMBER})\s*[.):]?\s*(?P<labeled_text>.*)"
+    ),
+    ("numbered", rf"(?P<numbered_num>{_NUMBER})\s*[.):]\s+(?P<numbered_text>.+)"),
+    ("option", r"\(?(?P<option_letter>[a-e])[.)]\s+(?P<option_text>.+)"),
+    # "4.2 B" — only an answer inside an answer key, plain text elsewhere
+    ("bare_numbered", rf"(?P<bare_numbered_num>{_NUMBER})\s+(?P<bare_numbered_text>.+)"),
+]
+
+_LINE = re.compile(
+    r"^\s*(?:" + "|".join(f"(?P<{kind}>{pattern})" for kind, pattern in _LINE_PATTERNS) + r")\s*$",
+    re.IGNORECASE
+)
+_KINDS = [kind for kind, _ in _LINE_PATTERNS]
+
+_PROBLEM_CUES = re.compile(
+    r"\b(?:calculate|compute|solve|evaluate|simplify|find|determine|prove|how\s+many|how\s+much)\b|[=+×÷^]|\d\s*[-*/]\s*\d",
+    re.IGNORECASE
+)
+_ESSAY_CUES = re.compile(
+    r"\b(?:discuss|describe|explain\s+why|essay|compare|contrast|analy[sz]e|argue|justify|in\s+your\s+own\s+words)\b",
+    re.IGNORECASE
+)
+
+# Essays are open-ended prompts of some length
+_ESSAY_MIN_WORDS = 8
+
+
+def classify_question(question: Question) -> QuestionType:
+    """
+    Classify a question by its options and wording.
+
+    Args:
+        question: Extracted question
+
+    Returns:
+        QuestionType
+    """
+    if len(question.options) >= 2:
+        return QuestionType.MULTIPLE_CHOICE
+    if _PROBLEM_CUES.search(question.text):
+        return QuestionType.PROBLEM_SOLVING
+    if _ESSAY_CUES.search(question.text) and len(question.text.split()) >= _ESSAY_MIN_WORDS:
+        return QuestionType.ESSAY
+    return QuestionType.SHORT_ANSWER
+
+
+class QuestionScanner:
+    """
+    Single-pass, line-oriented question and answer-key scanner.
+    Feed pages in order; state carries answer keys across page breaks.
+    """
+
+    def __init__(self):
+        self.in_answer_key = False
+
+    def reset(self) -> None:
+        """Forget state carried over from previous pages."""
+        self.in_answer_key = False
+
+    def scan(self, page_number: int, page_text: str) -> PageQuestions:
+        """
+        Scan one page.
+
+        Args:
+            page_number: Page number
+            page_text: Extracted page text
+
+        Returns:
+            PageQuestions for the page
+        """
+        result = PageQuestions(page_number=page_number)
+        current: Optional[Question] = None
+        last_answer: Optional[str] = None
+
+        for line in page_text.splitlines():
+            match = _LINE.match(line)
+            kind = next(k for k in _KINDS if match.group(k) is not None) if match else None
+
+            if kind is None or (kind == "bare_numbered" and not self.in_answer_key):
+                stripped = line.strip()
+                if not stripped:
+                    # A blank line ends the running question or answer
+                    current = None
+                    last_answer = None
+                elif last_answer is not None:
+                    result.answers[last_answer] += " " + stripped
+                elif current is not None:
+                    if current.options:
+                        current.options[-1] += " " + stripped
+                    else:
+                        current.text += " " + stripped
+            elif kind == "answer_header":
+                self.in_answer_key = True
+                current = None
+            elif kind == "heading":
+                self.in_answer_key = False
+                current = last_answer = None
+            elif kind == "inline_answer":
+                if current is not None:
+                    current.answer = match.group("inline_answer_text").strip()
+            elif kind == "labeled":
+                # "Exercise 4.2" always starts a question, even after a key
+                self.in_answer_key = False
+                current = self._start(result, match.group("labeled_num"), match.group("labeled_text"))
+                last_answer = None
+            elif kind in ("numbered", "bare_numbered"):
+                number = match.group(f"{kind}_num")
+                text = match.group(f"{kind}_text").strip()
+                if self.in_answer_key:
+                    result.answers[number] = text
+                    last_answer = number
+                    current = None
+                else:
+                    current = self._start(result, number, text)
+            elif kind == "option":
+                if current is not None:
+                    current.options.append(
+                        f"{match.group('option_letter').upper()}) {match.group('option_text').strip()}"
+                    )
+
+        for question in result.questions:
+            question.question_type = classify_question(question)
+        return result
+
+    @staticmethod
+    def _start(result: PageQuestions, number: str, text: str) -> Question:
+        question = Question(number=number, text=text.strip(), page_number=result.page_number)
+        result.questions.append(question)
+        return question
+
+
+def iter_page_questions(pages: Iterable[Tuple[int, str]]) -> Iterator[PageQuestions]:
+    """
+    Lazily scan a stream of (page number, text) pairs in page order.
+
+    Yields:
+        PageQuestions for each page
+    """
+    scanner = QuestionScanner()
+    for page_number, text in pages:
+        yield scanner.scan(page_number, text)
+
+
+def extract_questions(page_text: str, page_number: int = 0) -> List[Question]:
+    """
+    Extract the questions on a single page.
+
+    Args:
+        page_text: Extracted page text
+        page_number: Page the text came from
+
+    Returns:
+        Questions in page order, classified
+    """
+    return QuestionScanner().scan(page_number, page_text).questions
+
+
+def extract_answer_key(page_text: str) -> Dict[str, str]:
+    """
+    Extract answer-key entries from a page.
+
+    Numbered lines are read as answers once an "Answers"/"Answer Key"
+    heading has been seen on the page.
+
+    Args:
+        page_text: Extracted page text
+
+    Returns:
+        Dict of question number -> answer
+    """
+    return QuestionScanner().scan(0, page_text).answers
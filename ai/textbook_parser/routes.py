@@ -0,0 +1,144 @@
+# routes.py - Textbook API Routes
+#
+# Endpoints for textbook indexing.
+
+"""
+Textbook Endpoints
+
+POST /textbook/index  - Index (or resume indexing) a textbook PDF
+POST /textbook/search - Search within one indexed textbook
+GET  /textbook/{id}/questions?pages=45-47 - Questions on the given pages
+
+Progress is streamed back as newline-delimited JSON so the caller can
+checkpoint every page as it completes:
+
+    {"event": "started", "page_count": 612}
+    {"event": "page", "page_number": 1, "content_hash": "...", "skipped": false}
+    {"event": "completed", "indexed": 600, "skipped": 12}
+    {"event": "error", "message": "..."}
+"""
+
+import asyncio
+import json
+import logging
+from dataclasses import asdict
+from typing import AsyncIterator, Dict, List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from config import TEXTBOOK_MAX_BYTES
+from textbook_parser.indexer import TextbookIndexer
+from utils.http_client import download_to_file
+from utils.text_utils import parse_page_numbers
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+class IndexRequest(BaseModel):
+    """Textbook indexing request."""
+    textbook_id: UUID = Field(..., description="Textbook UUID")
+    file_url: str = Field(..., description="URL of the textbook PDF")
+    start_page: int = Field(1, ge=1, description="First page to process")
+    page_hashes: Dict[int, str] = Field(
+        default_factory=dict,
+        description="Content hashes of pages already indexed"
+    )
+    force: bool = Field(False, description="Discard the cached PDF and index files and rebuild from scratch")
+
+
+class SearchRequest(BaseModel):
+    """Textbook search request."""
+    textbook_id: UUID = Field(..., description="Textbook UUID")
+    query: str = Field(..., min_length=1, description="Search text")
+    top_k: int = Field(5, ge=1, le=50, description="Number of results")
+    page_numbers: Optional[List[int]] = Field(None, description="Only search these pages")
+
+
+def _event(**data) -> str:
+    return json.dumps(data) + "\n"
+
+
+async def _index_events(request: IndexRequest) -> AsyncIterator[str]:
+    indexer = TextbookIndexer()
+    pdf_path = indexer.source_path(request.textbook_id)
+
+    try:
+        # Resumed jobs reuse the PDF downloaded by the interrupted run;
+        # a forced rebuild may be for a replaced file at the same URL, so
+        # it starts without the old PDF or any of its index files
+        if request.force:
+            indexer.discard_index(request.textbook_id)
+        if not pdf_path.exists():
+            await download_to_file(request.file_url, pdf_path, max_bytes=TEXTBOOK_MAX_BYTES)
+
+        page_count = await asyncio.to_thread(indexer.get_page_count, pdf_path)
+        yield _event(event="started", page_count=page_count)
+
+        pages = indexer.index_textbook(
+            request.textbook_id,
+            pdf_path,
+            start_page=request.start_page,
+            page_hashes=request.page_hashes
+        )
+        indexed = skipped = 0
+        while True:
+            # Extraction is CPU-bound; keep it off the event loop
+            result = await asyncio.to_thread(next, pages, None)
+            if result is None:
+                break
+            if result.skipped:
+                skipped += 1
+            else:
+                indexed += 1
+            yield _event(
+                event="page",
+                page_number=result.page_number,
+                content_hash=result.content_hash,
+                skipped=result.skipped
+            )
+
+        yield _event(event="completed", indexed=indexed, skipped=skipped)
+    except Exception as e:
+        logger.error(f"Indexing textbook {request.textbook_id} failed: {e}")
+        yield _event(event="error", message=str(e))
+
+
+@router.post("/index")
+async def index_textbook(request: IndexRequest):
+    """Index a textbook, streaming per-page progress as NDJSON."""
+    return StreamingResponse(
+        _index_events(request),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.post("/search")
+async def search_textbook(request: SearchRequest):
+    """Search a textbook by keywords and meaning (hybrid)."""
+    indexer = TextbookIndexer()
+    results = await asyncio.to_thread(
+        indexer.search,
+        request.query,
+        request.textbook_id,
+        top_k=request.top_k,
+        page_numbers=request.page_numbers
+    )
+    return {
+        "results": [
+            {"page_number": r.page_number, "score": r.score, "text": r.text}
+            for r in results
+        ]
+    }
+
+
+@router.get("/{textbook_id}/questions")
+async def get_questions(textbook_id: UUID, pages: str):
+    """Questions (with answers where known) on the given pages."""
+    indexer = TextbookIndexer()
+    questions = indexer.get_questions(textbook_id, parse_page_numbers(pages))
+    return {"questions": [asdict(question) for question in questions]}
@@ -0,0 +1,267 @@
+# vector_index.py - Textbook Vector Index
+#
+# Memory-mapped approximate nearest neighbour search over page chunks.
+
+"""
+Vector Index
+
+- VectorIndex.build(index_dir, vectors, pages, spans) -> None
+- VectorIndex.load(index_dir) -> VectorIndex
+- VectorIndex.search(query, top_k, nprobe, rows) -> List[Tuple[int, float]]
+
+One index (shard) per textbook, stored as plain NumPy arrays that are
+memory-mapped on load, so opening a shard costs nothing and only the
+rows a query touches are paged in:
+
+    vectors_f16.npy   float16 (n, dim)     compact copy scanned while probing
+    vectors_f32.npy   float32 (n, dim)     exact vectors, used for re-ranking
+    centroids.npy     float32 (nlist, dim) IVF coarse quantiser
+    list_offsets.npy  int64 (nlist + 1,)   rows of list i are offsets[i]:offsets[i+1]
+    chunk_pages.npy   int32 (n,)           page number of each row
+    chunk_spans.npy   int32 (n, 2)         character span of the chunk in its page
+    meta.json         dim, count, nlist
+
+Rows are grouped by IVF list, so probing a list reads one contiguous
+slice. Search scores the nprobe nearest lists with the float16 copy,
+then re-ranks the best candidates exactly against the float32 vectors.
+Small shards use a single list, which degrades to an exact scan.
+"""
+
+import json
+import logging
+import shutil
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from config import (
+    VECTOR_INDEX_CACHE_SHARDS,
+    VECTOR_INDEX_IVF_MIN_VECTORS,
+    VECTOR_INDEX_NPROBE,
+    VECTOR_INDEX_RERANK_FACTOR,
+)
+
+logger = logging.getLogger(__name__)
+
+_KMEANS_ITERATIONS = 12
+_KMEANS_SAMPLE_PER_LIST = 256
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _kmeans(vectors: np.ndarray, nlist: int, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on a sample of the vectors; returns unit centroids."""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), nlist * _KMEANS_SAMPLE_PER_LIST)
+    sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+
+    for _ in range(_KMEANS_ITERATIONS):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        counts = np.bincount(assign, minlength=nlist)
+
+        # Re-seed empty lists so every centroid stays useful
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            sums[empty] = sample[rng.choice(len(sample), len(empty), replace=False)]
+        centroids = _normalize(sums)
+
+    return centroids.astype(np.float32)
+
+
+def _save(directory: Path, name: str, array: np.ndarray) -> None:
+    np.save(directory / name, array, allow_pickle=False)
+
+
+class VectorIndex:
+    """
+    IVF index over unit-normalised chunk embeddings of one textbook.
+    Use VectorIndex.load() to open a shard written by VectorIndex.build().
+    """
+
+    def __init__(
+        self,
+        vectors_f16: np.ndarray,
+        vectors_f32: np.ndarray,
+        centroids: np.ndarray,
+        list_offsets: np.ndarray,
+        chunk_pages: np.ndarray,
+        chunk_spans: np.ndarray
+    ):
+        self.vectors_f16 = vectors_f16
+        self.vectors_f32 = vectors_f32
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.chunk_pages = chunk_pages
+        self.chunk_spans = chunk_spans
+
+    def __len__(self) -> int:
+        return len(self.chunk_pages)
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @staticmethod
+    def build(
+        index_dir: Union[str, Path],
+        vectors: np.ndarray,
+        pages: Sequence[int],
+        spans: np.ndarray
+    ) -> None:
+        """
+        Build a shard and atomically replace any existing one.
+
+        Args:
+            index_dir: Shard directory (removed if there are no vectors)
+            vectors: float32 (n, dim) chunk embeddings
+            pages: Page number of each chunk
+            spans: (n, 2) character spans of each chunk within its page
+        """
+        index_dir = Path(index_dir)
+        vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+        pages = np.asarray(pages, dtype=np.int32)
+        spans = np.asarray(spans, dtype=np.int32).reshape(-1, 2)
+
+        count = len(vectors)
+        if count == 0:
+            shutil.rmtree(index_dir, ignore_errors=True)
+            return
+
+        if count >= VECTOR_INDEX_IVF_MIN_VECTORS:
+            nlist = int(np.sqrt(count))
+            centroids = _kmeans(vectors, nlist)
+            assign = np.argmax(vectors @ centroids.T, axis=1)
+        else:
+            centroids = _normalize(vectors.mean(axis=0, keepdims=True))
+            assign = np.zeros(count, dtype=np.int64)
+
+        # Group rows by list; stable sort keeps page order inside each list
+        order = np.argsort(assign, kind="stable")
+        offsets = np.zeros(len(centroids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assign, minlength=len(centroids)), out=offsets[1:])
+
+        partial = index_dir.with_name(index_dir.name + ".tmp")
+        shutil.rmtree(partial, ignore_errors=True)
+        partial.mkdir(parents=True)
+
+        _save(partial, "vectors_f16.npy", vectors[order].astype(np.float16))
+        _save(partial, "vectors_f32.npy", vectors[order])
+        _save(partial, "centroids.npy", centroids.astype(np.float32))
+        _save(partial, "list_offsets.npy", offsets)
+        _save(partial, "chunk_pages.npy", pages[order])
+        _save(partial, "chunk_spans.npy", spans[order])
+        (partial / "meta.json").write_text(json.dumps({
+            "dim": int(vectors.shape[1]),
+            "count": count,
+            "nlist": len(centroids)
+        }))
+
+        # Swap directories; open memory maps of the old shard stay valid
+        stale = index_dir.with_name(index_dir.name + ".old")
+        shutil.rmtree(stale, ignore_errors=True)
+        if index_dir.exists():
+            index_dir.rename(stale)
+        partial.rename(index_dir)
+        shutil.rmtree(stale, ignore_errors=True)
+
+        logger.info(f"Built vector index {index_dir} ({count} vectors, {len(centroids)} lists)")
+
+    @staticmethod
+    def exists(index_dir: Union[str, Path]) -> bool:
+        return (Path(index_dir) / "meta.json").exists()
+
+    @staticmethod
+    def load(index_dir: Union[str, Path]) -> "VectorIndex":
+        """
+        Open a shard with its arrays memory-mapped.
+        Repeated loads of an unchanged shard return the cached instance.
+        """
+        meta = Path(index_dir) / "meta.json"
+        return _load_shard(str(index_dir), meta.stat().st_mtime_ns)
+
+    def search(
+        self,
+        query: np.ndarray,
+        top_k: int = 10,
+        nprobe: int = VECTOR_INDEX_NPROBE,
+        rows: Optional[np.ndarray] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Find the chunks closest to a query embedding.
+
+        Args:
+            query: Query embedding
+            top_k: Number of results
+            nprobe: IVF lists to scan
+            rows: Restrict the search to these rows (scanned exactly)
+
+        Returns:
+            (row, cosine score) pairs, best first
+        """
+        if len(self) == 0 or top_k <= 0:
+            return []
+
+        query = _normalize(np.asarray(query, dtype=np.float32).ravel())
+
+        if rows is None:
+            nprobe = min(max(1, nprobe), self.nlist)
+            if nprobe < self.nlist:
+                probe = np.argpartition(self.centroids @ query, -nprobe)[-nprobe:]
+            else:
+                probe = range(self.nlist)
+
+            candidates = []
+            coarse = []
+            for list_id in probe:
+                start, end = self.list_offsets[list_id], self.list_offsets[list_id + 1]
+                if start == end:
+                    continue
+                candidates.append(np.arange(start, end))
+                coarse.append(self.vectors_f16[start:end].astype(np.float32) @ query)
+
+            if not candidates:
+                return []
+            rows = np.concatenate(candidates)
+            coarse_scores = np.concatenate(coarse)
+
+            keep = min(len(rows), top_k * VECTOR_INDEX_RERANK_FACTOR)
+            if keep < len(rows):
+                best = np.argpartition(coarse_scores, -keep)[-keep:]
+                rows = rows[best]
+        else:
+            rows = np.asarray(rows, dtype=np.int64)
+            if len(rows) == 0:
+                return []
+
+        # Exact re-rank of the surviving candidates
+        rows = np.sort(rows)
+        scores = self.vectors_f32[rows] @ query
+        top = np.argsort(-scores)[:top_k]
+        return [(int(rows[i]), float(scores[i])) for i in top]
+
+
+@lru_cache(maxsize=VECTOR_INDEX_CACHE_SHARDS)
+def _load_shard(index_dir: str, mtime_ns: int) -> VectorIndex:
+    directory = Path(index_dir)
+
+    def _open(name: str) -> np.ndarray:
+        return np.load(directory / name, mmap_mode="r", allow_pickle=False)
+
+    return VectorIndex(
+        vectors_f16=_open("vectors_f16.npy"),
+        vectors_f32=_open("vectors_f32.npy"),
+        # Centroids and offsets are tiny and read on every query
+        centroids=np.load(directory / "centroids.npy"),
+        list_offsets=np.load(directory / "list_offsets.npy"),
+        chunk_pages=_open("chunk_pages.npy"),
+        chunk_spans=_open("chunk_spans.npy")
+    )
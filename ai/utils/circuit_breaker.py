@@ -0,0 +1,206 @@
+# circuit_breaker.py - Provider Circuit Breakers
+#
+# Skip LLM/vision providers that are failing or too slow.
+
+"""
+Circuit Breaker
+
+- get_circuit_breaker(name) -> CircuitBreaker
+- CircuitBreaker.allow() -> bool
+- CircuitBreaker.record(latency, ok)
+- CircuitBreaker.abandon(latency)
+- CircuitBreaker.cancel()
+- CircuitBreaker.p95() -> Optional[float]
+- get_breaker_stats() -> List[dict]
+
+States:
+- closed: calls go through; outcomes are kept for the last
+  PROVIDER_BREAKER_WINDOW calls
+- open: the error rate or the share of slow calls in the window crossed
+  its limit, so calls are refused for PROVIDER_BREAKER_OPEN_SECONDS
+- half_open: one probe call is let through; success closes the breaker,
+  failure opens it again
+
+A slow provider trips the breaker just like a failing one, so a brownout
+costs a few slow requests instead of every request waiting for a timeout.
+A call abandoned because a hedged call to another provider answered first
+counts as slow: it was still running past the provider's p95.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from config import (
+    PROVIDER_BREAKER_ERROR_RATE,
+    PROVIDER_BREAKER_MIN_CALLS,
+    PROVIDER_BREAKER_OPEN_SECONDS,
+    PROVIDER_BREAKER_SLOW_CALL_SECONDS,
+    PROVIDER_BREAKER_SLOW_RATE,
+    PROVIDER_BREAKER_WINDOW,
+)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Successful calls needed before p95() is trusted
+_MIN_LATENCY_SAMPLES = 5
+
+
+class CircuitBreaker:
+    """
+    Rolling-window circuit breaker for one provider.
+    Thread-safe; shared by all requests in the process.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int = PROVIDER_BREAKER_WINDOW,
+        min_calls: int = PROVIDER_BREAKER_MIN_CALLS,
+        error_rate: float = PROVIDER_BREAKER_ERROR_RATE,
+        slow_call_seconds: float = PROVIDER_BREAKER_SLOW_CALL_SECONDS,
+        slow_rate: float = PROVIDER_BREAKER_SLOW_RATE,
+        open_seconds: float = PROVIDER_BREAKER_OPEN_SECONDS
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.times_opened = 0
+        # (seconds, ok, completed); abandoned calls are slow but not completed
+        self._calls: Deque[Tuple[float, bool, bool]] = deque(maxlen=window)
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        Whether a call may be made now. In half-open state only one
+        caller gets True until its outcome is recorded.
+        """
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.open_seconds:
+                    return False
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN:
+                if self._probe_in_flight:
+                    return False
+                self._probe_in_flight = True
+            return True
+
+    def record(self, latency: float, ok: bool) -> None:
+        """
+        Record the outcome of a call that allow() let through.
+
+        Args:
+            latency: Seconds the call took
+            ok: False for errors and timeouts
+        """
+        self._add(latency, ok, completed=True)
+
+    def abandon(self, latency: float) -> None:
+        """
+        Record a permitted call that was cancelled after losing a hedge.
+        It counts as a slow call but is left out of p95().
+
+        Args:
+            latency: Seconds the call had been running
+        """
+        self._add(latency, ok=True, completed=False)
+
+    def _add(self, latency: float, ok: bool, completed: bool) -> None:
+        with self._lock:
+            slow = not completed or latency >= self.slow_call_seconds
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                if ok and not slow:
+                    self.state = CLOSED
+                    self._calls.clear()
+                    self._calls.append((latency, ok, completed))
+                else:
+                    self._open()
+                return
+
+            self._calls.append((latency, ok, completed))
+            if self.state == CLOSED and len(self._calls) >= self.min_calls:
+                total = len(self._calls)
+                failures = sum(1 for _, success, _ in self._calls if not success)
+                slow_calls = sum(
+                    1 for seconds, _, done in self._calls
+                    if not done or seconds >= self.slow_call_seconds
+                )
+                if failures / total >= self.error_rate or slow_calls / total >= self.slow_rate:
+                    self._open()
+
+    def cancel(self) -> None:
+        """A permitted call was cancelled by its caller; record nothing."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.times_opened += 1
+
+    def p95(self) -> Optional[float]:
+        """
+        95th percentile latency of recent successful calls.
+
+        Returns:
+            Seconds, or None until enough calls were seen
+        """
+        with self._lock:
+            latencies = sorted(seconds for seconds, ok, completed in self._calls if ok and completed)
+        if len(latencies) < _MIN_LATENCY_SAMPLES:
+            return None
+        return latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            total = len(self._calls)
+            failures = sum(1 for _, ok, _ in self._calls if not ok)
+            abandoned = sum(1 for _, _, completed in self._calls if not completed)
+            state = self.state
+        return {
+            "name": self.name,
+            "state": state,
+            "calls": total,
+            "error_rate": round(failures / total, 4) if total else 0.0,
+            "abandoned": abandoned,
+            "p95_seconds": self.p95(),
+            "times_opened": self.times_opened
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """
+    Returns the process-wide breaker for a provider, creating it on first use.
+
+    Args:
+        name: Provider name, e.g. "openai"
+    """
+    with _registry_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
+
+
+def get_breaker_stats() -> List[Dict[str, object]]:
+    """
+    State, error rate and p95 latency of every provider breaker.
+    """
+    with _registry_lock:
+        breakers = list(_breakers.values())
+    return [breaker.snapshot() for breaker in breakers]
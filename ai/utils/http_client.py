@@ -0,0 +1,161 @@
+# http_client.py - Shared HTTP Client
+#
+# Pooled async HTTP client for downloading submission files.
+
+"""
+HTTP Client
+
+- get_http_client() -> httpx.AsyncClient
+- close_http_client()
+- download_bytes(url, max_bytes) -> Tuple[bytearray, Optional[str]]
+- download_to_file(url, path, max_bytes) -> int
+
+A single AsyncClient is shared by the whole service so connections to
+storage (S3, Cloudinary) are kept alive between requests instead of
+re-negotiating TLS for every download.
+"""
+
+import logging
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+import httpx
+
+from config import HTTP_MAX_CONNECTIONS, HTTP_TIMEOUT_SECONDS, MAX_DOWNLOAD_BYTES
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+class DownloadTooLargeError(ValueError):
+    """Raised when a remote file exceeds the allowed download size."""
+
+    def __init__(self, url: str, max_bytes: int):
+        self.url = url
+        self.max_bytes = max_bytes
+        super().__init__(f"File at {url} exceeds the {max_bytes} byte limit")
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the shared pooled HTTP client, creating it on first use.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(HTTP_TIMEOUT_SECONDS),
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_CONNECTIONS
+            ),
+            follow_redirects=True
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """
+    Close the shared client.
+    Should be called on application shutdown.
+    """
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+
+async def download_bytes(
+    url: str,
+    max_bytes: int = MAX_DOWNLOAD_BYTES
+) -> Tuple[bytearray, Optional[str]]:
+    """
+    Stream a remote file into memory, enforcing a size limit.
+
+    The limit is checked against Content-Length up front and again while
+    streaming, so oversized or lying responses are aborted early.
+
+    Args:
+        url: File URL
+        max_bytes: Maximum allowed size in bytes
+
+    Returns:
+        Tuple of (file bytes, content type from response headers)
+
+    Raises:
+        DownloadTooLargeError: If the file exceeds max_bytes
+        httpx.HTTPStatusError: If the server returns an error status
+    """
+    client = get_http_client()
+
+    async with client.stream("GET", url) as response:
+        response.raise_for_status()
+
+        content_length = response.headers.get("content-length")
+        if content_length and int(content_length) > max_bytes:
+            raise DownloadTooLargeError(url, max_bytes)
+
+        buffer = bytearray()
+        async for chunk in response.aiter_bytes():
+            if len(buffer) + len(chunk) > max_bytes:
+                raise DownloadTooLargeError(url, max_bytes)
+            buffer += chunk
+
+        content_type = response.headers.get("content-type")
+
+    logger.debug(f"Downloaded {len(buffer)} bytes from {url}")
+    return buffer, content_type
+
+
+async def download_to_file(
+    url: str,
+    path: Union[str, Path],
+    max_bytes: int = MAX_DOWNLOAD_BYTES
+) -> int:
+    """
+    Stream a remote file to disk, enforcing a size limit.
+
+    Used for large files (textbooks) that should be memory-mapped rather
+    than held in memory. The file is written to a temporary sibling and
+    renamed into place, so a partial download is never mistaken for a
+    complete one.
+
+    Args:
+        url: File URL
+        path: Destination path
+        max_bytes: Maximum allowed size in bytes
+
+    Returns:
+        Number of bytes written
+
+    Raises:
+        DownloadTooLargeError: If the file exceeds max_bytes
+        httpx.HTTPStatusError: If the server returns an error status
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".part")
+    client = get_http_client()
+    written = 0
+
+    try:
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+
+            content_length = response.headers.get("content-length")
+            if content_length and int(content_length) > max_bytes:
+                raise DownloadTooLargeError(url, max_bytes)
+
+            with open(partial, "wb") as f:
+                async for chunk in response.aiter_bytes():
+                    written += len(chunk)
+                    if written > max_bytes:
+                        raise DownloadTooLargeError(url, max_bytes)
+                    f.write(chunk)
+
+        partial.replace(path)
+    finally:
+        partial.unlink(missing_ok=True)
+
+    logger.debug(f"Downloaded {written} bytes from {url} to {path}")
+    return written
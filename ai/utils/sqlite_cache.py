@@ -0,0 +1,195 @@
+# sqlite_cache.py - SQLite LRU Cache
+#
+# Size-bounded key/value cache in a SQLite file, shared by the model caches.
+
+"""
+SQLite Cache
+
+Base class for the persistent caches under MODEL_CACHE_DIR (OCR results,
+embeddings, summary key points). Subclasses name the table and value
+column and build their own keys; storage, LRU bookkeeping and eviction
+live here.
+
+Methods:
+- _fetch(keys) -> Dict[str, value]      (marks hits as recently used)
+- _store(items) -> None                 (then evicts over max_bytes)
+- clear() -> None
+- stats() -> dict
+- close() -> None
+
+Eviction:
+- Least-recently-used entries are dropped once the stored values exceed
+  max_bytes.
+
+Reads and writes are blocking sqlite3 calls. Async code calls them
+through asyncio.to_thread so disk I/O and the lock never stall the event
+loop.
+
+Subclasses count hits and misses themselves, since what counts as one
+lookup (a single key, the first of several backends, each text of a
+batch) depends on the cache.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple, Union
+
+from config import MODEL_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+# SQLite's default limit on bound parameters per statement
+_MAX_PARAMS = 900
+
+
+class SQLiteCache:
+    """
+    Size-bounded LRU key/value cache backed by SQLite.
+    Safe to share between threads of one process.
+
+    Subclasses set:
+        table: Table name (also the default file name)
+        value_column: Name of the value column
+        value_type: SQLite type of the value column (TEXT or BLOB)
+    """
+
+    table: str
+    value_column: str
+    value_type: str = "TEXT"
+
+    def __init__(self, db_path: Optional[Union[str, Path]], max_bytes: int):
+        self.db_path = Path(db_path or Path(MODEL_CACHE_DIR) / f"{self.table}.sqlite3")
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            f"key TEXT PRIMARY KEY, "
+            f"{self.value_column} {self.value_type} NOT NULL, "
+            f"size INTEGER NOT NULL, "
+            f"created_at REAL NOT NULL, "
+            f"accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_{self.table}_accessed_at ON {self.table} (accessed_at)"
+        )
+        self._conn.commit()
+
+    def _fetch(self, keys: Sequence[str]) -> Dict[str, Any]:
+        """
+        Look up stored values and mark the found keys as recently used.
+
+        Args:
+            keys: Cache keys (duplicates are ignored)
+
+        Returns:
+            Dict of key -> value for the keys that were cached
+        """
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, Any] = {}
+
+        with self._lock:
+            now = time.time()
+            for i in range(0, len(keys), _MAX_PARAMS):
+                batch = keys[i:i + _MAX_PARAMS]
+                rows = self._conn.execute(
+                    f"SELECT key, {self.value_column} FROM {self.table} "
+                    f"WHERE key IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+                if not rows:
+                    continue
+                found.update(rows)
+                self._conn.execute(
+                    f"UPDATE {self.table} SET accessed_at = ? "
+                    f"WHERE key IN ({','.join('?' * len(rows))})",
+                    [now, *(key for key, _ in rows)]
+                )
+            if found:
+                self._conn.commit()
+
+        return found
+
+    def _store(self, items: Iterable[Tuple[str, Any, int]]) -> None:
+        """
+        Store values and evict old entries if over budget.
+
+        Args:
+            items: (key, value, size in bytes) triples
+        """
+        now = time.time()
+        rows = [(key, value, size, now, now) for key, value, size in items]
+        if not rows:
+            return
+
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} "
+                f"(key, {self.value_column}, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drop least-recently-used entries beyond max_bytes (lock held)."""
+        cursor = self._conn.execute(
+            f"""
+            DELETE FROM {self.table} WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, SUM(size) OVER (
+                        ORDER BY accessed_at DESC, created_at DESC
+                    ) AS running_size
+                    FROM {self.table}
+                ) WHERE running_size > ?
+            )
+            """,
+            (self.max_bytes,)
+        )
+        if cursor.rowcount > 0:
+            self.evictions += cursor.rowcount
+            logger.info(f"{self.table} evicted {cursor.rowcount} entries")
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """
+        Get cache counters.
+
+        Returns:
+            Dict with hits, misses, hit_rate, evictions, entries and bytes
+        """
+        with self._lock:
+            entries, total_bytes = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+            ).fetchone()
+
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": total_bytes,
+            "max_bytes": self.max_bytes
+        }
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
@@ -9,6 +9,106 @@ Text Utilities
 - tokenize(text) -> List[str]
 - remove_punctuation(text) -> str
 - normalize_whitespace(text) -> str
+- parse_page_numbers(spec) -> List[int]
+- text_digest(text) -> str
 """
 
-# TODO: Implement text utilities
+import hashlib
+import re
+import unicodedata
+from typing import List, Optional
+
+# Words, numbers and dotted/hyphenated identifiers such as "4.2", "x^2",
+# "h2so4" or "well-known" stay single tokens so exact references match.
+_TOKEN = re.compile(r"[a-z0-9]+(?:[.\-^_][a-z0-9]+)*")
+_WHITESPACE = re.compile(r"\s+")
+_PAGE_RANGE = re.compile(r"(\d+)\s*(?:[-\u2013]\s*(\d+))?")
+
+# Upper bound on pages expanded from one range, guards against "1-99999"
+_MAX_RANGE_PAGES = 500
+
+
+
+def clean_text(text: str) -> str:
+    """
+    Normalise extracted text (OCR, PDF) for storage and comparison.
+
+    Applies NFKC (ligatures, full-width forms), drops control characters
+    and collapses whitespace.
+
+    Args:
+        text: Input text
+
+    Returns:
+        Cleaned text
+    """
+    text = unicodedata.normalize("NFKC", text)
+    text = "".join(
+        char for char in text
+        if char.isspace() or not unicodedata.category(char).startswith("C")
+    )
+    return normalize_whitespace(text)
+
+
+def remove_punctuation(text: str) -> str:
+    """
+    Remove punctuation characters (any Unicode punctuation category).
+
+    Args:
+        text: Input text
+
+    Returns:
+        Text without punctuation; other characters are kept as they are
+    """
+    return "".join(char for char in text if not unicodedata.category(char).startswith("P"))
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase search tokens.
+
+    Args:
+        text: Input text
+
+    Returns:
+        Tokens in order of appearance
+    """
+    return _TOKEN.findall(text.lower())
+
+
+def normalize_whitespace(text: str) -> str:
+    """
+    Collapse runs of whitespace into single spaces.
+
+    Args:
+        text: Input text
+
+    Returns:
+        Text with normalised whitespace, stripped
+    """
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def parse_page_numbers(spec: Optional[str]) -> List[int]:
+    """
+    Parse a page specification such as "45-47, 50" (Homework.page_numbers).
+
+    Args:
+        spec: Comma separated pages and ranges
+
+    Returns:
+        Sorted unique page numbers; empty if spec is empty
+    """
+    pages = set()
+    for match in _PAGE_RANGE.finditer(spec or ""):
+        start = int(match.group(1))
+        end = int(match.group(2) or start)
+        if end < start:
+            start, end = end, start
+        pages.update(range(start, min(end, start + _MAX_RANGE_PAGES - 1) + 1))
+    return sorted(page for page in pages if page > 0)
+
+
+def text_digest(text: str) -> str:
+    """Return the SHA-256 hex digest of a text (cache keys, change detection)."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
@@ -21,7 +21,7 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy import select, func, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.core.security import (
     get_current_user_id,
     require_principal,
@@ -49,7 +49,7 @@ async def get_overview(
     school_id: Optional[UUID] = Query(None, description="Filter by school"),
     user_id: str = Depends(get_current_user_id),
     _: bool = Depends(require_principal),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get school-wide analytics overview.
@@ -119,7 +119,7 @@ async def get_class_analytics(
     school_id: Optional[UUID] = Query(None),
     user_id: str = Depends(get_current_user_id),
     _: bool = Depends(require_teacher_or_principal),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get analytics summary for all classes."""
     query = select(SchoolClass)
@@ -176,7 +176,7 @@ async def get_class_detail_analytics(
     class_id: UUID,
     user_id: str = Depends(get_current_user_id),
     _: bool = Depends(require_teacher_or_principal),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get detailed analytics for a specific class."""
     # Verify class exists
@@ -276,7 +276,7 @@ async def get_class_detail_analytics(
 async def get_student_analytics(
     student_id: UUID,
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get analytics for a specific student."""
     # Verify student exists
@@ -348,7 +348,7 @@ async def get_homework_analytics(
     days: int = Query(30, ge=1, le=365),
     user_id: str = Depends(get_current_user_id),
     _: bool = Depends(require_teacher_or_principal),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get homework completion statistics."""
     cutoff = datetime.now(timezone.utc) - timedelta(days=days)
@@ -384,7 +384,7 @@ async def get_submission_trends(
     days: int = Query(30, ge=7, le=90),
     user_id: str = Depends(get_current_user_id),
     _: bool = Depends(require_teacher_or_principal),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get submission trends over time."""
     cutoff = datetime.now(timezone.utc) - timedelta(days=days)
@@ -42,7 +42,7 @@ router = APIRouter()
 )
 async def register(
     user_data: UserCreate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     Register a new user.
@@ -67,7 +67,7 @@ async def register(
 )
 async def login(
     credentials: LoginRequest,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     Login with email and password.
@@ -97,7 +97,7 @@ async def login(
 )
 async def refresh_token(
     request: RefreshTokenRequest,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     Refresh access token.
@@ -119,7 +119,7 @@ async def refresh_token(
 async def change_password(
     request: PasswordChangeRequest,
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     Change password for authenticated user.
@@ -145,7 +145,7 @@ async def change_password(
 )
 async def forgot_password(
     request: PasswordResetRequest,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     Request password reset.
@@ -173,7 +173,7 @@ async def forgot_password(
 )
 async def reset_password(
     request: PasswordResetConfirm,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     Reset password using reset token.
@@ -30,7 +30,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from pydantic import BaseModel, Field
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.security import (
     get_current_user_id,
     require_principal,
@@ -80,7 +80,7 @@ async def create_class(
     data: ClassCreate,
     user_id: str = Depends(get_current_user_id),
     _: bool = Depends(require_principal),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """Create a new class. Requires principal role."""
     school_class = SchoolClass(
@@ -91,8 +91,7 @@ async def create_class(
     )
 
     db.add(school_class)
-    await db.commit()
-    await db.refresh(school_class)
+    await db.flush()
 
     return {
         "id": str(school_class.id),
@@ -115,7 +114,7 @@ async def list_classes(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """List all classes with optional filters."""
     query = select(SchoolClass)
@@ -160,7 +159,7 @@ async def list_classes(
 async def get_class(
     class_id: UUID,
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get class details with student/teacher counts."""
     query = (
@@ -203,7 +202,7 @@ async def update_class(
     data: ClassUpdate,
     user_id: str = Depends(get_current_user_id),
     _: bool = Depends(require_principal),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """Update a class. Requires principal role."""
     query = select(SchoolClass).where(SchoolClass.id == class_id)
@@ -216,8 +215,7 @@ async def update_class(
     for field, value in data.model_dump(exclude_unset=True).items():
         setattr(school_class, field, value)
 
-    await db.commit()
-    await db.refresh(school_class)
+    await db.flush()
 
     return {
         "id": str(school_class.id),
@@ -236,7 +234,7 @@ async def delete_class(
     class_id: UUID,
     user_id: str = Depends(get_current_user_id),
     _: bool = Depends(require_admin),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """Delete a class. Requires admin role."""
     query = select(SchoolClass).where(SchoolClass.id == class_id)
@@ -247,7 +245,7 @@ async def delete_class(
         raise AppException(404, "CLASS_NOT_FOUND", "Class not found")
 
     await db.delete(school_class)
-    await db.commit()
+    await db.flush()
 
     return MessageResponse(message="Class deleted successfully")
 
@@ -262,7 +260,7 @@ async def get_class_students(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all students enrolled in a class."""
     query = (
@@ -18,7 +18,7 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.security import (
     get_current_user_id,
     require_teacher,
@@ -49,7 +49,7 @@ async def create_homework(
     data: HomeworkCreate,
     user_id: str = Depends(get_current_user_id),
     _: bool = Depends(require_teacher),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     Create a new homework assignment.
@@ -96,7 +96,7 @@ async def list_homework(
     skip: int = Query(0, ge=0, description="Records to skip"),
     limit: int = Query(20, ge=1, le=100, description="Records per page"),
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     List homework assignments.
@@ -153,7 +153,7 @@ async def get_homework(
     homework_id: UUID,
     include_stats: bool = Query(False, description="Include submission statistics"),
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get homework assignment details.
@@ -175,7 +175,7 @@ async def update_homework(
     data: HomeworkUpdate,
     user_id: str = Depends(get_current_user_id),
     _: bool = Depends(require_teacher),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     Update a homework assignment.
@@ -213,7 +213,7 @@ async def delete_homework(
     homework_id: UUID,
     user_id: str = Depends(get_current_user_id),
     _: bool = Depends(require_teacher),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     Delete a homework assignment.
@@ -254,7 +254,7 @@ async def get_homework_submissions(
     limit: int = Query(20, ge=1, le=100, description="Records per page"),
     user_id: str = Depends(get_current_user_id),
     _: bool = Depends(require_teacher_or_principal),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get all submissions for a homework assignment.
@@ -9,7 +9,8 @@ POST   /submissions                  - Submit homework (student)
 GET    /submissions/{id}             - Get submission details
 PUT    /submissions/{id}/grade       - Grade submission (teacher)
 PUT    /submissions/{id}/feedback    - Add feedback (teacher)
-GET    /submissions/{id}/ai-analysis - Get AI analysis results
+POST   /submissions/{id}/feedback/suggest - Stream AI feedback suggestion (teacher, SSE)
+POST   /submissions/{id}/ai-analysis - Queue AI analysis (OCR + grade suggestion)
 DELETE /submissions/{id}             - Delete submission (student, before deadline)
 GET    /submissions/my               - Get student's own submissions
 GET    /submissions/pending          - Get pending submissions for teacher
@@ -17,10 +18,11 @@ GET    /submissions/pending          - Get pending submissions for teacher
 
 from typing import Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, Query, UploadFile, File, Form, status
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, Response, UploadFile, File, Form, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, mark_recent_write
 from app.core.security import (
     get_current_user_id,
     require_student,
@@ -28,6 +30,7 @@ from app.core.security import (
     UserRole
 )
 from app.schemas.submission import (
+    FeedbackSuggestionRequest,
     SubmissionResponse,
     SubmissionGrade,
     SubmissionFeedback,
@@ -35,7 +38,11 @@ from app.schemas.submission import (
     SubmissionStats
 )
 from app.schemas.common import MessageResponse, PaginatedResponse
-from app.services.submission_service import SubmissionService
+from app.services.submission_service import (
+    SubmissionService,
+    run_submission_analysis,
+    stream_feedback_suggestion
+)
 from app.services.storage_service import StorageService
 from app.services.user_service import UserService
 from app.utils.exceptions import AppException
@@ -51,11 +58,12 @@ router = APIRouter()
     description="Submit homework with file upload (student only)"
 )
 async def submit_homework(
+    response: Response,
     homework_id: UUID = Form(..., description="Homework assignment ID"),
     file: UploadFile = File(..., description="Submission file (image or PDF)"),
     user_id: str = Depends(get_current_user_id),
     _: bool = Depends(require_student),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     Submit homework assignment.
@@ -101,6 +109,8 @@ async def submit_homework(
         file_url=file_url,
         file_type=file_type
     )
+    # The student's next reads should see this submission despite replica lag
+    mark_recent_write(response)
 
     return await submission_service.get_submission(submission.id)
 
@@ -117,7 +127,7 @@ async def get_my_submissions(
     limit: int = Query(20, ge=1, le=100, description="Records per page"),
     user_id: str = Depends(get_current_user_id),
     _: bool = Depends(require_student),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get current student's submissions.
@@ -162,7 +172,7 @@ async def get_pending_submissions(
     limit: int = Query(20, ge=1, le=100, description="Records per page"),
     user_id: str = Depends(get_current_user_id),
     _: bool = Depends(require_teacher),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get pending submissions for teacher review.
@@ -203,7 +213,7 @@ async def get_pending_submissions(
 async def get_my_stats(
     user_id: str = Depends(get_current_user_id),
     _: bool = Depends(require_student),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get submission statistics for current student.
@@ -234,7 +244,7 @@ async def get_submission(
     submission_id: UUID,
     include_ai: bool = Query(False, description="Include AI analysis"),
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get submission details.
@@ -262,7 +272,7 @@ async def grade_submission(
     grade_data: SubmissionGrade,
     user_id: str = Depends(get_current_user_id),
     _: bool = Depends(require_teacher),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     Grade a submission.
@@ -304,7 +314,7 @@ async def add_feedback(
     feedback_data: SubmissionFeedback,
     user_id: str = Depends(get_current_user_id),
     _: bool = Depends(require_teacher),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     Add feedback to a submission.
@@ -331,6 +341,54 @@ async def add_feedback(
     return await submission_service.get_submission(submission_id)
 
 
+@router.post(
+    "/{submission_id}/feedback/suggest",
+    summary="Suggest feedback",
+    description="Stream AI-suggested feedback as Server-Sent Events",
+    response_class=StreamingResponse
+)
+async def suggest_feedback(
+    submission_id: UUID,
+    grade: Optional[float] = Query(None, ge=0, le=100, description="Grade to base feedback on"),
+    body: Optional[FeedbackSuggestionRequest] = None,
+    user_id: str = Depends(get_current_user_id),
+    _: bool = Depends(require_teacher),
+    db: AsyncSession = Depends(get_db, scope="function")
+):
+    """
+    Stream suggested feedback for a submission.
+
+    Requires teacher role. Events are "token" ({"text": ...}) as the
+    model writes, then "done" or "error". Uses the saved grade unless
+    one is passed, and the text extracted by AI analysis unless the body
+    carries submission_text.
+    """
+    user_service = UserService(db)
+    user = await user_service.get_user_by_id(UUID(user_id))
+
+    if not user.teacher:
+        raise AppException(
+            status_code=400,
+            error_code="TEACHER_PROFILE_REQUIRED",
+            message="Teacher profile not found"
+        )
+
+    # Authorization and data lookups happen before the stream starts
+    submission_service = SubmissionService(db)
+    payload = await submission_service.get_feedback_request(
+        submission_id=submission_id,
+        teacher_id=user.teacher.id,
+        grade=grade,
+        submission_text=body.submission_text if body else None
+    )
+
+    return StreamingResponse(
+        stream_feedback_suggestion(payload),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post(
     "/{submission_id}/ai-analysis",
     response_model=MessageResponse,
@@ -339,17 +397,21 @@ async def add_feedback(
 )
 async def trigger_ai_analysis(
     submission_id: UUID,
+    background_tasks: BackgroundTasks,
     user_id: str = Depends(get_current_user_id),
     _: bool = Depends(require_teacher),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     Trigger AI analysis for a submission.
 
-    Requires teacher role. Queues the submission for AI processing.
+    Requires teacher role. Queues the submission for AI processing: the
+    file is OCR'd and graded in the background, and the result appears
+    in the submission's ai_analysis.
     """
     submission_service = SubmissionService(db)
     await submission_service.trigger_ai_analysis(submission_id)
+    background_tasks.add_task(run_submission_analysis, submission_id)
     return MessageResponse(message="AI analysis triggered successfully")
 
 
@@ -363,7 +425,7 @@ async def delete_submission(
     submission_id: UUID,
     user_id: str = Depends(get_current_user_id),
     _: bool = Depends(require_student),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     Delete a submission.
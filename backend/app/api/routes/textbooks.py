@@ -19,7 +19,7 @@ from fastapi import APIRouter, Depends, Query, UploadFile, File, Form, status
 from fastapi.responses import RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.security import (
     get_current_user_id,
     require_teacher,
@@ -29,7 +29,7 @@ from app.core.security import (
 from app.schemas.common import MessageResponse, PaginatedResponse
 from app.services.storage_service import StorageService
 from app.services.user_service import UserService
-from app.services.textbook_service import TextbookService
+from app.services.textbook_service import TextbookService, start_textbook_indexing
 from app.utils.exceptions import AppException
 
 router = APIRouter()
@@ -48,7 +48,7 @@ async def upload_textbook(
     file: UploadFile = File(..., description="PDF file"),
     user_id: str = Depends(get_current_user_id),
     _: bool = Depends(require_teacher),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     Upload a textbook PDF.
@@ -110,7 +110,7 @@ async def list_textbooks(
     skip: int = Query(0, ge=0, description="Records to skip"),
     limit: int = Query(20, ge=1, le=100, description="Records per page"),
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     List textbooks with optional filters.
@@ -139,7 +139,7 @@ async def list_textbooks(
 async def get_textbook(
     textbook_id: UUID,
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get textbook details.
@@ -156,7 +156,7 @@ async def get_textbook(
 async def download_textbook(
     textbook_id: UUID,
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get download URL for textbook.
@@ -184,7 +184,7 @@ async def delete_textbook(
     textbook_id: UUID,
     user_id: str = Depends(get_current_user_id),
     _: bool = Depends(require_teacher_or_principal),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     Delete a textbook.
@@ -204,15 +204,19 @@ async def delete_textbook(
 )
 async def index_textbook(
     textbook_id: UUID,
+    force: bool = Query(False, description="Discard page checkpoints and rebuild"),
     user_id: str = Depends(get_current_user_id),
     _: bool = Depends(require_teacher),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     Trigger AI indexing for a textbook.
 
-    Queues the textbook for content extraction and indexing.
+    Queues the textbook for content extraction and indexing. An
+    interrupted run resumes from its last checkpointed page; progress is
+    reported in the textbook's "indexing" field.
     """
     textbook_service = TextbookService(db)
-    await textbook_service.trigger_indexing(textbook_id)
+    resume = await textbook_service.trigger_indexing(textbook_id, force=force)
+    start_textbook_indexing(textbook_id, resume=resume, force=force)
     return MessageResponse(message="Indexing triggered successfully")
@@ -7,6 +7,8 @@ User Endpoints
 
 GET    /users/me           - Get current user profile
 PUT    /users/me           - Update current user profile
+PUT    /users/me/devices   - Register a device for push notifications
+DELETE /users/me/devices/{token} - Unregister a device
 GET    /users/{id}         - Get user by ID (admin only)
 GET    /users              - List users with filters (admin only)
 DELETE /users/{id}         - Deactivate user (admin only)
@@ -17,16 +19,17 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.security import (
     get_current_user_id,
     require_admin,
     require_principal,
     UserRole
 )
-from app.schemas.user import UserResponse, UserUpdate, UserWithRoleData
+from app.schemas.user import UserResponse, UserUpdate, UserWithRoleData, DeviceTokenRegister
 from app.schemas.common import PaginatedResponse, MessageResponse
 from app.services.user_service import UserService
+from app.services.device_token_service import DeviceTokenService
 from app.utils.exceptions import AppException
 
 router = APIRouter()
@@ -40,7 +43,7 @@ router = APIRouter()
 )
 async def get_current_user(
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     Get current authenticated user's profile.
@@ -62,7 +65,7 @@ async def get_current_user(
 async def update_current_user(
     update_data: UserUpdate,
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     Update current user's profile.
@@ -77,6 +80,46 @@ async def update_current_user(
     return user
 
 
+@router.put(
+    "/me/devices",
+    response_model=MessageResponse,
+    summary="Register device",
+    description="Register or refresh the current user's device for push notifications"
+)
+async def register_device(
+    device: DeviceTokenRegister,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db, scope="function")
+):
+    """
+    Register a device token. Apps should call this on every start so the
+    token's last_seen stays fresh.
+
+    - **token**: FCM registration token
+    - **platform**: android, ios or web
+    """
+    await DeviceTokenService(db).register(UUID(user_id), device.token, device.platform)
+    return MessageResponse(message="Device registered")
+
+
+@router.delete(
+    "/me/devices/{token}",
+    response_model=MessageResponse,
+    summary="Unregister device",
+    description="Stop push notifications to one of the current user's devices"
+)
+async def unregister_device(
+    token: str,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db, scope="function")
+):
+    """
+    Unregister a device token, e.g. on sign-out.
+    """
+    await DeviceTokenService(db).unregister(UUID(user_id), token)
+    return MessageResponse(message="Device unregistered")
+
+
 @router.get(
     "",
     response_model=PaginatedResponse,
@@ -90,7 +133,7 @@ async def list_users(
     skip: int = Query(0, ge=0, description="Records to skip"),
     limit: int = Query(20, ge=1, le=100, description="Records per page"),
     _: bool = Depends(require_principal),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     List all users with optional filters.
@@ -123,7 +166,7 @@ async def list_users(
 async def get_user(
     user_id: UUID,
     _: bool = Depends(require_principal),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get a user by ID.
@@ -144,7 +187,7 @@ async def get_user(
 async def deactivate_user(
     user_id: UUID,
     _: bool = Depends(require_admin),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     Deactivate a user account (soft delete).
@@ -165,7 +208,7 @@ async def deactivate_user(
 async def activate_user(
     user_id: UUID,
     _: bool = Depends(require_admin),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     Reactivate a user account.
@@ -186,7 +229,7 @@ async def activate_user(
 async def verify_user(
     user_id: UUID,
     _: bool = Depends(require_admin),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db, scope="function")
 ):
     """
     Verify a user's email address.
@@ -2,13 +2,23 @@
 #
 # Sets up SQLAlchemy async engine, session factory, and base model.
 # Provides dependency for getting database sessions in routes.
-
+#
+# Read-only routes can use get_read_db, which reads from a replica when
+# DATABASE_READ_URL is set. Replicas lag the primary a little, so a client
+# that just wrote (e.g. a student who submitted homework) is marked with
+# mark_recent_write() and keeps reading from the primary for
+# read_your_writes_seconds. Clients can also ask for the primary on any
+# request with the "X-Read-Consistency: strong" header.
+
+import time
 from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy import MetaData
 
 from app.core.config import settings
+from app.core.db_metrics import InstrumentedQueuePool, instrument_engine
 
 
 # Naming convention for database constraints (helps with migrations)
@@ -27,16 +37,45 @@ class Base(DeclarativeBase):
     All models should inherit from this class.
     """
     metadata = MetaData(naming_convention=convention)
+    # Server-generated values come back in the INSERT/UPDATE's RETURNING
+    # clause instead of a refresh() SELECT
+    __mapper_args__ = {"eager_defaults": True}
+
+
+def _connect_args(database_url: str) -> dict:
+    """Driver arguments; statement cache sizes only apply to asyncpg."""
+    if "+asyncpg" not in database_url:
+        return {}
+    return {
+        # asyncpg's own cache and SQLAlchemy's prepared statement cache;
+        # set both to 0 behind PgBouncer in transaction mode
+        "statement_cache_size": settings.db_statement_cache_size,
+        "prepared_statement_cache_size": settings.db_statement_cache_size,
+    }
+
+
+def _create_engine(database_url: str) -> AsyncEngine:
+    """Instrumented async engine with the configured connection pool."""
+    new_engine = create_async_engine(
+        database_url,
+        echo=settings.debug,  # Log SQL queries in debug mode
+        poolclass=InstrumentedQueuePool,  # Times checkout waits
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_pre_ping=settings.db_pool_pre_ping,  # Check connection health before using
+        pool_recycle=settings.db_pool_recycle,
+        pool_timeout=settings.db_pool_timeout,
+        connect_args=_connect_args(database_url),
+    )
+    instrument_engine(new_engine)
+    return new_engine
 
 
 # Create async engine with connection pooling
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.debug,  # Log SQL queries in debug mode
-    pool_size=5,
-    max_overflow=10,
-    pool_pre_ping=True,  # Check connection health before using
-)
+engine = _create_engine(settings.database_url)
+
+# Read replica engine; the primary when no replica is configured
+read_engine = _create_engine(settings.database_read_url) if settings.database_read_url else engine
 
 # Async session factory
 async_session_factory = async_sessionmaker(
@@ -47,15 +86,33 @@ async_session_factory = async_sessionmaker(
     autoflush=False,
 )
 
+# Read-only session factory
+read_session_factory = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
+# Cookie holding the time until which the client reads from the primary
+READ_YOUR_WRITES_COOKIE = "read_primary_until"
+READ_CONSISTENCY_HEADER = "X-Read-Consistency"
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency that provides a database session.
     Automatically handles commit/rollback and closing the session.
 
+    The request is one unit of work: services and repositories only
+    flush, and the session is committed once here. Routes use
+    scope="function" so the commit runs before the response is sent,
+    and a failed commit is reported instead of a success.
+
     Usage in routes:
-        @router.get("/items")
-        async def get_items(db: AsyncSession = Depends(get_db)):
+        @router.post("/items")
+        async def create_item(db: AsyncSession = Depends(get_db, scope="function")):
             ...
     """
     async with async_session_factory() as session:
@@ -69,6 +126,51 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+def mark_recent_write(response: Response) -> None:
+    """
+    Send this client's reads to the primary for read_your_writes_seconds,
+    so it sees its own write even while the replica lags.
+
+    Args:
+        response: Response of the writing request
+    """
+    if read_engine is engine:
+        return
+    response.set_cookie(
+        READ_YOUR_WRITES_COOKIE,
+        str(int(time.time()) + settings.read_your_writes_seconds),
+        max_age=settings.read_your_writes_seconds,
+        httponly=True,
+        secure=not settings.debug,
+        samesite="none" if not settings.debug else "lax",
+    )
+
+
+def _reads_from_primary(request: Request) -> bool:
+    if request.headers.get(READ_CONSISTENCY_HEADER, "").lower() == "strong":
+        return True
+    try:
+        return int(request.cookies.get(READ_YOUR_WRITES_COOKIE, "0")) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency that provides a read-only database session.
+    Uses the read replica, unless there is none or the client needs to
+    read its own recent writes. Never commits.
+
+    Usage in routes:
+        @router.get("/items")
+        async def get_items(db: AsyncSession = Depends(get_read_db)):
+            ...
+    """
+    factory = async_session_factory if _reads_from_primary(request) else read_session_factory
+    async with factory() as session:
+        yield session
+
+
 async def init_db() -> None:
     """
     Initialize database tables.
@@ -84,3 +186,5 @@ async def close_db() -> None:
     Should be called on application shutdown.
     """
     await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
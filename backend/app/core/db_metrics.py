@@ -0,0 +1,271 @@
+# db_metrics.py - Database Metrics
+#
+# Connection pool instrumentation and per-route query statistics.
+
+"""
+Database Metrics
+
+- InstrumentedQueuePool: connection pool recording checkout waits
+- instrument_engine(engine) -> None
+- DBMetricsMiddleware: per-request query counting
+- get_pool_stats(engine) -> dict
+- get_route_stats() -> List[dict]
+
+Pool: every checkout's wait for a connection is timed, so a saturated pool
+shows up as growing wait times instead of invisible request queuing.
+Checkout timeouts and connections opened beyond pool_size (overflow)
+are counted, and the in-use count is read from the pool.
+
+Routes: the middleware puts a counter in a context variable for each
+request; cursor events add every statement and its duration to it. Totals
+are kept per route template (e.g. GET /api/v1/homework/{homework_id}), so
+a route averaging dozens of queries per request points at an N+1. Each
+response also carries a Server-Timing header with its DB time and query
+count.
+"""
+
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Checkout waits kept for percentiles
+_WAIT_SAMPLES = 1000
+
+
+class PoolStats:
+    """Thread-safe connection pool counters."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.overflow_events = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._waits: Deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self._lock = threading.Lock()
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            self._waits.append(seconds)
+
+    def record_overflow(self) -> None:
+        with self._lock:
+            self.overflow_events += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "overflow_events": self.overflow_events,
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "p95_wait_ms": round(waits[int(0.95 * (len(waits) - 1))] * 1000, 3) if waits else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3)
+            }
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that times checkout waits and counts overflow."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record_wait(time.perf_counter() - start)
+        return connection
+
+    def _inc_overflow(self) -> bool:
+        opened = super()._inc_overflow()
+        # _overflow counts from -pool_size; above 0 the new connection is overflow
+        if opened and self._overflow > 0:
+            self.stats.record_overflow()
+        return opened
+
+    def recreate(self):
+        # Keep counters across pool recreation (e.g. after a disconnect)
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+@dataclass
+class RequestDBStats:
+    """Statements run while handling one request."""
+    queries: int = 0
+    seconds: float = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestDBStats]] = ContextVar("request_db_stats", default=None)
+
+
+class RouteStats:
+    """Thread-safe query totals per route."""
+
+    def __init__(self):
+        self._routes: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, route: str, stats: RequestDBStats) -> None:
+        with self._lock:
+            totals = self._routes.setdefault(route, [0, 0, 0.0, 0])
+            totals[0] += 1
+            totals[1] += stats.queries
+            totals[2] += stats.seconds
+            totals[3] = max(totals[3], stats.queries)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = [
+                {
+                    "route": route,
+                    "requests": requests,
+                    "queries": queries,
+                    "avg_queries": round(queries / requests, 2),
+                    "max_queries": max_queries,
+                    "db_ms": round(seconds * 1000, 1),
+                    "avg_db_ms": round(seconds / requests * 1000, 3)
+                }
+                for route, (requests, queries, seconds, max_queries) in self._routes.items()
+            ]
+        return sorted(rows, key=lambda row: row["db_ms"], reverse=True)
+
+
+_route_stats = RouteStats()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    Attach per-statement listeners to an engine.
+
+    Args:
+        engine: Async engine (created with InstrumentedQueuePool for pool stats)
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start"].pop()
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += time.perf_counter() - started
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(context):
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+
+
+def get_pool_stats(engine: AsyncEngine) -> Dict[str, Any]:
+    """
+    Pool size, in-use connections, overflow and checkout wait times.
+
+    Args:
+        engine: Instrumented engine
+    """
+    pool = engine.sync_engine.pool
+    stats: Dict[str, Any] = {
+        "pool_size": pool.size(),
+        "in_use": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(0, pool.overflow())
+    }
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update(pool.stats.snapshot())
+    return stats
+
+
+def _route_template(scope: Dict[str, Any]) -> Optional[str]:
+    """
+    Full path template of the matched route, e.g. /api/v1/homework/{homework_id}.
+
+    route.path only holds the template the route was declared with; the
+    prefixes of included routers and mounts are not part of it. The prefix
+    is taken from the request path in front of the part the route matched,
+    with any path parameter values in it put back as {name}.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    path_regex = getattr(route, "path_regex", None)
+    if template is None or path_regex is None:
+        return None
+
+    path = scope["path"]
+    start = next(
+        (i for i, char in enumerate(path) if char == "/" and path_regex.match(path[i:])),
+        len(path)
+    )
+    values = {str(value): name for name, value in scope.get("path_params", {}).items()}
+    prefix = "/".join(
+        f"{{{values[segment]}}}" if segment in values else segment
+        for segment in path[:start].split("/")
+    )
+    return prefix + template
+
+
+def get_route_stats() -> List[Dict[str, Any]]:
+    """
+    Query counts and DB time per route, most DB time first.
+    """
+    return _route_stats.snapshot()
+
+
+class DBMetricsMiddleware:
+    """
+    ASGI middleware counting statements and DB time per request and route.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestDBStats()
+        token = _request_stats.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers: List[Tuple[bytes, bytes]] = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={stats.seconds * 1000:.1f};desc="{stats.queries} queries"'.encode()
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            template = _route_template(scope)
+            if template is not None:
+                _route_stats.record(f"{scope['method']} {template}", stats)
@@ -5,14 +5,19 @@
 from contextlib import asynccontextmanager
 import os
 
-from fastapi import FastAPI, Request, status
+from fastapi import Depends, FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.config import settings
-from app.core.database import init_db, close_db
+from app.core.database import engine, read_engine, init_db, close_db
+from app.core.db_metrics import DBMetricsMiddleware, get_pool_stats, get_route_stats
+from app.core.security import require_admin
+from app.services.textbook_service import resume_interrupted_indexing
+from app.services.notification_dispatcher import get_notification_dispatcher
+from app.services.reminder_service import get_reminder_scheduler
 from app.utils.exceptions import AppException
 
 # Import routers
@@ -29,9 +34,16 @@ async def lifespan(app: FastAPI):
     print(f"Starting {settings.app_name}...")
     await init_db()  # Make sure init_db uses DATABASE_URL from env
     print("Database initialized successfully")
+    await resume_interrupted_indexing()
+    dispatcher = get_notification_dispatcher()
+    dispatcher.start()
+    reminders = get_reminder_scheduler()
+    reminders.start()
     yield
     # Shutdown
     print(f"Shutting down {settings.app_name}...")
+    await reminders.stop()
+    await dispatcher.stop()
     await close_db()
     print("Database connections closed")
 
@@ -59,6 +71,10 @@ app.add_middleware(
 )
 
 
+# Per-route query counts and DB time
+app.add_middleware(DBMetricsMiddleware)
+
+
 # Exception handlers
 @app.exception_handler(AppException)
 async def app_exception_handler(request: Request, exc: AppException):
@@ -115,6 +131,20 @@ async def health_check():
     }
 
 
+@app.get(f"{settings.api_v1_prefix}/metrics/db", tags=["Health"])
+async def database_metrics(_: bool = Depends(require_admin)):
+    """
+    Connection pool usage and per-route query statistics (admin only).
+    """
+    metrics = {
+        "pool": get_pool_stats(engine),
+        "routes": get_route_stats()
+    }
+    if read_engine is not engine:
+        metrics["read_pool"] = get_pool_stats(read_engine)
+    return metrics
+
+
 # Include routers
 app.include_router(auth.router, prefix=f"{settings.api_v1_prefix}/auth", tags=["Authentication"])
 app.include_router(users.router, prefix=f"{settings.api_v1_prefix}/users", tags=["Users"])
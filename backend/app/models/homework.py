@@ -75,7 +75,7 @@ class Homework(Base, UUIDMixin, TimestampMixin):
     )
 
     page_numbers: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
-    due_date: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    due_date: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
 
     # Relationships
     teacher: Mapped["Teacher"] = relationship("Teacher", back_populates="homework_assignments")
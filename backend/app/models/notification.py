@@ -0,0 +1,194 @@
+# notification.py - Notification Models
+#
+# Outbox of notifications waiting for delivery, and users' device tokens.
+
+"""
+Notification Models
+
+NotificationOutbox fields:
+- id: UUID primary key
+- channel: Enum (push, email)
+- notification_type: e.g. homework_assigned, grade_posted
+- title: Push title or email subject
+- body: Push body or email HTML
+- data: JSON payload delivered with push notifications
+- recipients: JSON list of user IDs (push) or email addresses (email)
+- status: Enum (pending, sent, failed)
+- attempts: Delivery attempts so far
+- next_attempt_at: When the dispatcher may (re)try the row
+- last_error: Last delivery error, if any
+- sent_at: When every recipient was delivered
+- digest_key: Coalescing key while the row still accepts more events
+- digest_count: Number of events coalesced into the row
+
+DeviceToken fields:
+- id: UUID primary key
+- user_id: FK to User
+- platform: Enum (android, ios, web)
+- token: FCM registration token (unique)
+- last_seen: When the app last registered the token
+
+DeadlineReminder fields:
+- id: UUID primary key
+- homework_id: FK to Homework
+- student_id: FK to Student
+- window_hours: Reminder window the reminder was sent for
+
+ParentReport fields:
+- id: UUID primary key
+- student_id: FK to Student
+- week_start: First day of the reported week
+
+Outbox rows are added in the same transaction as the event they announce
+and delivered later by NotificationDispatcher.
+"""
+
+import uuid
+from typing import Optional
+from datetime import date, datetime, timezone
+from enum import Enum
+from sqlalchemy import String, ForeignKey, Integer, Date, DateTime, Text, Index, UniqueConstraint, text, Enum as SQLEnum
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.database import Base
+from app.models.base import UUIDMixin, TimestampMixin
+
+
+class NotificationChannel(str, Enum):
+    """Notification delivery channel enum."""
+    PUSH = "push"
+    EMAIL = "email"
+
+
+class OutboxStatus(str, Enum):
+    """Outbox row delivery status enum."""
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class DevicePlatform(str, Enum):
+    """Device platform enum."""
+    ANDROID = "android"
+    IOS = "ios"
+    WEB = "web"
+
+
+class NotificationOutbox(Base, UUIDMixin, TimestampMixin):
+    """Notification waiting for (or done with) delivery."""
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        # The dispatcher polls for due pending rows
+        Index("ix_notification_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+        # At most one open digest per key; claiming a row clears its key
+        Index(
+            "uq_notification_outbox_digest_key",
+            "digest_key",
+            unique=True,
+            postgresql_where=text("digest_key IS NOT NULL")
+        ),
+    )
+
+    channel: Mapped[NotificationChannel] = mapped_column(
+        SQLEnum(NotificationChannel, name="notification_channel"),
+        nullable=False
+    )
+    notification_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    body: Mapped[str] = mapped_column(Text, nullable=False)
+    data: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # JSON
+    recipients: Mapped[str] = mapped_column(Text, nullable=False)  # JSON list
+
+    status: Mapped[OutboxStatus] = mapped_column(
+        SQLEnum(OutboxStatus, name="outbox_status"),
+        default=OutboxStatus.PENDING,
+        server_default=OutboxStatus.PENDING.name,
+        nullable=False
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False
+    )
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # Digest coalescing
+    digest_key: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    digest_count: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)
+
+
+class DeviceToken(Base, UUIDMixin, TimestampMixin):
+    """FCM registration token of one of a user's devices."""
+    __tablename__ = "device_tokens"
+    __table_args__ = (
+        # Covers "tokens of these users" lookups without touching the table
+        Index("ix_device_tokens_user_id_token", "user_id", "token"),
+        Index("ix_device_tokens_last_seen", "last_seen"),
+    )
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    platform: Mapped[DevicePlatform] = mapped_column(
+        SQLEnum(DevicePlatform, name="device_platform"),
+        nullable=False
+    )
+    token: Mapped[str] = mapped_column(String(512), unique=True, nullable=False)
+    last_seen: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False
+    )
+
+
+class DeadlineReminder(Base, UUIDMixin, TimestampMixin):
+    """
+    Record of a deadline reminder, so each (homework, student, window)
+    is reminded at most once.
+    """
+    __tablename__ = "deadline_reminders"
+    __table_args__ = (
+        UniqueConstraint(
+            "homework_id", "student_id", "window_hours",
+            name="uq_deadline_reminders_homework_id_student_id_window_hours"
+        ),
+    )
+
+    homework_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("homework.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    student_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("students.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    window_hours: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class ParentReport(Base, UUIDMixin, TimestampMixin):
+    """
+    Record of a weekly parent report, so each (student, week) is reported
+    at most once.
+    """
+    __tablename__ = "parent_reports"
+    __table_args__ = (
+        UniqueConstraint(
+            "student_id", "week_start",
+            name="uq_parent_reports_student_id_week_start"
+        ),
+    )
+
+    student_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("students.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    week_start: Mapped[date] = mapped_column(Date, nullable=False)
@@ -13,6 +13,10 @@ Fields:
 - file_url: Cloud storage URL
 - page_count: Number of pages
 - is_indexed: Whether AI has indexed content
+- indexing_status: Enum (not_indexed, queued, indexing, indexed, failed)
+- indexed_page_count: Pages with a completed index checkpoint
+- indexing_error: Last indexing error, if any
+- indexed_at: When indexing last completed
 - uploaded_by: FK to Teacher
 - uploaded_at: Upload timestamp
 
@@ -20,11 +24,17 @@ Relationships:
 - subject: Many-to-one with Subject
 - class_: Many-to-one with Class
 - homework_assignments: One-to-many with Homework
+- pages: One-to-many with TextbookPage (per-page index checkpoints)
 """
 
 import uuid
 from typing import Optional, List, TYPE_CHECKING
-from sqlalchemy import String, ForeignKey, Integer, Boolean
+from datetime import datetime
+from enum import Enum
+from sqlalchemy import (
+    String, ForeignKey, Integer, Boolean, DateTime, Text,
+    UniqueConstraint, Enum as SQLEnum
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -37,6 +47,15 @@ if TYPE_CHECKING:
     from app.models.homework import Homework
 
 
+class TextbookIndexStatus(str, Enum):
+    """Textbook indexing status enum."""
+    NOT_INDEXED = "not_indexed"
+    QUEUED = "queued"
+    INDEXING = "indexing"
+    INDEXED = "indexed"
+    FAILED = "failed"
+
+
 class Textbook(Base, UUIDMixin, TimestampMixin):
     """Textbook model."""
     __tablename__ = "textbooks"
@@ -67,8 +86,56 @@ class Textbook(Base, UUIDMixin, TimestampMixin):
     page_count: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     is_indexed: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
 
+    # Indexing progress
+    indexing_status: Mapped[TextbookIndexStatus] = mapped_column(
+        SQLEnum(TextbookIndexStatus, name="textbook_index_status"),
+        default=TextbookIndexStatus.NOT_INDEXED,
+        server_default=TextbookIndexStatus.NOT_INDEXED.name,
+        nullable=False
+    )
+    indexed_page_count: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False
+    )
+    indexing_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    indexed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
     # Relationships
     subject: Mapped["Subject"] = relationship("Subject", back_populates="textbooks")
     school_class: Mapped["SchoolClass"] = relationship("SchoolClass", back_populates="textbooks")
     teacher: Mapped[Optional["Teacher"]] = relationship("Teacher", back_populates="uploaded_textbooks")
     homework_assignments: Mapped[List["Homework"]] = relationship("Homework", back_populates="textbook")
+    pages: Mapped[List["TextbookPage"]] = relationship(
+        "TextbookPage",
+        back_populates="textbook",
+        cascade="all, delete-orphan"
+    )
+
+
+class TextbookPage(Base, UUIDMixin, TimestampMixin):
+    """
+    Per-page indexing checkpoint.
+
+    A row exists once a page has been indexed. content_hash lets a re-index
+    skip pages whose extracted text has not changed, and the set of rows
+    tells an interrupted job where to resume.
+    """
+    __tablename__ = "textbook_pages"
+    __table_args__ = (
+        UniqueConstraint("textbook_id", "page_number", name="uq_textbook_pages_textbook_id_page_number"),
+    )
+
+    textbook_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("textbooks.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    page_number: Mapped[int] = mapped_column(Integer, nullable=False)
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    indexed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    # Relationships
+    textbook: Mapped["Textbook"] = relationship("Textbook", back_populates="pages")
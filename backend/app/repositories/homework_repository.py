@@ -8,7 +8,7 @@ Homework Repository
 Methods:
 - get_by_id(homework_id) -> Homework | None
 - create(homework_data) -> Homework
-- update(homework_id, data) -> Homework
+- update(homework_id, data, *criteria) -> Homework
 - delete(homework_id) -> None
 - list_by_class(class_id) -> List[Homework]
 - list_by_teacher(teacher_id) -> List[Homework]
@@ -18,7 +18,7 @@ Methods:
 from typing import Optional, List
 from uuid import UUID
 from datetime import datetime, timezone
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, update, and_, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -57,22 +57,38 @@ class HomeworkRepository:
         homework = Homework(**homework_data)
         self.db.add(homework)
         await self.db.flush()
-        await self.db.refresh(homework)
         return homework
 
-    async def update(self, homework_id: UUID, update_data: dict) -> Optional[Homework]:
-        """Update homework by ID."""
-        homework = await self.get_by_id(homework_id)
-        if not homework:
-            return None
-
-        for field, value in update_data.items():
-            if hasattr(homework, field) and value is not None:
-                setattr(homework, field, value)
+    async def update(self, homework_id: UUID, update_data: dict, *criteria) -> Optional[Homework]:
+        """
+        Update homework by ID in one UPDATE ... RETURNING statement.
+        None values are skipped.
+
+        Args:
+            homework_id: Homework UUID
+            update_data: Dictionary with fields to update
+            *criteria: Extra WHERE conditions (e.g. ownership checks)
+
+        Returns:
+            Updated Homework, or None if no row matched
+        """
+        values = {
+            field: value for field, value in update_data.items()
+            if field in Homework.__mapper__.column_attrs and value is not None
+        }
+        if not values:
+            result = await self.db.execute(
+                select(Homework).where(Homework.id == homework_id, *criteria)
+            )
+            return result.scalar_one_or_none()
 
-        await self.db.flush()
-        await self.db.refresh(homework)
-        return homework
+        result = await self.db.execute(
+            update(Homework)
+            .where(Homework.id == homework_id, *criteria)
+            .values(**values)
+            .returning(Homework)
+        )
+        return result.scalar_one_or_none()
 
     async def delete(self, homework_id: UUID) -> bool:
         """Delete homework by ID."""
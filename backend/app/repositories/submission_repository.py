@@ -8,22 +8,25 @@ Submission Repository
 Methods:
 - get_by_id(submission_id) -> Submission | None
 - create(submission_data) -> Submission
-- update(submission_id, data) -> Submission
+- update(submission_id, data, *criteria) -> Submission
+- update_for_teacher(submission_id, teacher_id, data) -> (Submission, title, user_id)
+- get_homework_owner(submission_id) -> UUID | None
 - delete(submission_id) -> None
 - list_by_homework(homework_id) -> List[Submission]
 - list_by_student(student_id) -> List[Submission]
 - get_pending_review(teacher_id) -> List[Submission]
 """
 
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from uuid import UUID
 from datetime import datetime, timezone
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, update, and_, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models.submission import Submission, SubmissionStatus
 from app.models.homework import Homework
+from app.models.student import Student
 
 
 class SubmissionRepository:
@@ -54,22 +57,107 @@ class SubmissionRepository:
         submission = Submission(**submission_data)
         self.db.add(submission)
         await self.db.flush()
-        await self.db.refresh(submission)
         return submission
 
-    async def update(self, submission_id: UUID, update_data: dict) -> Optional[Submission]:
-        """Update submission by ID."""
-        submission = await self.get_by_id(submission_id)
-        if not submission:
-            return None
+    async def update(self, submission_id: UUID, update_data: dict, *criteria) -> Optional[Submission]:
+        """
+        Update submission by ID in one UPDATE ... RETURNING statement.
+        None values are skipped.
+
+        Args:
+            submission_id: Submission UUID
+            update_data: Dictionary with fields to update
+            *criteria: Extra WHERE conditions (e.g. ownership checks)
+
+        Returns:
+            Updated Submission, or None if no row matched
+        """
+        values = {
+            field: value for field, value in update_data.items()
+            if field in Submission.__mapper__.column_attrs and value is not None
+        }
+        if not values:
+            result = await self.db.execute(
+                select(Submission).where(Submission.id == submission_id, *criteria)
+            )
+            return result.scalar_one_or_none()
 
-        for field, value in update_data.items():
-            if hasattr(submission, field) and value is not None:
-                setattr(submission, field, value)
+        result = await self.db.execute(
+            update(Submission)
+            .where(Submission.id == submission_id, *criteria)
+            .values(**values)
+            .returning(Submission)
+        )
+        return result.scalar_one_or_none()
 
-        await self.db.flush()
-        await self.db.refresh(submission)
-        return submission
+    async def update_for_teacher(
+        self,
+        submission_id: UUID,
+        teacher_id: UUID,
+        update_data: dict
+    ) -> Optional[Tuple[Submission, str, UUID]]:
+        """
+        Update a submission of one of the teacher's homework, returning the
+        homework title and student's user ID along with it.
+
+        On PostgreSQL this is one statement (UPDATE ... FROM homework,
+        students ... RETURNING). SQLite's RETURNING cannot reference the
+        FROM tables, so other databases update with an ownership subquery
+        and read the title and user ID with a joined SELECT.
+
+        Args:
+            submission_id: Submission UUID
+            teacher_id: Teacher who must own the homework
+            update_data: Dictionary with fields to update (None values are skipped)
+
+        Returns:
+            (submission, homework title, student user ID), or None if the
+            submission does not exist or belongs to another teacher
+        """
+        values = {
+            field: value for field, value in update_data.items()
+            if field in Submission.__mapper__.column_attrs and value is not None
+        }
+
+        if values and self.db.get_bind().dialect.name == "postgresql":
+            result = await self.db.execute(
+                update(Submission)
+                .where(
+                    Submission.id == submission_id,
+                    Homework.id == Submission.homework_id,
+                    Homework.teacher_id == teacher_id,
+                    Student.id == Submission.student_id
+                )
+                .values(**values)
+                .returning(Submission, Homework.title, Student.user_id)
+            )
+            row = result.one_or_none()
+            return tuple(row) if row else None
+
+        if values:
+            owned = Submission.homework_id.in_(
+                select(Homework.id).where(Homework.teacher_id == teacher_id)
+            )
+            if await self.update(submission_id, values, owned) is None:
+                return None
+
+        result = await self.db.execute(
+            select(Submission, Homework.title, Student.user_id)
+            .join(Homework, Homework.id == Submission.homework_id)
+            .join(Student, Student.id == Submission.student_id)
+            .where(Submission.id == submission_id, Homework.teacher_id == teacher_id)
+        )
+        row = result.one_or_none()
+        return tuple(row) if row else None
+
+    async def get_homework_owner(self, submission_id: UUID) -> Optional[UUID]:
+        """Get the teacher ID of a submission's homework."""
+        result = await self.db.execute(
+            select(Homework.teacher_id)
+            .join(Submission, Submission.homework_id == Homework.id)
+            .where(Submission.id == submission_id)
+        )
+        return result.scalar_one_or_none()
 
     async def delete(self, submission_id: UUID) -> bool:
         """Delete submission by ID."""
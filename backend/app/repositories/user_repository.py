@@ -9,14 +9,14 @@ Methods:
 - get_by_id(user_id) -> User | None
 - get_by_email(email) -> User | None
 - create(user_data) -> User
-- update(user_id, data) -> User
+- update(user_id, data, *criteria) -> User
 - delete(user_id) -> None
 - list_all(filters, pagination) -> List[User]
 """
 
 from typing import Optional, List
 from uuid import UUID
-from sqlalchemy import select, and_, or_
+from sqlalchemy import select, update, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -102,31 +102,35 @@ class UserRepository:
         user = User(**user_data)
         self.db.add(user)
         await self.db.flush()
-        await self.db.refresh(user)
         return user
 
-    async def update(self, user_id: UUID, update_data: dict) -> Optional[User]:
+    async def update(self, user_id: UUID, update_data: dict, *criteria) -> Optional[User]:
         """
-        Update user by ID.
+        Update user by ID in one UPDATE ... RETURNING statement.
 
         Args:
             user_id: User UUID
-            update_data: Dictionary with fields to update
+            update_data: Dictionary with fields to update (None values are skipped)
+            *criteria: Extra WHERE conditions (e.g. current state checks)
 
         Returns:
-            Updated User object or None if not found
-        """
-        user = await self.get_by_id(user_id)
-        if not user:
-            return None
-
-        for field, value in update_data.items():
-            if hasattr(user, field) and value is not None:
-                setattr(user, field, value)
-
-        await self.db.flush()
-        await self.db.refresh(user)
-        return user
+            Updated User object or None if no row matched
+        """
+        values = {
+            field: value for field, value in update_data.items()
+            if field in User.__mapper__.column_attrs and value is not None
+        }
+        if not values:
+            result = await self.db.execute(select(User).where(User.id == user_id, *criteria))
+            return result.scalar_one_or_none()
+
+        result = await self.db.execute(
+            update(User)
+            .where(User.id == user_id, *criteria)
+            .values(**values)
+            .returning(User)
+        )
+        return result.scalar_one_or_none()
 
     async def delete(self, user_id: UUID) -> bool:
         """
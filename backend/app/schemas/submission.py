@@ -56,6 +56,15 @@ class SubmissionFeedback(BaseModel):
     feedback: str = Field(..., min_length=1, description="Teacher feedback")
 
 
+class FeedbackSuggestionRequest(BaseModel):
+    """Schema for the optional body of a feedback suggestion request."""
+    submission_text: Optional[str] = Field(
+        None,
+        min_length=1,
+        description="Submission text; defaults to the text extracted by AI analysis"
+    )
+
+
 class StudentInfo(BaseModel):
     """Student info for submission response."""
     id: UUID4
@@ -10,12 +10,14 @@ User Schemas
 - UserUpdate: Profile update request
 - UserResponse: API response
 - UserInDB: Internal with hashed password
+- DeviceTokenRegister: Push notification device registration
 """
 
 from pydantic import BaseModel, EmailStr, Field, validator, UUID4
 from typing import Optional
 from datetime import datetime
 from app.core.security import UserRole
+from app.models.notification import DevicePlatform
 
 
 class UserBase(BaseModel):
@@ -117,6 +119,20 @@ class UserInDB(UserResponse):
     hashed_password: str = Field(..., description="Hashed password")
 
 
+class DeviceTokenRegister(BaseModel):
+    """Device registration for push notifications."""
+    token: str = Field(..., min_length=1, max_length=512, description="FCM registration token")
+    platform: DevicePlatform = Field(..., description="Device platform")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "token": "fcm-registration-token",
+                "platform": "android"
+            }
+        }
+
+
 # Role-specific creation schemas
 
 class StudentRegistration(BaseModel):
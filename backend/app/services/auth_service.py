@@ -132,7 +132,6 @@ class AuthService:
 
         # Create user
         user = await self.user_repo.create(user_dict)
-        await self.db.commit()
 
         return user
 
@@ -271,7 +270,6 @@ class AuthService:
         # Hash and update new password
         hashed_password = hash_password(new_password)
         await self.user_repo.update(UUID(user_id), {"hashed_password": hashed_password})
-        await self.db.commit()
 
     async def request_password_reset(self, email: str) -> str:
         """
@@ -359,7 +357,6 @@ class AuthService:
                     message="User not found"
                 )
 
-            await self.db.commit()
 
         except Exception as e:
             if isinstance(e, AppException):
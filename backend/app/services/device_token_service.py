@@ -0,0 +1,223 @@
+# device_token_service.py - Device Token Service
+#
+# Registry of users' FCM device tokens.
+
+"""
+Device Token Service
+
+Methods:
+- register(user_id, token, platform) -> None
+- unregister(user_id, token) -> None
+- tokens_for_users(user_ids) -> Dict[str, List[str]]
+- expire_tokens(tokens) -> int
+- expire_stale() -> int
+
+Lookups for a list of users are one query on the (user_id, token) index.
+Results are kept in an in-process TTL cache, so hot recipients (teachers
+notified on every submission, parents of large classes) are not queried
+again on every notification. Registering, unregistering and expiring
+tokens update the cache of this process; other processes see the change
+after at most device_token_cache_ttl_seconds. Users without devices are
+not cached, so a device registered through another process is used on
+the next notification rather than after the TTL.
+
+Tokens expire when FCM reports them unregistered, and when the app has not
+re-registered them for device_token_max_age_days.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.notification import DeviceToken, DevicePlatform
+
+logger = logging.getLogger(__name__)
+
+
+class DeviceTokenCache:
+    """
+    LRU cache of user ID -> device tokens with a time-to-live.
+    Only users with at least one token are cached.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, List[str]]]" = OrderedDict()
+
+    def get(self, user_id: str) -> Optional[List[str]]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        cached_at, tokens = entry
+        if time.monotonic() - cached_at > self.ttl_seconds:
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return tokens
+
+    def put(self, user_id: str, tokens: List[str]) -> None:
+        if not tokens:
+            self._entries.pop(user_id, None)
+            return
+        self._entries[user_id] = (time.monotonic(), tokens)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_ids: Iterable[str]) -> None:
+        for user_id in user_ids:
+            self._entries.pop(user_id, None)
+
+    def drop_tokens(self, tokens: Iterable[str]) -> None:
+        """Remove tokens from every cached entry that holds them."""
+        dropped = set(tokens)
+        for user_id, (cached_at, cached) in list(self._entries.items()):
+            if dropped.intersection(cached):
+                remaining = [token for token in cached if token not in dropped]
+                if remaining:
+                    self._entries[user_id] = (cached_at, remaining)
+                else:
+                    del self._entries[user_id]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_token_cache = DeviceTokenCache(settings.device_token_cache_size, settings.device_token_cache_ttl_seconds)
+
+
+class DeviceTokenService:
+    """Service for device token registration and lookup."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def register(self, user_id: UUID, token: str, platform: DevicePlatform) -> None:
+        """
+        Register a device token, or refresh it if already known.
+
+        A token moves to the new user when someone else signs in on the
+        same device.
+
+        Args:
+            user_id: User ID
+            token: FCM registration token
+            platform: Device platform
+        """
+        now = datetime.now(timezone.utc)
+        statement = insert(DeviceToken).values(
+            user_id=user_id,
+            token=token,
+            platform=platform,
+            last_seen=now
+        )
+        await self.db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[DeviceToken.token],
+                set_={
+                    "user_id": statement.excluded.user_id,
+                    "platform": statement.excluded.platform,
+                    "last_seen": now,
+                    "updated_at": now
+                }
+            )
+        )
+        await self.db.commit()
+        _token_cache.drop_tokens([token])
+        _token_cache.invalidate([str(user_id)])
+
+    async def unregister(self, user_id: UUID, token: str) -> None:
+        """
+        Remove a device token (e.g. on sign-out).
+
+        Args:
+            user_id: User ID the token belongs to
+            token: FCM registration token
+        """
+        await self.db.execute(
+            delete(DeviceToken).where(DeviceToken.user_id == user_id, DeviceToken.token == token)
+        )
+        await self.db.commit()
+        _token_cache.invalidate([str(user_id)])
+
+    async def tokens_for_users(self, user_ids: Sequence[str]) -> Dict[str, List[str]]:
+        """
+        Device tokens of many users; cache misses are loaded in one query.
+
+        Args:
+            user_ids: User IDs as strings
+
+        Returns:
+            Mapping of user ID to tokens (users without devices are omitted)
+        """
+        tokens: Dict[str, List[str]] = {}
+        missing: List[str] = []
+        for user_id in dict.fromkeys(user_ids):
+            cached = _token_cache.get(user_id)
+            if cached is None:
+                missing.append(user_id)
+            else:
+                tokens[user_id] = cached
+
+        if missing:
+            result = await self.db.execute(
+                select(DeviceToken.user_id, DeviceToken.token).where(DeviceToken.user_id.in_(missing))
+            )
+            loaded: Dict[str, List[str]] = {user_id: [] for user_id in missing}
+            for user_id, token in result.all():
+                loaded[str(user_id)].append(token)
+            for user_id, user_tokens in loaded.items():
+                _token_cache.put(user_id, user_tokens)
+                if user_tokens:
+                    tokens[user_id] = user_tokens
+
+        return tokens
+
+    async def expire_tokens(self, tokens: Sequence[str]) -> int:
+        """
+        Delete tokens FCM rejected as unregistered or invalid.
+        Does not commit; runs in the caller's transaction.
+
+        Args:
+            tokens: Tokens to delete
+
+        Returns:
+            Number of tokens deleted
+        """
+        if not tokens:
+            return 0
+        result = await self.db.execute(
+            delete(DeviceToken)
+            .where(DeviceToken.token.in_(tokens))
+            .execution_options(synchronize_session=False)
+        )
+        _token_cache.drop_tokens(tokens)
+        return result.rowcount
+
+    async def expire_stale(self) -> int:
+        """
+        Delete tokens not re-registered for device_token_max_age_days.
+
+        Returns:
+            Number of tokens deleted
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=settings.device_token_max_age_days)
+        result = await self.db.execute(
+            delete(DeviceToken)
+            .where(DeviceToken.last_seen < cutoff)
+            .returning(DeviceToken.token)
+            .execution_options(synchronize_session=False)
+        )
+        expired = list(result.scalars().all())
+        await self.db.commit()
+        _token_cache.drop_tokens(expired)
+        return len(expired)
@@ -17,10 +17,14 @@ Methods:
 
 from typing import Optional, List, Tuple
 from uuid import UUID
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.homework import Homework
+from app.models.teacher import Teacher
+from app.models.user import User
 from app.repositories.homework_repository import HomeworkRepository
+from app.services.notification_service import NotificationService
 from app.schemas.homework import HomeworkCreate, HomeworkUpdate, HomeworkResponse, SubmissionSummary
 from app.utils.exceptions import AppException
 
@@ -31,6 +35,7 @@ class HomeworkService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.homework_repo = HomeworkRepository(db)
+        self.notifications = NotificationService(db)
 
     async def create_homework(
         self,
@@ -59,7 +64,14 @@ class HomeworkService:
         }
 
         homework = await self.homework_repo.create(homework_data)
-        await self.db.commit()
+
+        # Queued in the same transaction as the homework itself
+        teacher_name = await self.db.scalar(
+            select(User.first_name + " " + User.last_name)
+            .join(Teacher, Teacher.user_id == User.id)
+            .where(Teacher.id == teacher_id)
+        )
+        await self.notifications.notify_homework_assigned(homework, teacher_name)
         return homework
 
     async def get_homework(
@@ -150,26 +162,27 @@ class HomeworkService:
         Returns:
             Updated Homework object
         """
-        homework = await self.homework_repo.get_by_id(homework_id)
-        if not homework:
+        update_dict = data.model_dump(exclude_unset=True)
+        # Ownership is part of the UPDATE's WHERE clause
+        homework = await self.homework_repo.update(
+            homework_id,
+            update_dict,
+            Homework.teacher_id == teacher_id
+        )
+        if homework:
+            return homework
+
+        if not await self.homework_repo.get_by_id(homework_id):
             raise AppException(
                 status_code=404,
                 error_code="HOMEWORK_NOT_FOUND",
                 message="Homework not found"
             )
-
-        # Check ownership
-        if homework.teacher_id != teacher_id:
-            raise AppException(
-                status_code=403,
-                error_code="NOT_HOMEWORK_OWNER",
-                message="You can only update your own homework assignments"
-            )
-
-        update_dict = data.model_dump(exclude_unset=True)
-        homework = await self.homework_repo.update(homework_id, update_dict)
-        await self.db.commit()
-        return homework
+        raise AppException(
+            status_code=403,
+            error_code="NOT_HOMEWORK_OWNER",
+            message="You can only update your own homework assignments"
+        )
 
     async def delete_homework(
         self,
@@ -199,7 +212,6 @@ class HomeworkService:
             )
 
         await self.homework_repo.delete(homework_id)
-        await self.db.commit()
 
     async def list_homework_by_teacher(
         self,
@@ -0,0 +1,390 @@
+# notification_dispatcher.py - Notification Dispatcher
+#
+# Background worker delivering the notification outbox through FCM and SendGrid.
+
+"""
+Notification Dispatcher
+
+Methods:
+- dispatch_once() -> int
+- start() / stop()
+- get_notification_dispatcher() -> NotificationDispatcher
+
+Each pass claims up to notification_batch_size due outbox rows with
+SELECT ... FOR UPDATE SKIP LOCKED, so several workers never pick the same
+row. Claiming pushes next_attempt_at forward by notification_claim_seconds:
+if the worker dies mid-send, the rows become due again instead of being lost.
+Only rows of configured channels are claimed; push or email rows wait in
+the outbox, without using up attempts, until Firebase or SendGrid is set up.
+
+Push rows are fanned out as FCM multicasts of at most fcm_multicast_limit
+tokens; device tokens of all claimed rows are looked up in one query. The
+chunks of a row are sent concurrently, with at most fcm_send_concurrency
+requests in flight and fcm_requests_per_second across the process. Tokens
+FCM reports as unregistered are expired, and tokens not re-registered for
+device_token_max_age_days are swept once an hour. Emails go out through SendGrid,
+at most email_send_concurrency at a time. The SDKs are synchronous and run
+in worker threads.
+
+Claiming a row also clears its digest_key, so events arriving while it is
+being sent open a new digest instead of being counted into one already on
+its way. Rows that coalesced several events are sent as a digest.
+
+A row whose delivery partly failed keeps only the recipients that still
+need it and is retried with exponential backoff, until
+notification_max_attempts is reached and it is marked failed.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional, List, Dict, Tuple
+
+# Firebase Admin SDK
+try:
+    import firebase_admin
+    from firebase_admin import credentials, messaging
+    FIREBASE_AVAILABLE = True
+except ImportError:
+    FIREBASE_AVAILABLE = False
+
+# Email via SendGrid
+try:
+    from sendgrid import SendGridAPIClient
+    from sendgrid.helpers.mail import Mail
+    SENDGRID_AVAILABLE = True
+except ImportError:
+    SENDGRID_AVAILABLE = False
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import async_session_factory
+from app.models.notification import NotificationOutbox, NotificationChannel, OutboxStatus
+from app.services.device_token_service import DeviceTokenService
+from app.services.notification_service import digest_message
+from app.utils.rate_limit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Seconds between sweeps for stale device tokens
+_STALE_TOKEN_SWEEP_SECONDS = 3600
+
+
+@dataclass
+class DeliveryResult:
+    """Outcome of one delivery attempt of an outbox row."""
+    retry_recipients: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    invalid_tokens: List[str] = field(default_factory=list)
+
+
+class NotificationDispatcher:
+    """
+    Drains the notification outbox in the background.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker = async_session_factory):
+        self.session_factory = session_factory
+        self._email_semaphore = asyncio.Semaphore(settings.email_send_concurrency)
+        self._fcm_semaphore = asyncio.Semaphore(settings.fcm_send_concurrency)
+        self._fcm_limiter = RateLimiter(settings.fcm_requests_per_second)
+        self._task: Optional[asyncio.Task] = None
+        self._last_sweep = 0.0
+        self._init_firebase()
+        self._init_sendgrid()
+
+    def _init_firebase(self):
+        """Initialize Firebase Admin SDK."""
+        self.firebase_enabled = False
+
+        if not FIREBASE_AVAILABLE:
+            logger.warning("Firebase Admin SDK not installed")
+            return
+
+        if not settings.firebase_credentials_path:
+            logger.warning("Firebase credentials not configured")
+            return
+
+        try:
+            if not firebase_admin._apps:
+                cred = credentials.Certificate(settings.firebase_credentials_path)
+                firebase_admin.initialize_app(cred)
+            self.firebase_enabled = True
+            logger.info("Firebase initialized successfully")
+        except Exception as e:
+            logger.error(f"Firebase initialization failed: {e}")
+
+    def _init_sendgrid(self):
+        """Initialize SendGrid client."""
+        self.sendgrid_enabled = False
+
+        if not SENDGRID_AVAILABLE:
+            logger.warning("SendGrid SDK not installed")
+            return
+
+        if not settings.sendgrid_api_key:
+            logger.warning("SendGrid API key not configured")
+            return
+
+        try:
+            self.sendgrid_client = SendGridAPIClient(settings.sendgrid_api_key)
+            self.sendgrid_enabled = True
+            logger.info("SendGrid initialized successfully")
+        except Exception as e:
+            logger.error(f"SendGrid initialization failed: {e}")
+
+    # Worker lifecycle
+
+    def start(self) -> None:
+        """Start the polling loop as a background task."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the polling loop; claimed rows not yet sent are retried later."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._sweep_stale_tokens()
+                claimed = await self.dispatch_once()
+            except Exception as e:
+                logger.error(f"Notification dispatch failed: {e}")
+                claimed = 0
+            # A full batch means more rows are probably waiting
+            if claimed < settings.notification_batch_size:
+                await asyncio.sleep(settings.notification_poll_interval_seconds)
+
+    async def _sweep_stale_tokens(self) -> None:
+        if time.monotonic() - self._last_sweep < _STALE_TOKEN_SWEEP_SECONDS:
+            return
+        self._last_sweep = time.monotonic()
+        async with self.session_factory() as db:
+            expired = await DeviceTokenService(db).expire_stale()
+        if expired:
+            logger.info(f"Expired {expired} stale device tokens")
+
+    # Dispatch
+
+    async def dispatch_once(self) -> int:
+        """
+        Claim and deliver one batch of due outbox rows.
+
+        Returns:
+            Number of rows claimed
+        """
+        async with self.session_factory() as db:
+            rows = await self._claim(db)
+            if not rows:
+                return 0
+            tokens = await self._device_tokens(db, rows)
+            await db.commit()
+
+        results = await asyncio.gather(*(self._deliver(row, tokens) for row in rows))
+
+        async with self.session_factory() as db:
+            for row, result in zip(rows, results):
+                await self._record(db, row, result)
+            invalid_tokens = [token for result in results for token in result.invalid_tokens]
+            if invalid_tokens:
+                expired = await DeviceTokenService(db).expire_tokens(invalid_tokens)
+                logger.info(f"Expired {expired} device tokens rejected by FCM")
+            await db.commit()
+        return len(rows)
+
+    def _enabled_channels(self) -> List[NotificationChannel]:
+        """Channels this worker can deliver."""
+        channels = []
+        if self.firebase_enabled:
+            channels.append(NotificationChannel.PUSH)
+        if self.sendgrid_enabled:
+            channels.append(NotificationChannel.EMAIL)
+        return channels
+
+    async def _claim(self, db: AsyncSession) -> List[NotificationOutbox]:
+        """Lease due pending rows of the enabled channels to this worker."""
+        channels = self._enabled_channels()
+        if not channels:
+            return []
+        now = datetime.now(timezone.utc)
+        due = (
+            select(NotificationOutbox.id)
+            .where(
+                NotificationOutbox.status == OutboxStatus.PENDING,
+                NotificationOutbox.channel.in_(channels),
+                NotificationOutbox.next_attempt_at <= now
+            )
+            .order_by(NotificationOutbox.next_attempt_at)
+            .limit(settings.notification_batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id.in_(due.scalar_subquery()))
+            .values(
+                attempts=NotificationOutbox.attempts + 1,
+                next_attempt_at=now + timedelta(seconds=settings.notification_claim_seconds),
+                digest_key=None
+            )
+            .returning(NotificationOutbox)
+            .execution_options(synchronize_session=False)
+        )
+        return list(result.scalars().all())
+
+    async def _device_tokens(
+        self,
+        db: AsyncSession,
+        rows: List[NotificationOutbox]
+    ) -> Dict[str, List[str]]:
+        """Tokens of every push recipient in the batch, keyed by user ID."""
+        user_ids = [
+            user_id
+            for row in rows if row.channel == NotificationChannel.PUSH
+            for user_id in json.loads(row.recipients)
+        ]
+        if not user_ids:
+            return {}
+        return await DeviceTokenService(db).tokens_for_users(user_ids)
+
+    async def _deliver(self, row: NotificationOutbox, tokens: Dict[str, List[str]]) -> DeliveryResult:
+        if row.digest_count > 1:
+            # Rows are detached here; this only changes what is sent
+            digest = digest_message(row.notification_type, row.digest_count, json.loads(row.data or "{}"))
+            if digest:
+                row.title, row.body = digest
+        try:
+            if row.channel == NotificationChannel.PUSH:
+                return await self._deliver_push(row, tokens)
+            return await self._deliver_email(row)
+        except Exception as e:
+            logger.error(f"Delivering notification {row.id} failed: {e}")
+            return DeliveryResult(json.loads(row.recipients), str(e))
+
+    async def _deliver_push(self, row: NotificationOutbox, tokens: Dict[str, List[str]]) -> DeliveryResult:
+        if not self.firebase_enabled:
+            return DeliveryResult(json.loads(row.recipients), "Firebase not enabled")
+
+        targets: List[Tuple[str, str]] = [
+            (user_id, token)
+            for user_id in json.loads(row.recipients)
+            for token in tokens.get(user_id, [])
+        ]
+        data = json.loads(row.data) if row.data else {}
+        limit = settings.fcm_multicast_limit
+        chunks = [targets[start:start + limit] for start in range(0, len(targets), limit)]
+        results = await asyncio.gather(*(self._send_chunk(row, data, chunk) for chunk in chunks))
+
+        retry: Dict[str, None] = {}
+        invalid: List[str] = []
+        error = None
+        for chunk_result in results:
+            retry.update(dict.fromkeys(chunk_result.retry_recipients))
+            invalid.extend(chunk_result.invalid_tokens)
+            error = chunk_result.error or error
+        return DeliveryResult(list(retry), error, invalid_tokens=invalid)
+
+    async def _send_chunk(
+        self,
+        row: NotificationOutbox,
+        data: Dict[str, str],
+        chunk: List[Tuple[str, str]]
+    ) -> DeliveryResult:
+        """Send one multicast of at most fcm_multicast_limit tokens."""
+        message = messaging.MulticastMessage(
+            notification=messaging.Notification(title=row.title, body=row.body),
+            data=data,
+            tokens=[token for _, token in chunk]
+        )
+        async with self._fcm_semaphore:
+            await self._fcm_limiter.acquire()
+            try:
+                response = await asyncio.to_thread(messaging.send_each_for_multicast, message)
+            except Exception as e:
+                return DeliveryResult(list(dict.fromkeys(user_id for user_id, _ in chunk)), str(e))
+
+        result = DeliveryResult()
+        for (user_id, token), send_response in zip(chunk, response.responses):
+            if send_response.success:
+                continue
+            if _is_invalid_token(send_response.exception):
+                result.invalid_tokens.append(token)
+            else:
+                result.error = str(send_response.exception)
+                if user_id not in result.retry_recipients:
+                    result.retry_recipients.append(user_id)
+        return result
+
+    async def _deliver_email(self, row: NotificationOutbox) -> DeliveryResult:
+        if not self.sendgrid_enabled:
+            return DeliveryResult(json.loads(row.recipients), "SendGrid not enabled")
+
+        async def send(to_email: str) -> Optional[str]:
+            async with self._email_semaphore:
+                message = Mail(
+                    from_email=settings.from_email,
+                    to_emails=to_email,
+                    subject=row.title,
+                    html_content=row.body
+                )
+                try:
+                    response = await asyncio.to_thread(self.sendgrid_client.send, message)
+                except Exception as e:
+                    return str(e)
+                if response.status_code not in (200, 201, 202):
+                    return f"SendGrid returned {response.status_code}"
+                return None
+
+        recipients = json.loads(row.recipients)
+        errors = await asyncio.gather(*(send(to_email) for to_email in recipients))
+        failed = [to_email for to_email, error in zip(recipients, errors) if error]
+        return DeliveryResult(failed, next((error for error in errors if error), None))
+
+    async def _record(self, db: AsyncSession, row: NotificationOutbox, result: DeliveryResult) -> None:
+        """Store the outcome of a delivery attempt."""
+        now = datetime.now(timezone.utc)
+        values: Dict[str, object] = {"last_error": result.error}
+
+        if not result.retry_recipients:
+            values.update(status=OutboxStatus.SENT, sent_at=now)
+        elif row.attempts >= settings.notification_max_attempts:
+            values["status"] = OutboxStatus.FAILED
+            logger.warning(f"Notification {row.id} failed after {row.attempts} attempts: {result.error}")
+        else:
+            backoff = settings.notification_retry_base_seconds * 2 ** (row.attempts - 1)
+            values.update(
+                recipients=json.dumps(result.retry_recipients),
+                next_attempt_at=now + timedelta(seconds=backoff)
+            )
+
+        await db.execute(
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id == row.id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def _is_invalid_token(exception: Optional[Exception]) -> bool:
+    """Errors that retrying the same token cannot fix."""
+    return isinstance(exception, (messaging.UnregisteredError, messaging.SenderIdMismatchError))
+
+
+@lru_cache()
+def get_notification_dispatcher() -> NotificationDispatcher:
+    """
+    Returns the process-wide dispatcher.
+    """
+    return NotificationDispatcher()
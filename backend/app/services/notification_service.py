@@ -6,282 +6,333 @@
 Notification Service
 
 Methods:
-- send_push_notification(user_id, title, body) -> None
-- send_email(email, subject, body) -> None
-- notify_homework_assigned(homework) -> None
-- notify_submission_received(submission) -> None
-- notify_grade_posted(submission) -> None
-- notify_deadline_reminder(homework) -> None
+- send_push_notification(user_id, title, body, data) -> NotificationOutbox
+- send_push_to_multiple(user_ids, title, body, data) -> Optional[NotificationOutbox]
+- send_email(to_email, subject, html_content) -> NotificationOutbox
+- notify_homework_assigned(homework, teacher_name) -> Optional[NotificationOutbox]
+- class_audience(class_id, include_parents) -> List[UUID]
+- notify_submission_received(teacher_user_id, student_name, homework_title, homework_id) -> None
+- notify_grade_posted(student_user_id, homework_title, grade, feedback) -> NotificationOutbox
+- notify_deadline_reminder(student_user_ids, homework_title, hours_remaining) -> Optional[NotificationOutbox]
+- send_parent_report_email(parent_email, student_name, report_html) -> NotificationOutbox
+- send_welcome_email(email, name, role) -> NotificationOutbox
+
+- digest_message(notification_type, count, data) -> Optional[Tuple[str, str]]
+
+Nothing here talks to Firebase or SendGrid. Every method adds a
+NotificationOutbox row to the caller's session without committing, so the
+notification is committed together with the event that caused it (or
+rolled back with it). NotificationDispatcher delivers the rows in the
+background, which keeps FCM and SMTP latency out of API requests.
+
+Types listed in notification_digest_types are coalesced. The first event
+for a (recipient, type, subject) key opens an outbox row that is due
+notification_digest_window_seconds later. Events arriving before the
+dispatcher claims it only increment the row's digest_count, and the
+dispatcher sends one digest, e.g. "37 new submissions for Algebra HW 4".
 """
 
-import logging
-from typing import Optional, List, Dict, Any
-from datetime import datetime
 import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Dict, Sequence, Tuple
+from uuid import UUID
 
-# Firebase Admin SDK
-try:
-    import firebase_admin
-    from firebase_admin import credentials, messaging
-    FIREBASE_AVAILABLE = True
-except ImportError:
-    FIREBASE_AVAILABLE = False
-
-# Email via SendGrid
-try:
-    from sendgrid import SendGridAPIClient
-    from sendgrid.helpers.mail import Mail
-    SENDGRID_AVAILABLE = True
-except ImportError:
-    SENDGRID_AVAILABLE = False
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.models.homework import Homework
+from app.models.notification import NotificationOutbox, NotificationChannel
+from app.models.parent import Parent
+from app.models.student import Student
 
 logger = logging.getLogger(__name__)
 
+# Title and body of a digest, by notification type
+_DIGEST_TEMPLATES = {
+    "submission_received": ("New Submissions", "{count} new submissions for {homework_title}"),
+}
+
+
+def _digest_enabled(notification_type: str) -> bool:
+    return (
+        settings.notification_digest_window_seconds > 0
+        and notification_type in settings.notification_digest_types
+    )
+
+
+def digest_message(notification_type: str, count: int, data: Dict[str, str]) -> Optional[Tuple[str, str]]:
+    """
+    Title and body for a digest of several events.
+
+    Args:
+        notification_type: Type of the coalesced notifications
+        count: Number of events
+        data: Payload of the first event
+
+    Returns:
+        (title, body), or None if the type has no digest template
+    """
+    template = _DIGEST_TEMPLATES.get(notification_type)
+    if template is None:
+        return None
+    title, body = template
+    return title, body.format(count=count, **data)
+
 
 class NotificationService:
     """
-    Service for sending push notifications and emails.
-    Supports Firebase Cloud Messaging and SendGrid.
+    Service for queueing push notifications and emails.
+    Push recipients are user IDs; their device tokens are looked up at delivery.
     """
 
-    def __init__(self):
-        self._init_firebase()
-        self._init_sendgrid()
-
-    def _init_firebase(self):
-        """Initialize Firebase Admin SDK."""
-        self.firebase_enabled = False
-
-        if not FIREBASE_AVAILABLE:
-            logger.warning("Firebase Admin SDK not installed")
-            return
-
-        if not settings.firebase_credentials_path:
-            logger.warning("Firebase credentials not configured")
-            return
-
-        try:
-            if not firebase_admin._apps:
-                cred = credentials.Certificate(settings.firebase_credentials_path)
-                firebase_admin.initialize_app(cred)
-            self.firebase_enabled = True
-            logger.info("Firebase initialized successfully")
-        except Exception as e:
-            logger.error(f"Firebase initialization failed: {e}")
-
-    def _init_sendgrid(self):
-        """Initialize SendGrid client."""
-        self.sendgrid_enabled = False
-
-        if not SENDGRID_AVAILABLE:
-            logger.warning("SendGrid SDK not installed")
-            return
-
-        if not settings.sendgrid_api_key:
-            logger.warning("SendGrid API key not configured")
-            return
-
-        try:
-            self.sendgrid_client = SendGridAPIClient(settings.sendgrid_api_key)
-            self.sendgrid_enabled = True
-            logger.info("SendGrid initialized successfully")
-        except Exception as e:
-            logger.error(f"SendGrid initialization failed: {e}")
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _enqueue(
+        self,
+        channel: NotificationChannel,
+        notification_type: str,
+        recipients: Sequence[str],
+        title: str,
+        body: str,
+        data: Optional[Dict[str, str]] = None
+    ) -> NotificationOutbox:
+        """Add an outbox row to the current transaction."""
+        row = NotificationOutbox(
+            channel=channel,
+            notification_type=notification_type,
+            title=title,
+            body=body,
+            data=json.dumps(data) if data else None,
+            recipients=json.dumps(list(recipients))
+        )
+        self.db.add(row)
+        return row
+
+    async def _enqueue_digest(
+        self,
+        notification_type: str,
+        recipient: UUID,
+        subject: str,
+        title: str,
+        body: str,
+        data: Dict[str, str]
+    ) -> None:
+        """
+        Queue a push notification, or fold it into the open digest for
+        the same (recipient, type, subject).
+        """
+        now = datetime.now(timezone.utc)
+        statement = insert(NotificationOutbox).values(
+            channel=NotificationChannel.PUSH,
+            notification_type=notification_type,
+            title=title,
+            body=body,
+            data=json.dumps(data),
+            recipients=json.dumps([str(recipient)]),
+            next_attempt_at=now + timedelta(seconds=settings.notification_digest_window_seconds),
+            digest_key=f"{notification_type}:{recipient}:{subject}"
+        )
+        await self.db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[NotificationOutbox.digest_key],
+                index_where=text("digest_key IS NOT NULL"),
+                set_={
+                    "digest_count": NotificationOutbox.digest_count + 1,
+                    "updated_at": now
+                }
+            )
+        )
 
     async def send_push_notification(
         self,
-        device_token: str,
+        user_id: UUID,
         title: str,
         body: str,
         data: Optional[Dict[str, str]] = None
-    ) -> bool:
+    ) -> NotificationOutbox:
         """
-        Send push notification to a device.
+        Queue a push notification to all devices of a user.
 
         Args:
-            device_token: FCM device token
+            user_id: Recipient user ID
             title: Notification title
             body: Notification body
             data: Optional additional data
 
         Returns:
-            True if sent successfully
+            Queued outbox row
         """
-        if not self.firebase_enabled:
-            logger.warning("Push notification skipped: Firebase not enabled")
-            return False
-
-        try:
-            message = messaging.Message(
-                notification=messaging.Notification(
-                    title=title,
-                    body=body
-                ),
-                data=data or {},
-                token=device_token
-            )
-
-            response = messaging.send(message)
-            logger.info(f"Push notification sent: {response}")
-            return True
-        except Exception as e:
-            logger.error(f"Push notification failed: {e}")
-            return False
+        notification_type = (data or {}).get("type", "generic")
+        return self._enqueue(NotificationChannel.PUSH, notification_type, [str(user_id)], title, body, data)
 
     async def send_push_to_multiple(
         self,
-        device_tokens: List[str],
+        user_ids: Sequence[UUID],
         title: str,
         body: str,
         data: Optional[Dict[str, str]] = None
-    ) -> int:
+    ) -> Optional[NotificationOutbox]:
         """
-        Send push notification to multiple devices.
+        Queue one push notification for many users.
 
         Args:
-            device_tokens: List of FCM device tokens
+            user_ids: Recipient user IDs
             title: Notification title
             body: Notification body
             data: Optional additional data
 
         Returns:
-            Number of successful sends
+            Queued outbox row, or None without recipients
         """
-        if not self.firebase_enabled:
-            return 0
-
-        try:
-            message = messaging.MulticastMessage(
-                notification=messaging.Notification(
-                    title=title,
-                    body=body
-                ),
-                data=data or {},
-                tokens=device_tokens
-            )
-
-            response = messaging.send_multicast(message)
-            logger.info(f"Multicast sent: {response.success_count} success")
-            return response.success_count
-        except Exception as e:
-            logger.error(f"Multicast push failed: {e}")
-            return 0
+        if not user_ids:
+            return None
+        notification_type = (data or {}).get("type", "generic")
+        recipients = list(dict.fromkeys(str(user_id) for user_id in user_ids))
+        return self._enqueue(NotificationChannel.PUSH, notification_type, recipients, title, body, data)
 
     async def send_email(
         self,
         to_email: str,
         subject: str,
         html_content: str,
-        from_email: Optional[str] = None
-    ) -> bool:
+        notification_type: str = "email"
+    ) -> NotificationOutbox:
         """
-        Send email via SendGrid.
+        Queue an email.
 
         Args:
             to_email: Recipient email
             subject: Email subject
             html_content: HTML content
-            from_email: Sender email (defaults to settings)
+            notification_type: Kind of email, for the outbox record
 
         Returns:
-            True if sent successfully
+            Queued outbox row
         """
-        if not self.sendgrid_enabled:
-            logger.warning("Email skipped: SendGrid not enabled")
-            return False
-
-        try:
-            message = Mail(
-                from_email=from_email or settings.from_email,
-                to_emails=to_email,
-                subject=subject,
-                html_content=html_content
-            )
-
-            response = self.sendgrid_client.send(message)
-            logger.info(f"Email sent: {response.status_code}")
-            return response.status_code in [200, 201, 202]
-        except Exception as e:
-            logger.error(f"Email send failed: {e}")
-            return False
+        return self._enqueue(NotificationChannel.EMAIL, notification_type, [to_email], subject, html_content)
 
     # Notification templates
 
     async def notify_homework_assigned(
         self,
-        student_tokens: List[str],
-        homework_title: str,
-        due_date: datetime,
-        teacher_name: str
-    ) -> int:
+        homework: Homework,
+        teacher_name: Optional[str] = None
+    ) -> Optional[NotificationOutbox]:
         """
-        Notify students about new homework.
+        Notify the students of the homework's class and their parents.
+
+        One outbox row covers the whole audience; the dispatcher splits it
+        into provider-sized chunks.
 
         Args:
-            student_tokens: Device tokens of students
-            homework_title: Title of homework
-            due_date: Due date
+            homework: Newly created homework (flushed, so it has an ID)
             teacher_name: Teacher's name
 
         Returns:
-            Number of notifications sent
+            Queued outbox row, or None if the class has no students
         """
+        recipients = await self.class_audience(homework.class_id)
+
         title = "New Homework Assigned"
-        body = f"{teacher_name} assigned: {homework_title}. Due: {due_date.strftime('%b %d, %Y')}"
+        assigned = f"{teacher_name} assigned" if teacher_name else "New homework"
+        body = f"{assigned}: {homework.title}. Due: {homework.due_date.strftime('%b %d, %Y')}"
         data = {
             "type": "homework_assigned",
-            "title": homework_title,
-            "due_date": due_date.isoformat()
+            "homework_id": str(homework.id),
+            "title": homework.title,
+            "due_date": homework.due_date.isoformat()
         }
 
-        return await self.send_push_to_multiple(student_tokens, title, body, data)
+        return await self.send_push_to_multiple(recipients, title, body, data)
+
+    async def class_audience(self, class_id: UUID, include_parents: bool = True) -> List[UUID]:
+        """
+        User IDs of a class's students and, optionally, their parents.
+
+        Args:
+            class_id: Class UUID
+            include_parents: Also return the students' parents
+
+        Returns:
+            Distinct user IDs, resolved with a single query
+        """
+        if not include_parents:
+            result = await self.db.execute(select(Student.user_id).where(Student.class_id == class_id))
+            return list(result.scalars().all())
+
+        result = await self.db.execute(
+            select(Student.user_id, Parent.user_id)
+            .outerjoin(Parent, Parent.id == Student.parent_id)
+            .where(Student.class_id == class_id)
+        )
+        audience: Dict[UUID, None] = {}
+        for student_user_id, parent_user_id in result.all():
+            audience[student_user_id] = None
+            if parent_user_id is not None:
+                audience[parent_user_id] = None
+        return list(audience)
 
     async def notify_submission_received(
         self,
-        teacher_token: str,
+        teacher_user_id: UUID,
         student_name: str,
-        homework_title: str
-    ) -> bool:
+        homework_title: str,
+        homework_id: Optional[UUID] = None
+    ) -> None:
         """
-        Notify teacher about new submission.
+        Notify teacher about new submission. Submissions for the same
+        homework are coalesced into a digest.
 
         Args:
-            teacher_token: Teacher's device token
+            teacher_user_id: Teacher's user ID
             student_name: Student's name
             homework_title: Homework title
-
-        Returns:
-            True if notification sent
+            homework_id: Homework UUID (digest subject)
         """
         title = "New Submission"
         body = f"{student_name} submitted: {homework_title}"
         data = {
             "type": "submission_received",
-            "student": student_name
+            "student": student_name,
+            "homework_title": homework_title
         }
-
-        return await self.send_push_notification(teacher_token, title, body, data)
+        if homework_id is not None:
+            data["homework_id"] = str(homework_id)
+
+        if _digest_enabled("submission_received"):
+            await self._enqueue_digest(
+                "submission_received",
+                teacher_user_id,
+                str(homework_id or homework_title),
+                title,
+                body,
+                data
+            )
+        else:
+            await self.send_push_notification(teacher_user_id, title, body, data)
 
     async def notify_grade_posted(
         self,
-        student_token: str,
+        student_user_id: UUID,
         homework_title: str,
         grade: float,
         feedback: Optional[str] = None
-    ) -> bool:
+    ) -> NotificationOutbox:
         """
         Notify student about grade.
 
         Args:
-            student_token: Student's device token
+            student_user_id: Student's user ID
             homework_title: Homework title
             grade: Grade received
             feedback: Optional teacher feedback
 
         Returns:
-            True if notification sent
+            Queued outbox row
         """
         title = "Grade Posted"
         body = f"You received {grade}% on: {homework_title}"
@@ -293,24 +344,24 @@ class NotificationService:
             "grade": str(grade)
         }
 
-        return await self.send_push_notification(student_token, title, body, data)
+        return await self.send_push_notification(student_user_id, title, body, data)
 
     async def notify_deadline_reminder(
         self,
-        student_token: str,
+        student_user_ids: Sequence[UUID],
         homework_title: str,
         hours_remaining: int
-    ) -> bool:
+    ) -> Optional[NotificationOutbox]:
         """
-        Send deadline reminder to student.
+        Send deadline reminder to students who have not submitted.
 
         Args:
-            student_token: Student's device token
+            student_user_ids: Students' user IDs
             homework_title: Homework title
             hours_remaining: Hours until deadline
 
         Returns:
-            True if notification sent
+            Queued outbox row, or None without recipients
         """
         title = "Deadline Reminder"
         body = f"{homework_title} is due in {hours_remaining} hours!"
@@ -319,14 +370,14 @@ class NotificationService:
             "hours": str(hours_remaining)
         }
 
-        return await self.send_push_notification(student_token, title, body, data)
+        return await self.send_push_to_multiple(student_user_ids, title, body, data)
 
     async def send_parent_report_email(
         self,
         parent_email: str,
         student_name: str,
         report_html: str
-    ) -> bool:
+    ) -> NotificationOutbox:
         """
         Send weekly progress report to parent.
 
@@ -336,17 +387,17 @@ class NotificationService:
             report_html: HTML report content
 
         Returns:
-            True if email sent
+            Queued outbox row
         """
         subject = f"Weekly Progress Report - {student_name}"
-        return await self.send_email(parent_email, subject, report_html)
+        return await self.send_email(parent_email, subject, report_html, "parent_report")
 
     async def send_welcome_email(
         self,
         email: str,
         name: str,
         role: str
-    ) -> bool:
+    ) -> NotificationOutbox:
         """
         Send welcome email to new user.
 
@@ -356,7 +407,7 @@ class NotificationService:
             role: User's role
 
         Returns:
-            True if email sent
+            Queued outbox row
         """
         subject = "Welcome to EduProof!"
         html_content = f"""
@@ -371,4 +422,4 @@ class NotificationService:
         </html>
         """
 
-        return await self.send_email(email, subject, html_content)
+        return await self.send_email(email, subject, html_content, "welcome")
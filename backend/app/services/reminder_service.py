@@ -0,0 +1,175 @@
+# reminder_service.py - Deadline Reminder Service
+#
+# Periodically reminds students of homework they have not submitted.
+
+"""
+Deadline Reminder Service
+
+Methods:
+- send_due_reminders(db, now) -> int
+- ReminderScheduler.start() / stop()
+- get_reminder_scheduler() -> ReminderScheduler
+
+Every deadline_reminder_interval_seconds, for each reminder window (e.g.
+24h and 2h before the due date), one statement finds every (homework,
+student) pair where:
+- the homework is due inside the window, and after the next smaller
+  window (so a homework due in 1 hour only gets the 2h reminder),
+- the student is in the homework's class,
+- the student has no submission for it (anti-join),
+and inserts them into deadline_reminders. ON CONFLICT DO NOTHING skips
+pairs already reminded for that window, and RETURNING hands back only the
+new ones, so each (homework, student, window) is reminded at most once even
+with several app processes running the scheduler.
+
+The new reminders are queued as one outbox row per homework, in the same
+transaction as the deadline_reminders rows.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, exists, func, literal
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import async_session_factory
+from app.models.homework import Homework
+from app.models.notification import DeadlineReminder
+from app.models.student import Student
+from app.models.submission import Submission
+from app.services.notification_service import NotificationService
+
+logger = logging.getLogger(__name__)
+
+
+def _reminder_bands(windows_hours: List[int]) -> List[Tuple[int, int]]:
+    """(lower, upper) hours before the due date for each window."""
+    windows = sorted(set(hours for hours in windows_hours if hours > 0))
+    return [(windows[i - 1] if i else 0, hours) for i, hours in enumerate(windows)]
+
+
+async def _claim_window(
+    db: AsyncSession,
+    now: datetime,
+    lower_hours: int,
+    upper_hours: int
+) -> List[Tuple[UUID, str, datetime, UUID]]:
+    """
+    Record and return the reminders of one window not sent yet.
+
+    Returns:
+        (homework_id, homework_title, due_date, student_user_id) rows
+    """
+    pending = (
+        select(
+            func.gen_random_uuid(),
+            Homework.id,
+            Student.id,
+            literal(upper_hours)
+        )
+        .select_from(Homework)
+        .join(Student, Student.class_id == Homework.class_id)
+        .where(
+            Homework.due_date > now + timedelta(hours=lower_hours),
+            Homework.due_date <= now + timedelta(hours=upper_hours),
+            ~exists().where(
+                Submission.homework_id == Homework.id,
+                Submission.student_id == Student.id
+            )
+        )
+    )
+    claimed = (
+        insert(DeadlineReminder)
+        .from_select(["id", "homework_id", "student_id", "window_hours"], pending)
+        .on_conflict_do_nothing(
+            index_elements=["homework_id", "student_id", "window_hours"]
+        )
+        .returning(DeadlineReminder.homework_id, DeadlineReminder.student_id)
+        .cte("claimed")
+    )
+    result = await db.execute(
+        select(claimed.c.homework_id, Homework.title, Homework.due_date, Student.user_id)
+        .join(Homework, Homework.id == claimed.c.homework_id)
+        .join(Student, Student.id == claimed.c.student_id)
+    )
+    return [tuple(row) for row in result.all()]
+
+
+async def send_due_reminders(db: AsyncSession, now: Optional[datetime] = None) -> int:
+    """
+    Queue reminders for every window; one query per window.
+
+    Args:
+        db: Database session (committed here)
+        now: Current time, for tests
+
+    Returns:
+        Number of students reminded
+    """
+    now = now or datetime.now(timezone.utc)
+    notifications = NotificationService(db)
+    reminded = 0
+
+    for lower_hours, upper_hours in _reminder_bands(settings.deadline_reminder_windows_hours):
+        rows = await _claim_window(db, now, lower_hours, upper_hours)
+        by_homework: Dict[UUID, Tuple[str, datetime, List[UUID]]] = {}
+        for homework_id, title, due_date, student_user_id in rows:
+            by_homework.setdefault(homework_id, (title, due_date, []))[2].append(student_user_id)
+
+        for title, due_date, student_user_ids in by_homework.values():
+            hours_remaining = max(1, round((due_date - now).total_seconds() / 3600))
+            await notifications.notify_deadline_reminder(student_user_ids, title, hours_remaining)
+        reminded += len(rows)
+
+    await db.commit()
+    return reminded
+
+
+class ReminderScheduler:
+    """
+    Runs send_due_reminders() in the background.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker = async_session_factory):
+        self.session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the scheduling loop as a background task."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the scheduling loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with self.session_factory() as db:
+                    reminded = await send_due_reminders(db)
+                if reminded:
+                    logger.info(f"Queued deadline reminders for {reminded} students")
+            except Exception as e:
+                logger.error(f"Deadline reminder run failed: {e}")
+            await asyncio.sleep(settings.deadline_reminder_interval_seconds)
+
+
+@lru_cache()
+def get_reminder_scheduler() -> ReminderScheduler:
+    """
+    Returns the process-wide reminder scheduler.
+    """
+    return ReminderScheduler()
@@ -0,0 +1,265 @@
+# report_service.py - Parent Report Service
+#
+# Weekly progress report emails for parents, generated as a batch job.
+
+"""
+Parent Report Service
+
+Methods:
+- generate_weekly_parent_reports(week_end) -> int
+- render_parent_report(stats, week_start, week_end) -> str
+
+Usage (from the backend directory, e.g. as a weekly cron job):
+    python -m app.services.report_service --week-end 2024-03-08
+
+All students' weekly stats come from one statement. A grouped pass over
+submissions for homework due that week and a per-class count of assigned
+homework are joined to students with a parent. The result is streamed
+from a server-side cursor in parent_report_batch_size rows at a time.
+Each batch is rendered with a template compiled once at import, and
+queued as email outbox rows in its own transaction. Memory stays
+constant however large the school is. The notification dispatcher then
+sends the emails with email_send_concurrency in flight.
+
+Each batch first records its students in parent_reports for the week.
+ON CONFLICT DO NOTHING RETURNING hands back only the students not
+reported yet, and only their emails are queued, in the same transaction.
+A rerun of the job, or a retry after it failed halfway, therefore sends
+each parent one report per student and week.
+"""
+
+import argparse
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from html import escape
+from string import Template
+from typing import Optional, Sequence, Set
+from uuid import UUID, uuid4
+
+from sqlalchemy import select, func, literal
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.config import settings
+from app.core.database import async_session_factory
+from app.models.homework import Homework
+from app.models.notification import ParentReport
+from app.models.parent import Parent
+from app.models.student import Student
+from app.models.submission import Submission
+from app.models.user import User
+from app.services.notification_service import NotificationService
+
+logger = logging.getLogger(__name__)
+
+
+_REPORT_TEMPLATE = Template("""
+<html>
+<body>
+    <h1>Weekly Progress Report</h1>
+    <p>Dear $parent_name,</p>
+    <p>Here is how <strong>$student_name</strong> did in the week of $week_start to $week_end.</p>
+    <table cellpadding="6">
+        <tr><td>Homework assigned</td><td>$assigned</td></tr>
+        <tr><td>Submitted</td><td>$submitted ($completion)</td></tr>
+        <tr><td>Submitted late</td><td>$late</td></tr>
+        <tr><td>Graded</td><td>$graded</td></tr>
+        <tr><td>Average grade</td><td>$average_grade</td></tr>
+    </table>
+    $missing_note
+    <br>
+    <p>Best regards,<br>The EduProof Team</p>
+</body>
+</html>
+""")
+
+
+@dataclass
+class StudentWeekStats:
+    """One student's homework stats for a week."""
+    student_name: str
+    parent_name: str
+    parent_email: str
+    assigned: int
+    submitted: int
+    late: int
+    graded: int
+    average_grade: Optional[float]
+
+
+def render_parent_report(stats: StudentWeekStats, week_start: date, week_end: date) -> str:
+    """
+    Render the report email for one student.
+
+    Args:
+        stats: Student's stats for the week
+        week_start: First day of the week
+        week_end: Last day of the week
+
+    Returns:
+        HTML content
+    """
+    missing = max(0, stats.assigned - stats.submitted)
+    return _REPORT_TEMPLATE.substitute(
+        parent_name=escape(stats.parent_name),
+        student_name=escape(stats.student_name),
+        week_start=week_start.strftime("%b %d"),
+        week_end=week_end.strftime("%b %d, %Y"),
+        assigned=stats.assigned,
+        submitted=stats.submitted,
+        completion=f"{stats.submitted / stats.assigned:.0%}" if stats.assigned else "n/a",
+        late=stats.late,
+        graded=stats.graded,
+        average_grade=f"{stats.average_grade:.1f}%" if stats.average_grade is not None else "not graded yet",
+        missing_note=(
+            f"<p>{missing} homework assignment{'s' if missing != 1 else ''} "
+            f"{'were' if missing != 1 else 'was'} not submitted.</p>" if missing else ""
+        )
+    )
+
+
+def _weekly_stats_query(start: datetime, end: datetime):
+    """Stats of every student with a parent, for homework due in [start, end)."""
+    due_this_week = (Homework.due_date >= start, Homework.due_date < end)
+
+    submission_stats = (
+        select(
+            Submission.student_id,
+            func.count().label("submitted"),
+            func.count().filter(Submission.submitted_at > Homework.due_date).label("late"),
+            func.count(Submission.grade).label("graded"),
+            func.avg(Submission.grade).label("average_grade")
+        )
+        .join(Homework, Homework.id == Submission.homework_id)
+        .where(*due_this_week)
+        .group_by(Submission.student_id)
+        .subquery("submission_stats")
+    )
+    assigned = (
+        select(Homework.class_id, func.count().label("assigned"))
+        .where(*due_this_week)
+        .group_by(Homework.class_id)
+        .subquery("assigned")
+    )
+
+    student_user = aliased(User)
+    parent_user = aliased(User)
+    return (
+        select(
+            Student.id,
+            student_user.first_name,
+            student_user.last_name,
+            parent_user.first_name,
+            parent_user.last_name,
+            parent_user.email,
+            func.coalesce(assigned.c.assigned, literal(0)),
+            func.coalesce(submission_stats.c.submitted, literal(0)),
+            func.coalesce(submission_stats.c.late, literal(0)),
+            func.coalesce(submission_stats.c.graded, literal(0)),
+            submission_stats.c.average_grade
+        )
+        .select_from(Student)
+        .join(student_user, student_user.id == Student.user_id)
+        .join(Parent, Parent.id == Student.parent_id)
+        .join(parent_user, parent_user.id == Parent.user_id)
+        .outerjoin(assigned, assigned.c.class_id == Student.class_id)
+        .outerjoin(submission_stats, submission_stats.c.student_id == Student.id)
+        .where(student_user.is_active.is_(True), parent_user.is_active.is_(True))
+        .order_by(Student.id)
+    )
+
+
+async def _claim_reports(db: AsyncSession, student_ids: Sequence[UUID], week_start: date) -> Set[UUID]:
+    """
+    Record reports for the week and return the students not reported yet.
+
+    Args:
+        db: Database session (not committed here)
+        student_ids: Students of the batch
+        week_start: First day of the reported week
+
+    Returns:
+        IDs of the students whose report should be sent
+    """
+    if not student_ids:
+        return set()
+    result = await db.execute(
+        insert(ParentReport)
+        .values([
+            {"id": uuid4(), "student_id": student_id, "week_start": week_start}
+            for student_id in student_ids
+        ])
+        .on_conflict_do_nothing(index_elements=["student_id", "week_start"])
+        .returning(ParentReport.student_id)
+    )
+    return set(result.scalars().all())
+
+
+async def generate_weekly_parent_reports(week_end: Optional[date] = None) -> int:
+    """
+    Queue weekly report emails for the parents of all students.
+
+    Args:
+        week_end: Last day of the reported week (default: today)
+
+    Returns:
+        Number of reports queued (students already reported for the
+        week are skipped)
+    """
+    week_end = week_end or datetime.now(timezone.utc).date()
+    week_start = week_end - timedelta(days=6)
+    start = datetime.combine(week_start, time.min, tzinfo=timezone.utc)
+    end = datetime.combine(week_end + timedelta(days=1), time.min, tzinfo=timezone.utc)
+
+    queued = 0
+    # Reading and writing use separate sessions: committing a batch must
+    # not close the server-side cursor the stats are streamed from.
+    async with async_session_factory() as read_db, async_session_factory() as write_db:
+        notifications = NotificationService(write_db)
+        result = await read_db.stream(
+            _weekly_stats_query(start, end).execution_options(yield_per=settings.parent_report_batch_size)
+        )
+        async for batch in result.partitions():
+            claimed = await _claim_reports(write_db, [row[0] for row in batch], week_start)
+            for (student_id, student_first, student_last, parent_first, parent_last, parent_email,
+                 assigned, submitted, late, graded, average_grade) in batch:
+                if student_id not in claimed:
+                    continue
+                stats = StudentWeekStats(
+                    student_name=f"{student_first} {student_last}",
+                    parent_name=f"{parent_first} {parent_last}",
+                    parent_email=parent_email,
+                    assigned=assigned,
+                    submitted=submitted,
+                    late=late,
+                    graded=graded,
+                    average_grade=float(average_grade) if average_grade is not None else None
+                )
+                await notifications.send_parent_report_email(
+                    stats.parent_email,
+                    stats.student_name,
+                    render_parent_report(stats, week_start, week_end)
+                )
+            await write_db.commit()
+            write_db.expunge_all()
+            queued += len(claimed)
+            logger.info(f"Queued {queued} parent reports")
+
+    return queued
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Queue weekly parent report emails.")
+    parser.add_argument("--week-end", type=date.fromisoformat, default=None,
+                        help="Last day of the reported week, YYYY-MM-DD (default: today)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    queued = asyncio.run(generate_weekly_parent_reports(args.week_end))
+    print(f"Queued {queued} parent reports")
+
+
+if __name__ == "__main__":
+    main()
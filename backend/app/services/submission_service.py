@@ -12,21 +12,43 @@ Methods:
 - list_submissions_for_homework(homework_id) -> List[Submission]
 - list_submissions_for_student(student_id) -> List[Submission]
 - trigger_ai_analysis(submission_id) -> None
+- get_grading_request(submission_id) -> dict
+- run_submission_analysis(submission_id) -> None   (background job)
 - get_ai_analysis(submission_id) -> dict
+- get_feedback_request(submission_id, teacher_id, grade, submission_text) -> dict
+- stream_feedback_suggestion(payload) -> AsyncIterator[bytes]
+
+AI analysis runs in the background: the AI service OCRs the submission
+file and grades it against the homework's cached grading context (keyed
+by Homework.updated_at). The result, including the extracted text that
+feedback suggestions are written from, is stored in ai_analysis.
 """
 
-from typing import Optional, List, Tuple
+from typing import AsyncIterator, Optional, List, Tuple
 from uuid import UUID
 from datetime import datetime, timezone
 import json
+import logging
+
+import httpx
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.database import async_session_factory
+
+from app.models.student import Student
 from app.models.submission import Submission, SubmissionStatus
+from app.models.teacher import Teacher
+from app.models.user import User
 from app.repositories.submission_repository import SubmissionRepository
 from app.repositories.homework_repository import HomeworkRepository
+from app.services.notification_service import NotificationService
 from app.schemas.submission import SubmissionResponse, SubmissionGrade, SubmissionStats
 from app.utils.exceptions import AppException
 
+logger = logging.getLogger(__name__)
+
 
 class SubmissionService:
     """Service for submission management operations."""
@@ -35,6 +57,7 @@ class SubmissionService:
         self.db = db
         self.submission_repo = SubmissionRepository(db)
         self.homework_repo = HomeworkRepository(db)
+        self.notifications = NotificationService(db)
 
     async def create_submission(
         self,
@@ -94,7 +117,22 @@ class SubmissionService:
         }
 
         submission = await self.submission_repo.create(submission_data)
-        await self.db.commit()
+
+        # Teacher's user ID and student's name in one round-trip
+        teacher_user_id = select(Teacher.user_id).where(Teacher.id == homework.teacher_id).scalar_subquery()
+        recipient = (await self.db.execute(
+            select(teacher_user_id, User.first_name, User.last_name)
+            .select_from(Student)
+            .join(User, User.id == Student.user_id)
+            .where(Student.id == student_id)
+        )).one_or_none()
+        if recipient and recipient[0]:
+            await self.notifications.notify_submission_received(
+                recipient[0],
+                f"{recipient[1]} {recipient[2]}",
+                homework.title,
+                homework.id
+            )
         return submission
 
     async def get_submission(
@@ -178,26 +216,6 @@ class SubmissionService:
         Returns:
             Updated Submission object
         """
-        submission = await self.submission_repo.get_by_id(
-            submission_id,
-            load_relationships=True
-        )
-        if not submission:
-            raise AppException(
-                status_code=404,
-                error_code="SUBMISSION_NOT_FOUND",
-                message="Submission not found"
-            )
-
-        # Check if teacher owns this homework
-        homework = await self.homework_repo.get_by_id(submission.homework_id)
-        if homework.teacher_id != teacher_id:
-            raise AppException(
-                status_code=403,
-                error_code="NOT_HOMEWORK_OWNER",
-                message="You can only grade submissions for your own homework"
-            )
-
         update_data = {
             "grade": grade_data.grade,
             "teacher_feedback": grade_data.feedback,
@@ -205,8 +223,22 @@ class SubmissionService:
             "reviewed_at": datetime.now(timezone.utc)
         }
 
-        submission = await self.submission_repo.update(submission_id, update_data)
-        await self.db.commit()
+        # Ownership is part of the UPDATE's WHERE clause
+        updated = await self.submission_repo.update_for_teacher(submission_id, teacher_id, update_data)
+        if not updated:
+            await self._raise_not_updatable(
+                submission_id,
+                "You can only grade submissions for your own homework"
+            )
+        submission, homework_title, student_user_id = updated
+
+        # Queued in the grading transaction; delivered by the dispatcher
+        await self.notifications.notify_grade_posted(
+            student_user_id,
+            homework_title,
+            grade_data.grade,
+            grade_data.feedback
+        )
         return submission
 
     async def add_feedback(
@@ -226,34 +258,33 @@ class SubmissionService:
         Returns:
             Updated Submission object
         """
-        submission = await self.submission_repo.get_by_id(
-            submission_id,
-            load_relationships=True
-        )
-        if not submission:
-            raise AppException(
-                status_code=404,
-                error_code="SUBMISSION_NOT_FOUND",
-                message="Submission not found"
-            )
-
-        homework = await self.homework_repo.get_by_id(submission.homework_id)
-        if homework.teacher_id != teacher_id:
-            raise AppException(
-                status_code=403,
-                error_code="NOT_HOMEWORK_OWNER",
-                message="You can only add feedback to submissions for your own homework"
-            )
-
         update_data = {
             "teacher_feedback": feedback,
             "status": SubmissionStatus.REVIEWED,
             "reviewed_at": datetime.now(timezone.utc)
         }
 
-        submission = await self.submission_repo.update(submission_id, update_data)
-        await self.db.commit()
-        return submission
+        updated = await self.submission_repo.update_for_teacher(submission_id, teacher_id, update_data)
+        if not updated:
+            await self._raise_not_updatable(
+                submission_id,
+                "You can only add feedback to submissions for your own homework"
+            )
+        return updated[0]
+
+    async def _raise_not_updatable(self, submission_id: UUID, not_owner_message: str) -> None:
+        """Raise 404 or 403 after an ownership-checked update matched no row."""
+        if await self.submission_repo.get_homework_owner(submission_id) is None:
+            raise AppException(
+                status_code=404,
+                error_code="SUBMISSION_NOT_FOUND",
+                message="Submission not found"
+            )
+        raise AppException(
+            status_code=403,
+            error_code="NOT_HOMEWORK_OWNER",
+            message=not_owner_message
+        )
 
     async def list_submissions_by_homework(
         self,
@@ -363,10 +394,38 @@ class SubmissionService:
 
     async def trigger_ai_analysis(self, submission_id: UUID) -> None:
         """
-        Trigger AI analysis for a submission.
+        Queue AI analysis for a submission.
+        The analysis itself is run by run_submission_analysis().
+
+        Args:
+            submission_id: Submission UUID
+        """
+        ai_result = {
+            "status": "pending",
+            "message": "AI analysis queued",
+            "queued_at": datetime.now(timezone.utc).isoformat()
+        }
+
+        submission = await self.submission_repo.update(
+            submission_id,
+            {"ai_analysis": json.dumps(ai_result)}
+        )
+        if not submission:
+            raise AppException(
+                status_code=404,
+                error_code="SUBMISSION_NOT_FOUND",
+                message="Submission not found"
+            )
+
+    async def get_grading_request(self, submission_id: UUID) -> dict:
+        """
+        Build the AI service request for OCR and a grade suggestion.
 
         Args:
             submission_id: Submission UUID
+
+        Returns:
+            Payload for POST /analysis/grade
         """
         submission = await self.submission_repo.get_by_id(submission_id)
         if not submission:
@@ -375,20 +434,91 @@ class SubmissionService:
                 error_code="SUBMISSION_NOT_FOUND",
                 message="Submission not found"
             )
+        homework = await self.homework_repo.get_by_id(submission.homework_id)
 
-        # TODO: Integrate with AI service
-        # For now, we'll just store a placeholder
-        ai_result = {
-            "status": "pending",
-            "message": "AI analysis queued",
-            "queued_at": datetime.now(timezone.utc).isoformat()
+        description = homework.title
+        if homework.description:
+            description = f"{homework.title}\n{homework.description}"
+
+        return {
+            "file_url": submission.file_url,
+            "file_type": submission.file_type,
+            "homework": {
+                "homework_id": str(homework.id),
+                "updated_at": homework.updated_at.isoformat(),
+                "description": description,
+                "max_points": 100,
+                "textbook_id": str(homework.textbook_id) if homework.textbook_id else None,
+                "page_numbers": homework.page_numbers
+            }
         }
 
-        await self.submission_repo.update(
-            submission_id,
-            {"ai_analysis": json.dumps(ai_result)}
-        )
-        await self.db.commit()
+    async def get_feedback_request(
+        self,
+        submission_id: UUID,
+        teacher_id: UUID,
+        grade: Optional[float] = None,
+        submission_text: Optional[str] = None
+    ) -> dict:
+        """
+        Build the AI service request for a feedback suggestion.
+
+        Args:
+            submission_id: Submission UUID
+            teacher_id: Teacher ID (for authorization)
+            grade: Grade to base the feedback on; defaults to the saved grade
+            submission_text: Text to base the feedback on; defaults to the
+                text extracted by AI analysis
+
+        Returns:
+            Payload for POST /analysis/feedback/stream
+        """
+        submission = await self.submission_repo.get_by_id(submission_id)
+        if not submission:
+            raise AppException(
+                status_code=404,
+                error_code="SUBMISSION_NOT_FOUND",
+                message="Submission not found"
+            )
+
+        homework = await self.homework_repo.get_by_id(submission.homework_id)
+        if homework.teacher_id != teacher_id:
+            raise AppException(
+                status_code=403,
+                error_code="NOT_HOMEWORK_OWNER",
+                message="You can only request feedback for your own homework"
+            )
+
+        grade = grade if grade is not None else submission.grade
+        if grade is None:
+            raise AppException(
+                status_code=400,
+                error_code="GRADE_REQUIRED",
+                message="Grade the submission or pass a grade to suggest feedback"
+            )
+
+        if not submission_text:
+            try:
+                analysis = json.loads(submission.ai_analysis or "{}")
+            except json.JSONDecodeError:
+                analysis = {}
+            submission_text = analysis.get("extracted_text") if isinstance(analysis, dict) else None
+        if not submission_text:
+            raise AppException(
+                status_code=409,
+                error_code="SUBMISSION_TEXT_UNAVAILABLE",
+                message="Submission text has not been extracted yet. Run AI analysis first or pass submission_text."
+            )
+
+        description = homework.title
+        if homework.description:
+            description = f"{homework.title}\n{homework.description}"
+
+        return {
+            "submission_text": submission_text,
+            "homework_description": description,
+            "grade": grade
+        }
 
     async def delete_submission(
         self,
@@ -425,4 +555,72 @@ class SubmissionService:
             )
 
         await self.submission_repo.delete(submission_id)
-        await self.db.commit()
+
+
+async def run_submission_analysis(submission_id: UUID) -> None:
+    """
+    OCR and grade a submission through the AI service.
+
+    Runs outside the request with its own session; schedule it with
+    BackgroundTasks after trigger_ai_analysis(). The outcome replaces the
+    queued placeholder in ai_analysis.
+
+    Args:
+        submission_id: Submission UUID
+    """
+    async with async_session_factory() as db:
+        service = SubmissionService(db)
+        try:
+            payload = await service.get_grading_request(submission_id)
+            timeout = httpx.Timeout(30.0, read=settings.ai_analysis_timeout_seconds)
+            async with httpx.AsyncClient(timeout=timeout) as client:
+                response = await client.post(f"{settings.ai_service_url}/analysis/grade", json=payload)
+                response.raise_for_status()
+            ai_result = {
+                **response.json(),
+                "status": "completed",
+                "completed_at": datetime.now(timezone.utc).isoformat()
+            }
+        except Exception as e:
+            logger.error(f"AI analysis of submission {submission_id} failed: {e}")
+            await db.rollback()
+            ai_result = {
+                "status": "failed",
+                "message": "AI analysis failed. Please review manually.",
+                "failed_at": datetime.now(timezone.utc).isoformat()
+            }
+
+        await service.submission_repo.update(submission_id, {"ai_analysis": json.dumps(ai_result)})
+        await db.commit()
+
+
+async def stream_feedback_suggestion(payload: dict) -> AsyncIterator[bytes]:
+    """
+    Proxy the AI service's feedback Server-Sent Events stream.
+
+    Bytes are passed through as they arrive so the first tokens reach the
+    client immediately. Connection failures become an SSE "error" event,
+    since the response has already started when they happen.
+
+    Args:
+        payload: Request built by SubmissionService.get_feedback_request()
+
+    Yields:
+        Raw SSE bytes
+    """
+    # No read timeout between tokens; the AI service ends the stream
+    timeout = httpx.Timeout(30.0, read=None)
+    try:
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            async with client.stream(
+                "POST",
+                f"{settings.ai_service_url}/analysis/feedback/stream",
+                json=payload
+            ) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_raw():
+                    yield chunk
+    except httpx.HTTPError as e:
+        logger.error(f"Feedback stream from AI service failed: {e}")
+        message = json.dumps({"message": "AI feedback is unavailable right now."})
+        yield f"event: error\ndata: {message}\n\n".encode()
@@ -10,18 +10,52 @@ Methods:
 - get_textbook(textbook_id) -> dict
 - delete_textbook(textbook_id) -> None
 - list_textbooks(filters) -> List[dict]
-- trigger_indexing(textbook_id) -> None
+- trigger_indexing(textbook_id) -> bool
+- get_index_checkpoint(textbook_id) -> dict
+- update_page_count(textbook_id, page_count) -> None   (progress hook)
+- record_page_indexed(textbook_id, page, hash) -> None  (progress hook)
+- mark_as_indexed(textbook_id) -> None                  (progress hook)
+- mark_indexing_failed(textbook_id, error) -> None      (progress hook)
+
+Indexing runs in the background (run_textbook_indexing) against the AI
+service, which streams per-page results. Each page is committed as a
+TextbookPage checkpoint, so a crash or redeploy resumes from the first
+page without one, and re-indexing skips pages whose content hash is
+unchanged.
+
+A running job holds a Postgres advisory lock keyed by the textbook for
+its whole run, so only one process indexes a textbook at a time: a job
+that cannot take the lock exits, and trigger_indexing() answers 409
+while another process holds it.
 """
 
-from typing import Optional, List, Tuple
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Optional, List, Tuple, Dict
 from uuid import UUID
-from sqlalchemy import select, func, and_
+
+import httpx
+from sqlalchemy import select, func, and_, update, delete
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.models.textbook import Textbook
+from app.core.config import settings
+from app.core.database import async_session_factory, engine
+from app.models.textbook import Textbook, TextbookPage, TextbookIndexStatus
 from app.utils.exceptions import AppException
 
+logger = logging.getLogger(__name__)
+
+# Statuses that mean a previous indexing run did not finish
+INCOMPLETE_INDEX_STATUSES = (
+    TextbookIndexStatus.QUEUED,
+    TextbookIndexStatus.INDEXING,
+    TextbookIndexStatus.FAILED,
+)
+
 
 class TextbookService:
     """Service for textbook management operations."""
@@ -56,12 +90,13 @@ class TextbookService:
             class_id=class_id,
             file_url=file_url,
             uploaded_by=uploaded_by,
-            is_indexed=False
+            is_indexed=False,
+            indexing_status=TextbookIndexStatus.NOT_INDEXED,
+            indexed_page_count=0
         )
 
         self.db.add(textbook)
-        await self.db.commit()
-        await self.db.refresh(textbook)
+        await self.db.flush()
 
         return {
             "id": str(textbook.id),
@@ -70,6 +105,7 @@ class TextbookService:
             "class_id": str(textbook.class_id),
             "file_url": textbook.file_url,
             "is_indexed": textbook.is_indexed,
+            "indexing": self._indexing_progress(textbook),
             "created_at": textbook.created_at.isoformat()
         }
 
@@ -110,6 +146,7 @@ class TextbookService:
             "file_url": textbook.file_url,
             "page_count": textbook.page_count,
             "is_indexed": textbook.is_indexed,
+            "indexing": self._indexing_progress(textbook),
             "subject": {
                 "id": str(textbook.subject.id),
                 "name": textbook.subject.name
@@ -142,7 +179,7 @@ class TextbookService:
             )
 
         await self.db.delete(textbook)
-        await self.db.commit()
+        await self.db.flush()
 
     async def list_textbooks(
         self,
@@ -200,6 +237,7 @@ class TextbookService:
                 "file_url": t.file_url,
                 "page_count": t.page_count,
                 "is_indexed": t.is_indexed,
+                "indexing": self._indexing_progress(t),
                 "subject": {
                     "id": str(t.subject.id),
                     "name": t.subject.name
@@ -216,13 +254,20 @@ class TextbookService:
 
         return textbook_list, total
 
-    async def trigger_indexing(self, textbook_id: UUID) -> None:
-        """
-        Trigger AI indexing for a textbook.
+    def _indexing_progress(self, textbook: Textbook) -> dict:
+        """Build the indexing progress block for API responses."""
+        page_count = textbook.page_count or 0
+        indexed_pages = textbook.indexed_page_count or 0
+        return {
+            "status": textbook.indexing_status.value if textbook.indexing_status else None,
+            "indexed_pages": indexed_pages,
+            "page_count": textbook.page_count,
+            "percent": round(min(indexed_pages / page_count, 1.0) * 100, 1) if page_count else 0.0,
+            "error": textbook.indexing_error,
+            "indexed_at": textbook.indexed_at.isoformat() if textbook.indexed_at else None
+        }
 
-        Args:
-            textbook_id: Textbook UUID
-        """
+    async def _get_textbook_or_404(self, textbook_id: UUID) -> Textbook:
         query = select(Textbook).where(Textbook.id == textbook_id)
         result = await self.db.execute(query)
         textbook = result.scalar_one_or_none()
@@ -233,39 +278,302 @@ class TextbookService:
                 error_code="TEXTBOOK_NOT_FOUND",
                 message="Textbook not found"
             )
+        return textbook
+
+    async def trigger_indexing(self, textbook_id: UUID, force: bool = False) -> bool:
+        """
+        Queue AI indexing for a textbook.
+
+        Args:
+            textbook_id: Textbook UUID
+            force: Discard page checkpoints and rebuild from scratch
+
+        Returns:
+            True if the job should resume an interrupted run, False if it
+            should make a full pass (skipping pages with unchanged hashes)
+        """
+        textbook = await self._get_textbook_or_404(textbook_id)
+
+        if textbook_id in _running_indexing_jobs or await self._indexing_locked(textbook_id):
+            raise AppException(
+                status_code=409,
+                error_code="INDEXING_IN_PROGRESS",
+                message="Textbook is already being indexed"
+            )
+
+        resume = not force and textbook.indexing_status in INCOMPLETE_INDEX_STATUSES
+
+        if force:
+            await self.db.execute(
+                delete(TextbookPage).where(TextbookPage.textbook_id == textbook_id)
+            )
+            textbook.indexed_page_count = 0
 
-        # TODO: Integrate with AI service for PDF indexing
-        # For now, just mark as pending indexing
-        # This would typically queue a background job
-        pass
+        textbook.indexing_status = TextbookIndexStatus.QUEUED
+        textbook.indexing_error = None
+        await self.db.commit()
+        return resume
+
+    async def _indexing_locked(self, textbook_id: UUID) -> bool:
+        """Whether any process holds the textbook's indexing lock."""
+        key = _indexing_lock_key(textbook_id)
+        acquired = await self.db.scalar(select(func.pg_try_advisory_lock(key)))
+        if acquired:
+            await self.db.execute(select(func.pg_advisory_unlock(key)))
+        return not acquired
+
+    async def get_index_checkpoint(self, textbook_id: UUID, resume: bool = True) -> dict:
+        """
+        Get the saved per-page checkpoint for a textbook.
+
+        Args:
+            textbook_id: Textbook UUID
+            resume: Start after the last contiguous completed page
+
+        Returns:
+            Dict with start_page and page_hashes (page number -> content hash)
+        """
+        query = (
+            select(TextbookPage.page_number, TextbookPage.content_hash)
+            .where(TextbookPage.textbook_id == textbook_id)
+        )
+        result = await self.db.execute(query)
+        page_hashes: Dict[int, str] = {row.page_number: row.content_hash for row in result}
+
+        start_page = 1
+        if resume:
+            while start_page in page_hashes:
+                start_page += 1
+
+        return {"start_page": start_page, "page_hashes": page_hashes}
 
     async def update_page_count(self, textbook_id: UUID, page_count: int) -> None:
         """
-        Update textbook page count.
+        Progress hook: indexing started and the page count is known.
 
         Args:
             textbook_id: Textbook UUID
             page_count: Number of pages
         """
-        query = select(Textbook).where(Textbook.id == textbook_id)
-        result = await self.db.execute(query)
-        textbook = result.scalar_one_or_none()
+        await self.db.execute(
+            update(Textbook)
+            .where(Textbook.id == textbook_id)
+            .values(page_count=page_count, indexing_status=TextbookIndexStatus.INDEXING)
+        )
+        await self.db.commit()
 
-        if textbook:
-            textbook.page_count = page_count
-            await self.db.commit()
+    async def record_page_indexed(
+        self,
+        textbook_id: UUID,
+        page_number: int,
+        content_hash: str
+    ) -> None:
+        """
+        Progress hook: checkpoint one completed page.
+
+        Args:
+            textbook_id: Textbook UUID
+            page_number: Page that was indexed
+            content_hash: Hash of the page's extracted text
+        """
+        now = datetime.now(timezone.utc)
+        stmt = insert(TextbookPage).values(
+            textbook_id=textbook_id,
+            page_number=page_number,
+            content_hash=content_hash,
+            indexed_at=now
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_textbook_pages_textbook_id_page_number",
+            set_={"content_hash": content_hash, "indexed_at": now, "updated_at": now}
+        )
+        await self.db.execute(stmt)
+
+        indexed_pages = (
+            select(func.count(TextbookPage.id))
+            .where(TextbookPage.textbook_id == textbook_id)
+            .scalar_subquery()
+        )
+        await self.db.execute(
+            update(Textbook)
+            .where(Textbook.id == textbook_id)
+            .values(indexed_page_count=indexed_pages)
+        )
+        await self.db.commit()
 
     async def mark_as_indexed(self, textbook_id: UUID) -> None:
         """
-        Mark textbook as indexed.
+        Progress hook: indexing completed.
 
         Args:
             textbook_id: Textbook UUID
         """
-        query = select(Textbook).where(Textbook.id == textbook_id)
-        result = await self.db.execute(query)
-        textbook = result.scalar_one_or_none()
+        await self.db.execute(
+            update(Textbook)
+            .where(Textbook.id == textbook_id)
+            .values(
+                is_indexed=True,
+                indexing_status=TextbookIndexStatus.INDEXED,
+                indexing_error=None,
+                indexed_at=datetime.now(timezone.utc)
+            )
+        )
+        await self.db.commit()
+
+    async def mark_indexing_failed(self, textbook_id: UUID, error: str) -> None:
+        """
+        Progress hook: indexing stopped with an error.
+        Completed page checkpoints are kept so the next run resumes.
+
+        Args:
+            textbook_id: Textbook UUID
+            error: Error description
+        """
+        await self.db.execute(
+            update(Textbook)
+            .where(Textbook.id == textbook_id)
+            .values(indexing_status=TextbookIndexStatus.FAILED, indexing_error=error[:1000])
+        )
+        await self.db.commit()
+
+
+# Indexing jobs running in this process, keyed by textbook ID; the
+# advisory lock covers jobs in other processes
+_running_indexing_jobs: Dict[UUID, asyncio.Task] = {}
+
+
+def _indexing_lock_key(textbook_id: UUID) -> int:
+    """Advisory lock key (signed 64-bit) of a textbook's indexing job."""
+    return int.from_bytes(textbook_id.bytes[:8], "big", signed=True)
+
+
+async def run_textbook_indexing(textbook_id: UUID, resume: bool = True, force: bool = False) -> None:
+    """
+    Index a textbook through the AI service, checkpointing every page.
+
+    Runs outside the request with its own session. Intended to be
+    scheduled via BackgroundTasks or start_textbook_indexing(). The
+    textbook's advisory lock is held on a dedicated connection for the
+    whole run; if another process holds it, this call returns at once.
+
+    Args:
+        textbook_id: Textbook UUID
+        resume: Continue from the last checkpointed page
+        force: Have the AI service download the PDF again
+    """
+    key = _indexing_lock_key(textbook_id)
+    async with engine.connect() as lock_conn:
+        acquired = await lock_conn.scalar(select(func.pg_try_advisory_lock(key)))
+        # Session-level locks outlive the transaction; don't sit idle in one
+        await lock_conn.commit()
+        if not acquired:
+            logger.info(f"Textbook {textbook_id} is being indexed by another process")
+            return
+        try:
+            await _index_with_ai_service(textbook_id, resume, force)
+        finally:
+            await lock_conn.execute(select(func.pg_advisory_unlock(key)))
+            await lock_conn.commit()
+
+
+async def _index_with_ai_service(textbook_id: UUID, resume: bool, force: bool) -> None:
+    """Stream indexing progress from the AI service into page checkpoints."""
+    async with async_session_factory() as db:
+        service = TextbookService(db)
+        try:
+            textbook = await service._get_textbook_or_404(textbook_id)
+            checkpoint = await service.get_index_checkpoint(textbook_id, resume=resume)
+            payload = {
+                "textbook_id": str(textbook_id),
+                "file_url": textbook.file_url,
+                "start_page": checkpoint["start_page"],
+                "page_hashes": checkpoint["page_hashes"],
+                "force": force
+            }
+
+            # No read timeout: a large textbook streams progress for minutes
+            timeout = httpx.Timeout(30.0, read=None)
+            async with httpx.AsyncClient(timeout=timeout) as client:
+                async with client.stream(
+                    "POST",
+                    f"{settings.ai_service_url}/textbook/index",
+                    json=payload
+                ) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        event = json.loads(line)
+                        kind = event.get("event")
+
+                        if kind == "started":
+                            await service.update_page_count(textbook_id, event["page_count"])
+                        elif kind == "page":
+                            # Unchanged pages already have a checkpoint
+                            if not event.get("skipped"):
+                                await service.record_page_indexed(
+                                    textbook_id,
+                                    event["page_number"],
+                                    event["content_hash"]
+                                )
+                        elif kind == "completed":
+                            await service.mark_as_indexed(textbook_id)
+                            logger.info(
+                                f"Textbook {textbook_id} indexed: "
+                                f"{event.get('indexed', 0)} pages, {event.get('skipped', 0)} unchanged"
+                            )
+                            return
+                        elif kind == "error":
+                            raise RuntimeError(event.get("message") or "AI service indexing error")
+
+            raise RuntimeError("Indexing stream ended before completion")
+        except Exception as e:
+            logger.error(f"Indexing textbook {textbook_id} failed: {e}")
+            await db.rollback()
+            await service.mark_indexing_failed(textbook_id, str(e))
+
+
+def start_textbook_indexing(textbook_id: UUID, resume: bool = True, force: bool = False) -> asyncio.Task:
+    """
+    Start an indexing job as a tracked background task.
+
+    Args:
+        textbook_id: Textbook UUID
+        resume: Continue from the last checkpointed page
+        force: Have the AI service download the PDF again
+
+    Returns:
+        The running task
+    """
+    task = asyncio.create_task(run_textbook_indexing(textbook_id, resume=resume, force=force))
+    _running_indexing_jobs[textbook_id] = task
+    task.add_done_callback(lambda _: _running_indexing_jobs.pop(textbook_id, None))
+    return task
+
+
+async def resume_interrupted_indexing() -> int:
+    """
+    Restart indexing jobs that were queued or running when the process
+    stopped. Should be called on application startup.
+
+    Returns:
+        Number of jobs resumed
+    """
+    async with async_session_factory() as db:
+        result = await db.execute(
+            select(Textbook.id).where(
+                Textbook.indexing_status.in_([
+                    TextbookIndexStatus.QUEUED,
+                    TextbookIndexStatus.INDEXING
+                ])
+            )
+        )
+        textbook_ids: List[UUID] = list(result.scalars().all())
+
+    for textbook_id in textbook_ids:
+        if textbook_id not in _running_indexing_jobs:
+            start_textbook_indexing(textbook_id, resume=True)
 
-        if textbook:
-            textbook.is_indexed = True
-            await self.db.commit()
+    if textbook_ids:
+        logger.info(f"Resumed indexing for {len(textbook_ids)} textbooks")
+    return len(textbook_ids)
@@ -139,10 +139,14 @@ class UserService:
         Returns:
             Updated User object
         """
-        await self.get_user_by_id(user_id)
         update_dict = update_data.model_dump(exclude_unset=True)
         user = await self.user_repo.update(user_id, update_dict)
-        await self.db.commit()
+        if not user:
+            raise AppException(
+                status_code=404,
+                error_code="USER_NOT_FOUND",
+                message="User not found"
+            )
         return user
 
     async def deactivate_user(self, user_id: UUID) -> None:
@@ -152,15 +156,15 @@ class UserService:
         Args:
             user_id: User UUID
         """
-        user = await self.get_user_by_id(user_id)
-        if not user.is_active:
-            raise AppException(
-                status_code=400,
-                error_code="ALREADY_INACTIVE",
-                message="User is already inactive"
-            )
-        await self.user_repo.update(user_id, {"is_active": False})
-        await self.db.commit()
+        # The current state is checked in the UPDATE's WHERE clause
+        if await self.user_repo.update(user_id, {"is_active": False}, User.is_active.is_(True)):
+            return
+        await self.get_user_by_id(user_id)  # 404 if missing
+        raise AppException(
+            status_code=400,
+            error_code="ALREADY_INACTIVE",
+            message="User is already inactive"
+        )
 
     async def activate_user(self, user_id: UUID) -> None:
         """
@@ -169,15 +173,15 @@ class UserService:
         Args:
             user_id: User UUID
         """
-        user = await self.get_user_by_id(user_id)
-        if user.is_active:
-            raise AppException(
-                status_code=400,
-                error_code="ALREADY_ACTIVE",
-                message="User is already active"
-            )
-        await self.user_repo.update(user_id, {"is_active": True})
-        await self.db.commit()
+        # The current state is checked in the UPDATE's WHERE clause
+        if await self.user_repo.update(user_id, {"is_active": True}, User.is_active.is_(False)):
+            return
+        await self.get_user_by_id(user_id)  # 404 if missing
+        raise AppException(
+            status_code=400,
+            error_code="ALREADY_ACTIVE",
+            message="User is already active"
+        )
 
     async def verify_user(self, user_id: UUID) -> None:
         """
@@ -186,15 +190,15 @@ class UserService:
         Args:
             user_id: User UUID
         """
-        user = await self.get_user_by_id(user_id)
-        if user.is_verified:
-            raise AppException(
-                status_code=400,
-                error_code="ALREADY_VERIFIED",
-                message="User is already verified"
-            )
-        await self.user_repo.update(user_id, {"is_verified": True})
-        await self.db.commit()
+        # The current state is checked in the UPDATE's WHERE clause
+        if await self.user_repo.update(user_id, {"is_verified": True}, User.is_verified.is_(False)):
+            return
+        await self.get_user_by_id(user_id)  # 404 if missing
+        raise AppException(
+            status_code=400,
+            error_code="ALREADY_VERIFIED",
+            message="User is already verified"
+        )
 
     async def list_users(
         self,
@@ -0,0 +1,42 @@
+# rate_limit.py - Async Rate Limiter
+#
+# Token bucket shared by coroutines calling a rate-limited provider.
+
+"""
+Rate Limiter
+
+- RateLimiter(rate, burst)
+- RateLimiter.acquire() -> None
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """
+    Token bucket: at most `rate` acquisitions per second on average,
+    with bursts of up to `burst`. Waiters are served in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.burst = max(1, burst if burst is not None else int(rate) or 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a call may be made."""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
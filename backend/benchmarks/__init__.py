@@ -0,0 +1,2 @@
+# Benchmarks
+# Database round-trip and latency benchmarks for the backend
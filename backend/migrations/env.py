@@ -28,7 +28,8 @@ from app.models.principal import Principal
 from app.models.school import School, SchoolClass, Subject
 from app.models.homework import Homework
 from app.models.submission import Submission
-from app.models.textbook import Textbook
+from app.models.textbook import Textbook, TextbookPage
+from app.models.notification import NotificationOutbox, DeviceToken, DeadlineReminder, ParentReport
 
 # Alembic Config object
 config = context.config
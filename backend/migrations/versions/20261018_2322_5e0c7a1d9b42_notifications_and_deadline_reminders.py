@@ -0,0 +1,178 @@
+"""notification outbox, device tokens and deadline reminders
+
+Adds the tables behind push/email delivery and deadline reminders:
+- notification_outbox (with the digest_key/digest_count columns)
+- device_tokens (with platform, last_seen and the bulk lookup index)
+- deadline_reminders, one row per (homework, student, window)
+- an index on homework.due_date for the reminder window scans
+
+The rest of the schema is created by init_db() (Base.metadata.create_all),
+which also runs at startup and may already have created these tables, or
+an earlier shape of them (device_tokens without platform/last_seen, the
+outbox without digest columns). Each step therefore checks what exists
+and only adds what is missing.
+
+Revision ID: 5e0c7a1d9b42
+Revises:
+Create Date: 2026-10-18 23:22:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5e0c7a1d9b42"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Enum types store member names, as SQLAlchemy's Enum does for the models
+notification_channel = postgresql.ENUM("PUSH", "EMAIL", name="notification_channel", create_type=False)
+outbox_status = postgresql.ENUM("PENDING", "SENT", "FAILED", name="outbox_status", create_type=False)
+device_platform = postgresql.ENUM("ANDROID", "IOS", "WEB", name="device_platform", create_type=False)
+
+
+def _timestamps() -> list:
+    return [
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    ]
+
+
+def _columns(inspector: sa.Inspector, table: str) -> set:
+    return {column["name"] for column in inspector.get_columns(table)}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    for enum in (notification_channel, outbox_status, device_platform):
+        enum.create(bind, checkfirst=True)
+
+    # notification_outbox
+    if not inspector.has_table("notification_outbox"):
+        op.create_table(
+            "notification_outbox",
+            sa.Column("id", sa.UUID(), nullable=False),
+            sa.Column("channel", notification_channel, nullable=False),
+            sa.Column("notification_type", sa.String(length=50), nullable=False),
+            sa.Column("title", sa.String(length=255), nullable=False),
+            sa.Column("body", sa.Text(), nullable=False),
+            sa.Column("data", sa.Text(), nullable=True),
+            sa.Column("recipients", sa.Text(), nullable=False),
+            sa.Column("status", outbox_status, server_default="PENDING", nullable=False),
+            sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+            sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("last_error", sa.Text(), nullable=True),
+            sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("digest_key", sa.String(length=255), nullable=True),
+            sa.Column("digest_count", sa.Integer(), server_default="1", nullable=False),
+            *_timestamps(),
+            sa.PrimaryKeyConstraint("id", name="pk_notification_outbox"),
+        )
+    else:
+        columns = _columns(inspector, "notification_outbox")
+        if "digest_key" not in columns:
+            op.add_column("notification_outbox", sa.Column("digest_key", sa.String(length=255), nullable=True))
+        if "digest_count" not in columns:
+            op.add_column(
+                "notification_outbox",
+                sa.Column("digest_count", sa.Integer(), server_default="1", nullable=False)
+            )
+    op.create_index(
+        "ix_notification_outbox_status_next_attempt_at",
+        "notification_outbox",
+        ["status", "next_attempt_at"],
+        if_not_exists=True
+    )
+    op.create_index(
+        "uq_notification_outbox_digest_key",
+        "notification_outbox",
+        ["digest_key"],
+        unique=True,
+        postgresql_where=sa.text("digest_key IS NOT NULL"),
+        if_not_exists=True
+    )
+
+    # device_tokens
+    if not inspector.has_table("device_tokens"):
+        op.create_table(
+            "device_tokens",
+            sa.Column("id", sa.UUID(), nullable=False),
+            sa.Column("user_id", sa.UUID(), nullable=False),
+            sa.Column("platform", device_platform, nullable=False),
+            sa.Column("token", sa.String(length=512), nullable=False),
+            sa.Column("last_seen", sa.DateTime(timezone=True), nullable=False),
+            *_timestamps(),
+            sa.ForeignKeyConstraint(
+                ["user_id"], ["users.id"],
+                name="fk_device_tokens_user_id_users",
+                ondelete="CASCADE"
+            ),
+            sa.PrimaryKeyConstraint("id", name="pk_device_tokens"),
+            sa.UniqueConstraint("token", name="uq_device_tokens_token"),
+        )
+    else:
+        # Tokens stored before the platform was recorded default to android;
+        # the app corrects it on its next registration
+        columns = _columns(inspector, "device_tokens")
+        if "platform" not in columns:
+            op.add_column(
+                "device_tokens",
+                sa.Column("platform", device_platform, server_default="ANDROID", nullable=False)
+            )
+            op.alter_column("device_tokens", "platform", server_default=None)
+        if "last_seen" not in columns:
+            op.add_column(
+                "device_tokens",
+                sa.Column("last_seen", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False)
+            )
+            op.alter_column("device_tokens", "last_seen", server_default=None)
+        # Superseded by the (user_id, token) index
+        op.drop_index("ix_device_tokens_user_id", table_name="device_tokens", if_exists=True)
+    op.create_index("ix_device_tokens_user_id_token", "device_tokens", ["user_id", "token"], if_not_exists=True)
+    op.create_index("ix_device_tokens_last_seen", "device_tokens", ["last_seen"], if_not_exists=True)
+
+    # deadline_reminders
+    if not inspector.has_table("deadline_reminders"):
+        op.create_table(
+            "deadline_reminders",
+            sa.Column("id", sa.UUID(), nullable=False),
+            sa.Column("homework_id", sa.UUID(), nullable=False),
+            sa.Column("student_id", sa.UUID(), nullable=False),
+            sa.Column("window_hours", sa.Integer(), nullable=False),
+            *_timestamps(),
+            sa.ForeignKeyConstraint(
+                ["homework_id"], ["homework.id"],
+                name="fk_deadline_reminders_homework_id_homework",
+                ondelete="CASCADE"
+            ),
+            sa.ForeignKeyConstraint(
+                ["student_id"], ["students.id"],
+                name="fk_deadline_reminders_student_id_students",
+                ondelete="CASCADE"
+            ),
+            sa.PrimaryKeyConstraint("id", name="pk_deadline_reminders"),
+            sa.UniqueConstraint(
+                "homework_id", "student_id", "window_hours",
+                name="uq_deadline_reminders_homework_id_student_id_window_hours"
+            ),
+        )
+    op.create_index("ix_deadline_reminders_student_id", "deadline_reminders", ["student_id"], if_not_exists=True)
+
+    # Reminder window scans
+    op.create_index("ix_homework_due_date", "homework", ["due_date"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_homework_due_date", table_name="homework", if_exists=True)
+    op.drop_table("deadline_reminders")
+    op.drop_table("device_tokens")
+    op.drop_table("notification_outbox")
+
+    bind = op.get_bind()
+    for enum in (device_platform, outbox_status, notification_channel):
+        enum.drop(bind, checkfirst=True)
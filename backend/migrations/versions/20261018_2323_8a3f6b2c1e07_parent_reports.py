@@ -0,0 +1,46 @@
+"""parent reports
+
+Adds parent_reports, one row per (student, week) a weekly parent report
+was queued for, so reruns of the report job skip students already
+reported.
+
+Revision ID: 8a3f6b2c1e07
+Revises: 5e0c7a1d9b42
+Create Date: 2026-10-18 23:23:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8a3f6b2c1e07"
+down_revision: Union[str, None] = "5e0c7a1d9b42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # init_db() may already have created the table at startup
+    if sa.inspect(op.get_bind()).has_table("parent_reports"):
+        return
+    op.create_table(
+        "parent_reports",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("student_id", sa.UUID(), nullable=False),
+        sa.Column("week_start", sa.Date(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["student_id"], ["students.id"],
+            name="fk_parent_reports_student_id_students",
+            ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id", name="pk_parent_reports"),
+        sa.UniqueConstraint("student_id", "week_start", name="uq_parent_reports_student_id_week_start"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("parent_reports")
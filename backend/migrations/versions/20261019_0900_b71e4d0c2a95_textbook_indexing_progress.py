@@ -0,0 +1,92 @@
+"""textbook indexing progress
+
+Adds indexing progress to textbooks and the per-page index checkpoints:
+- textbook_index_status enum
+- textbooks.indexing_status, indexed_page_count, indexing_error, indexed_at
+- textbook_pages, one row per indexed (textbook, page)
+
+create_all() at startup creates textbook_pages on its own but never adds
+columns to the existing textbooks table, so without this revision every
+textbook query fails on the missing columns. Textbooks already marked
+is_indexed are backfilled as indexed.
+
+Revision ID: b71e4d0c2a95
+Revises: 8a3f6b2c1e07
+Create Date: 2026-10-19 09:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b71e4d0c2a95"
+down_revision: Union[str, None] = "8a3f6b2c1e07"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Enum types store member names, as SQLAlchemy's Enum does for the models
+textbook_index_status = postgresql.ENUM(
+    "NOT_INDEXED", "QUEUED", "INDEXING", "INDEXED", "FAILED",
+    name="textbook_index_status",
+    create_type=False
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    textbook_index_status.create(bind, checkfirst=True)
+
+    columns = {column["name"] for column in inspector.get_columns("textbooks")}
+    if "indexing_status" not in columns:
+        op.add_column(
+            "textbooks",
+            sa.Column("indexing_status", textbook_index_status, server_default="NOT_INDEXED", nullable=False)
+        )
+    if "indexed_page_count" not in columns:
+        op.add_column(
+            "textbooks",
+            sa.Column("indexed_page_count", sa.Integer(), server_default="0", nullable=False)
+        )
+    if "indexing_error" not in columns:
+        op.add_column("textbooks", sa.Column("indexing_error", sa.Text(), nullable=True))
+    if "indexed_at" not in columns:
+        op.add_column("textbooks", sa.Column("indexed_at", sa.DateTime(timezone=True), nullable=True))
+
+    op.execute(
+        "UPDATE textbooks "
+        "SET indexing_status = 'INDEXED', indexed_page_count = COALESCE(page_count, 0) "
+        "WHERE is_indexed AND indexing_status = 'NOT_INDEXED'"
+    )
+
+    if not inspector.has_table("textbook_pages"):
+        op.create_table(
+            "textbook_pages",
+            sa.Column("id", sa.UUID(), nullable=False),
+            sa.Column("textbook_id", sa.UUID(), nullable=False),
+            sa.Column("page_number", sa.Integer(), nullable=False),
+            sa.Column("content_hash", sa.String(length=64), nullable=False),
+            sa.Column("indexed_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.ForeignKeyConstraint(
+                ["textbook_id"], ["textbooks.id"],
+                name="fk_textbook_pages_textbook_id_textbooks",
+                ondelete="CASCADE"
+            ),
+            sa.PrimaryKeyConstraint("id", name="pk_textbook_pages"),
+            sa.UniqueConstraint("textbook_id", "page_number", name="uq_textbook_pages_textbook_id_page_number"),
+        )
+    op.create_index("ix_textbook_pages_textbook_id", "textbook_pages", ["textbook_id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_table("textbook_pages")
+    op.drop_column("textbooks", "indexed_at")
+    op.drop_column("textbooks", "indexing_error")
+    op.drop_column("textbooks", "indexed_page_count")
+    op.drop_column("textbooks", "indexing_status")
+    textbook_index_status.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,68 @@
+# test_db_metrics.py - Database Metrics Tests
+#
+# Unit tests for per-route query statistics.
+
+"""
+Database Metrics Tests
+
+- test_route_stats_keyed_by_full_template
+- test_route_template_keeps_prefix_parameters
+"""
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import db_metrics
+from app.core.db_metrics import DBMetricsMiddleware, RouteStats, get_route_stats
+
+
+def _client(monkeypatch, *routers) -> TestClient:
+    monkeypatch.setattr(db_metrics, "_route_stats", RouteStats())
+    app = FastAPI()
+    for router, prefix in routers:
+        app.include_router(router, prefix=prefix)
+    app.add_middleware(DBMetricsMiddleware)
+    return TestClient(app)
+
+
+def test_route_stats_keyed_by_full_template(monkeypatch):
+    """Routes declared alike in two routers are counted under their full templates."""
+    homework = APIRouter(prefix="/homework")
+    students = APIRouter()
+
+    @homework.get("/{item_id}")
+    async def get_homework(item_id: str):
+        return {}
+
+    @students.get("/{item_id}")
+    async def get_student(item_id: str):
+        return {}
+
+    client = _client(monkeypatch, (homework, "/api/v1"), (students, "/api/v1/students"))
+    response = client.get("/api/v1/homework/1")
+    client.get("/api/v1/homework/2")
+    client.get("/api/v1/students/1")
+    client.get("/api/v1/missing")
+
+    assert "db;dur=" in response.headers["server-timing"]
+    assert {row["route"]: row["requests"] for row in get_route_stats()} == {
+        "GET /api/v1/homework/{item_id}": 2,
+        "GET /api/v1/students/{item_id}": 1,
+    }
+
+
+def test_route_template_keeps_prefix_parameters(monkeypatch):
+    """Path parameters of a router prefix stay templated in the key."""
+    members = APIRouter()
+
+    @members.get("/members/{member_id}")
+    async def get_member(class_id: str, member_id: str):
+        return {}
+
+    client = _client(monkeypatch, (members, "/api/v1/classes/{class_id}"))
+    client.get("/api/v1/classes/7a/members/3")
+    client.get("/api/v1/classes/8b/members/4")
+
+    assert [row["route"] for row in get_route_stats()] == [
+        "GET /api/v1/classes/{class_id}/members/{member_id}"
+    ]
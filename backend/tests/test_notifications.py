@@ -0,0 +1,197 @@
+# test_notifications.py - Notification Tests
+#
+# Unit tests for the notification outbox dispatcher and its helpers.
+
+"""
+Notification Tests
+
+- test_rate_limiter_*
+- test_digest_message
+- test_claim_*
+- test_record_*
+- test_device_token_cache_*
+"""
+
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.models.notification import NotificationChannel, OutboxStatus
+from app.services.device_token_service import DeviceTokenCache
+from app.services.notification_dispatcher import DeliveryResult, NotificationDispatcher
+from app.services.notification_service import digest_message
+from app.utils.rate_limit import RateLimiter
+
+
+class RecordingSession:
+    """Stands in for an AsyncSession; keeps the statements it was given."""
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: []))
+
+
+def _compiled(statement):
+    return statement.compile(dialect=postgresql.dialect())
+
+
+def _dispatcher(push: bool = True, email: bool = True) -> NotificationDispatcher:
+    dispatcher = NotificationDispatcher(session_factory=None)
+    dispatcher.firebase_enabled = push
+    dispatcher.sendgrid_enabled = email
+    return dispatcher
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_spaces_calls():
+    """After the burst, calls are spaced 1/rate apart."""
+    limiter = RateLimiter(rate=50, burst=2)
+    start = time.monotonic()
+    for _ in range(6):
+        await limiter.acquire()
+    assert time.monotonic() - start >= 4 / 50 * 0.9
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_disabled():
+    """A rate of 0 never waits."""
+    limiter = RateLimiter(rate=0)
+    start = time.monotonic()
+    for _ in range(1000):
+        await limiter.acquire()
+    assert time.monotonic() - start < 0.5
+
+
+def test_digest_message():
+    """Digest types render a count; other types have no digest."""
+    assert digest_message("submission_received", 37, {"homework_title": "Algebra HW 4"}) == (
+        "New Submissions", "37 new submissions for Algebra HW 4"
+    )
+    assert digest_message("grade_posted", 3, {}) is None
+
+
+@pytest.mark.asyncio
+async def test_claim_leases_due_rows_with_skip_locked():
+    """Claiming locks without blocking, counts the attempt and pushes the lease forward."""
+    db = RecordingSession()
+    await _dispatcher()._claim(db)
+
+    compiled = _compiled(db.statements[0])
+    sql = str(compiled)
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "attempts=(notification_outbox.attempts + " in sql
+    assert "RETURNING" in sql
+    assert compiled.params["digest_key"] is None
+    lease = compiled.params["next_attempt_at"] - datetime.now(timezone.utc)
+    assert timedelta(seconds=settings.notification_claim_seconds - 5) < lease
+    assert {NotificationChannel.PUSH, NotificationChannel.EMAIL} <= set(
+        value for values in compiled.params.values() if isinstance(values, list) for value in values
+    )
+
+
+@pytest.mark.asyncio
+async def test_claim_skips_unconfigured_channels():
+    """Rows of a channel without credentials stay pending and keep their attempts."""
+    db = RecordingSession()
+    await _dispatcher(push=False)._claim(db)
+    channels = [value for value in _compiled(db.statements[0]).params.values() if isinstance(value, list)]
+    assert channels == [[NotificationChannel.EMAIL]]
+
+    db = RecordingSession()
+    assert await _dispatcher(push=False, email=False)._claim(db) == []
+    assert db.statements == []
+
+
+async def _record(attempts: int, result: DeliveryResult) -> dict:
+    db = RecordingSession()
+    row = SimpleNamespace(id=uuid4(), attempts=attempts)
+    await _dispatcher()._record(db, row, result)
+    return _compiled(db.statements[0]).params
+
+
+@pytest.mark.asyncio
+async def test_record_sent():
+    """A delivery with nothing left to retry marks the row sent."""
+    params = await _record(1, DeliveryResult())
+    assert params["status"] == OutboxStatus.SENT and params["sent_at"] is not None
+
+
+@pytest.mark.asyncio
+async def test_record_backoff_retains_failed_recipients():
+    """Only failed recipients are kept, and the retry waits base * 2^(attempts - 1)."""
+    params = await _record(3, DeliveryResult(["user-2"], "unavailable"))
+
+    assert "status" not in params
+    assert json.loads(params["recipients"]) == ["user-2"]
+    assert params["last_error"] == "unavailable"
+    delay = (params["next_attempt_at"] - datetime.now(timezone.utc)).total_seconds()
+    assert delay == pytest.approx(settings.notification_retry_base_seconds * 4, abs=5)
+
+
+@pytest.mark.asyncio
+async def test_record_fails_after_max_attempts():
+    """The last allowed attempt marks the row failed instead of retrying."""
+    params = await _record(settings.notification_max_attempts, DeliveryResult(["user-2"], "unavailable"))
+    assert params["status"] == OutboxStatus.FAILED
+    assert "next_attempt_at" not in params
+
+
+def test_device_token_cache_expires_entries(monkeypatch):
+    """Entries older than the TTL are misses and are removed."""
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = DeviceTokenCache(max_size=10, ttl_seconds=60)
+    cache.put("user-1", ["token-a"])
+
+    now[0] += 59
+    assert cache.get("user-1") == ["token-a"]
+    now[0] += 2
+    assert cache.get("user-1") is None
+    assert "user-1" not in cache._entries
+
+
+def test_device_token_cache_evicts_least_recently_used():
+    """Reading an entry keeps it; the oldest unread entry goes first."""
+    cache = DeviceTokenCache(max_size=2, ttl_seconds=60)
+    cache.put("user-1", ["token-a"])
+    cache.put("user-2", ["token-b"])
+    cache.get("user-1")
+    cache.put("user-3", ["token-c"])
+
+    assert cache.get("user-2") is None
+    assert cache.get("user-1") == ["token-a"]
+    assert cache.get("user-3") == ["token-c"]
+
+
+def test_device_token_cache_skips_users_without_tokens():
+    """Empty results are not cached, so new registrations elsewhere are seen."""
+    cache = DeviceTokenCache(max_size=10, ttl_seconds=60)
+    cache.put("user-1", ["token-a"])
+    cache.put("user-1", [])
+    cache.put("user-2", [])
+
+    assert cache.get("user-1") is None
+    assert cache.get("user-2") is None
+
+
+def test_device_token_cache_drop_tokens():
+    """Dropped tokens leave every entry; entries left empty are removed."""
+    cache = DeviceTokenCache(max_size=10, ttl_seconds=60)
+    cache.put("user-1", ["token-a", "token-b"])
+    cache.put("user-2", ["token-b"])
+    cache.put("user-3", ["token-c"])
+
+    cache.drop_tokens(["token-b"])
+
+    assert cache.get("user-1") == ["token-a"]
+    assert cache.get("user-2") is None
+    assert cache.get("user-3") == ["token-c"]
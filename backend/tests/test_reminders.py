@@ -0,0 +1,116 @@
+# test_reminders.py - Deadline Reminder Tests
+#
+# Unit tests for the deadline reminder windows and their dedupe.
+
+"""
+Deadline Reminder Tests
+
+- test_reminder_bands_*
+- test_claim_window_*
+- test_send_due_reminders_*
+"""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.services import reminder_service
+from app.services.notification_service import NotificationService
+from app.services.reminder_service import _claim_window, _reminder_bands, send_due_reminders
+
+NOW = datetime(2026, 3, 2, 12, 0, tzinfo=timezone.utc)
+
+
+class RecordingSession:
+    """Stands in for an AsyncSession; keeps statements and returns canned rows."""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return SimpleNamespace(all=lambda: self.rows)
+
+    async def commit(self):
+        self.commits += 1
+
+
+def test_reminder_bands_split_windows():
+    """Each window starts where the next smaller one ends."""
+    assert _reminder_bands([24, 2]) == [(0, 2), (2, 24)]
+    assert _reminder_bands([2, 72, 24]) == [(0, 2), (2, 24), (24, 72)]
+
+
+def test_reminder_bands_ignore_duplicates_and_non_positive():
+    """Repeated and non-positive windows are dropped."""
+    assert _reminder_bands([24, 24, 0, -1]) == [(0, 24)]
+    assert _reminder_bands([]) == []
+
+
+@pytest.mark.asyncio
+async def test_claim_window_dedupes_per_window():
+    """Pairs already reminded for the window are skipped by the unique key."""
+    db = RecordingSession()
+    await _claim_window(db, NOW, 2, 24)
+
+    compiled = db.statements[0].compile(dialect=postgresql.dialect())
+    sql = " ".join(str(compiled).split())
+    assert "INSERT INTO deadline_reminders (id, homework_id, student_id, window_hours, " in sql
+    assert "ON CONFLICT (homework_id, student_id, window_hours) DO NOTHING" in sql
+    assert "RETURNING deadline_reminders.homework_id, deadline_reminders.student_id" in sql
+    assert "NOT (EXISTS" in sql
+
+    params = compiled.params
+    assert 24 in params.values()
+    assert NOW + timedelta(hours=2) in params.values()
+    assert NOW + timedelta(hours=24) in params.values()
+
+
+@pytest.mark.asyncio
+async def test_send_due_reminders_one_notification_per_homework(monkeypatch):
+    """Claimed students are grouped into one reminder per homework and window."""
+    monkeypatch.setattr(settings, "deadline_reminder_windows_hours", [24])
+    algebra, essay = uuid4(), uuid4()
+    students = [uuid4(), uuid4(), uuid4()]
+    rows = [
+        (algebra, "Algebra", NOW + timedelta(hours=5), students[0]),
+        (algebra, "Algebra", NOW + timedelta(hours=5), students[1]),
+        (essay, "Essay", NOW + timedelta(hours=20), students[2]),
+    ]
+    sent = []
+
+    async def notify(self, student_user_ids, homework_title, hours_remaining):
+        sent.append((homework_title, list(student_user_ids), hours_remaining))
+
+    monkeypatch.setattr(NotificationService, "notify_deadline_reminder", notify)
+    db = RecordingSession(rows)
+
+    assert await send_due_reminders(db, NOW) == 3
+    assert sorted(sent) == [
+        ("Algebra", students[:2], 5),
+        ("Essay", [students[2]], 20),
+    ]
+    assert db.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_send_due_reminders_nothing_new(monkeypatch):
+    """A window with every pair already reminded queues nothing."""
+    monkeypatch.setattr(settings, "deadline_reminder_windows_hours", [24, 2])
+    sent = []
+
+    async def notify(self, *args):
+        sent.append(args)
+
+    monkeypatch.setattr(NotificationService, "notify_deadline_reminder", notify)
+    db = RecordingSession()
+
+    assert await reminder_service.send_due_reminders(db, NOW) == 0
+    assert sent == []
+    assert len(db.statements) == 2
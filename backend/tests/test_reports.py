@@ -0,0 +1,188 @@
+# test_reports.py - Parent Report Tests
+#
+# Unit tests for the weekly parent report job.
+
+"""
+Parent Report Tests
+
+- test_weekly_stats_query_*
+- test_render_parent_report_*
+- test_claim_reports_*
+- test_generate_weekly_parent_reports_*
+"""
+
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services import report_service
+from app.services.notification_service import NotificationService
+from app.services.report_service import (
+    StudentWeekStats,
+    _claim_reports,
+    _weekly_stats_query,
+    generate_weekly_parent_reports,
+    render_parent_report,
+)
+
+START = datetime(2026, 3, 2, tzinfo=timezone.utc)
+END = datetime(2026, 3, 9, tzinfo=timezone.utc)
+
+
+def _sql(statement) -> tuple:
+    compiled = statement.compile(dialect=postgresql.dialect())
+    return " ".join(str(compiled).split()), compiled.params
+
+
+def _stats(**overrides) -> StudentWeekStats:
+    values = dict(
+        student_name="Ana Lima",
+        parent_name="Rui Lima",
+        parent_email="rui@example.com",
+        assigned=4,
+        submitted=3,
+        late=1,
+        graded=2,
+        average_grade=87.5
+    )
+    values.update(overrides)
+    return StudentWeekStats(**values)
+
+
+def test_weekly_stats_query_compiles_for_postgres():
+    """One statement: grouped submission stats and per-class counts joined to students."""
+    sql, params = _sql(_weekly_stats_query(START, END))
+
+    assert sql.count("SELECT") == 3
+    assert "count(*) FILTER (WHERE submissions.submitted_at > homework.due_date) AS late" in sql
+    assert "count(submissions.grade) AS graded" in sql
+    assert "GROUP BY submissions.student_id" in sql
+    assert "GROUP BY homework.class_id" in sql
+    assert "LEFT OUTER JOIN" in sql and "ORDER BY students.id" in sql
+    assert START in params.values() and END in params.values()
+
+
+def test_weekly_stats_query_selects_student_id_first():
+    """Rows start with the student ID the report is recorded under."""
+    statement = _weekly_stats_query(START, END)
+    assert len(statement.selected_columns) == 11
+    assert statement.selected_columns[0].name == "id"
+    assert statement.selected_columns[0].table.name == "students"
+
+
+def test_render_parent_report_fills_stats():
+    """Stats, completion and the missing note are rendered; names are escaped."""
+    html = render_parent_report(
+        _stats(student_name="Ana <b>Lima</b>"), date(2026, 3, 2), date(2026, 3, 8)
+    )
+
+    assert "Dear Rui Lima," in html
+    assert "Ana &lt;b&gt;Lima&lt;/b&gt;" in html
+    assert "week of Mar 02 to Mar 08, 2026" in html
+    assert "<td>3 (75%)</td>" in html
+    assert "<td>87.5%</td>" in html
+    assert "1 homework assignment was not submitted." in html
+
+
+def test_render_parent_report_without_homework():
+    """A week without homework has no completion, grade or missing note."""
+    html = render_parent_report(
+        _stats(assigned=0, submitted=0, late=0, graded=0, average_grade=None),
+        date(2026, 3, 2), date(2026, 3, 8)
+    )
+
+    assert "<td>0 (n/a)</td>" in html
+    assert "not graded yet" in html
+    assert "not submitted" not in html
+
+
+class ReportDatabase:
+    """
+    Stands in for the read and write sessions of the report job.
+    Recorded reports outlive a run, like the parent_reports table.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.reported = set()
+        self.commits = 0
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def stream(self, statement):
+        rows = self.rows
+
+        async def partitions():
+            for i in range(0, len(rows), 2):
+                yield rows[i:i + 2]
+
+        return SimpleNamespace(partitions=partitions)
+
+    async def execute(self, statement):
+        new = []
+        for name, student_id in statement.compile().params.items():
+            if name.startswith("student_id") and student_id not in self.reported:
+                self.reported.add(student_id)
+                new.append(student_id)
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: new))
+
+    async def commit(self):
+        self.commits += 1
+
+    def expunge_all(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_claim_reports_skips_reported_students():
+    """Reports are recorded per (student, week) with ON CONFLICT DO NOTHING."""
+    statements = []
+
+    class Session:
+        async def execute(self, statement):
+            statements.append(statement)
+            return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: []))
+
+    assert await _claim_reports(Session(), [], date(2026, 3, 2)) == set()
+    assert statements == []
+
+    await _claim_reports(Session(), [uuid4(), uuid4()], date(2026, 3, 2))
+    sql, params = _sql(statements[0])
+    assert "INSERT INTO parent_reports (student_id, week_start, id, " in sql
+    assert "ON CONFLICT (student_id, week_start) DO NOTHING" in sql
+    assert "RETURNING parent_reports.student_id" in sql
+    assert list(params.values()).count(date(2026, 3, 2)) == 2
+
+
+@pytest.mark.asyncio
+async def test_generate_weekly_parent_reports_is_idempotent(monkeypatch):
+    """A rerun for the same week queues nothing for students already reported."""
+    rows = [
+        (uuid4(), "Ana", "Lima", "Rui", "Lima", f"parent{i}@example.com", 3, 3, 0, 3, 90.0)
+        for i in range(3)
+    ]
+    database = ReportDatabase(rows)
+    sent = []
+
+    async def send(self, parent_email, student_name, report_html):
+        sent.append(parent_email)
+
+    monkeypatch.setattr(report_service, "async_session_factory", database)
+    monkeypatch.setattr(NotificationService, "send_parent_report_email", send)
+
+    assert await generate_weekly_parent_reports(date(2026, 3, 8)) == 3
+    assert sorted(sent) == [f"parent{i}@example.com" for i in range(3)]
+
+    database.rows = rows + [(uuid4(), "Bo", "Sá", "Eva", "Sá", "eva@example.com", 2, 1, 0, 0, None)]
+    assert await generate_weekly_parent_reports(date(2026, 3, 8)) == 1
+    assert sent[3:] == ["eva@example.com"]
@@ -0,0 +1,155 @@
+# test_repositories.py - Repository Tests
+#
+# Runs the repository UPDATE ... RETURNING statements against SQLite.
+
+"""
+Repository Tests
+
+- test_update_for_teacher_*
+- test_update_*
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.core.security import UserRole
+from app.models import Homework, Student, Submission, Teacher, User
+from app.repositories.homework_repository import HomeworkRepository
+from app.repositories.submission_repository import SubmissionRepository
+from app.repositories.user_repository import UserRepository
+
+NOW = datetime(2026, 3, 2, 12, 0, tzinfo=timezone.utc)
+TABLES = [model.__table__ for model in (User, Teacher, Student, Homework, Submission)]
+
+
+def _user(email: str, role: UserRole) -> User:
+    return User(
+        email=email, hashed_password="x", first_name="Ana", last_name="Lima", role=role
+    )
+
+
+@pytest_asyncio.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=TABLES)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def seeded(db):
+    """Two teachers; the first owns a homework with one submission."""
+    users = [
+        _user("owner@example.com", UserRole.TEACHER),
+        _user("other@example.com", UserRole.TEACHER),
+        _user("student@example.com", UserRole.STUDENT),
+    ]
+    db.add_all(users)
+    await db.flush()
+
+    owner, other = Teacher(user_id=users[0].id), Teacher(user_id=users[1].id)
+    student = Student(user_id=users[2].id, class_id=users[2].id)
+    db.add_all([owner, other, student])
+    await db.flush()
+
+    homework = Homework(title="Algebra", teacher_id=owner.id, class_id=student.class_id, due_date=NOW)
+    db.add(homework)
+    await db.flush()
+
+    submission = Submission(
+        homework_id=homework.id, student_id=student.id,
+        file_url="s3://a.pdf", file_type="pdf", submitted_at=NOW
+    )
+    db.add(submission)
+    await db.commit()
+    return dict(owner=owner, other=other, student=student, homework=homework, submission=submission)
+
+
+@pytest.mark.asyncio
+async def test_update_for_teacher_updates_row(db, seeded):
+    """The owner's update is applied and returned with the title and student user."""
+    repo = SubmissionRepository(db)
+    submission = seeded["submission"]
+
+    row = await repo.update_for_teacher(
+        submission.id, seeded["owner"].id, {"grade": 9.5, "teacher_feedback": None}
+    )
+
+    assert row is not None
+    updated, title, student_user_id = row
+    assert updated.id == submission.id and updated.grade == 9.5
+    assert title == "Algebra"
+    assert student_user_id == seeded["student"].user_id
+
+
+@pytest.mark.asyncio
+async def test_update_for_teacher_all_none_reads_row(db, seeded):
+    """Nothing to update falls back to the joined SELECT."""
+    repo = SubmissionRepository(db)
+
+    row = await repo.update_for_teacher(
+        seeded["submission"].id, seeded["owner"].id, {"grade": None}
+    )
+
+    assert row is not None
+    assert row[0].grade is None and row[1] == "Algebra"
+
+
+@pytest.mark.asyncio
+async def test_update_for_teacher_other_teacher_gets_none(db, seeded):
+    """Another teacher updates nothing; the owner lookup tells 403 from 404."""
+    repo = SubmissionRepository(db)
+    submission = seeded["submission"]
+
+    assert await repo.update_for_teacher(submission.id, seeded["other"].id, {"grade": 1.0}) is None
+    assert await repo.update_for_teacher(submission.id, seeded["other"].id, {}) is None
+    assert (await repo.get_by_id(submission.id)).grade is None
+
+    assert await repo.get_homework_owner(submission.id) == seeded["owner"].id
+    assert await repo.get_homework_owner(seeded["homework"].id) is None
+
+
+@pytest.mark.asyncio
+async def test_update_submission(db, seeded):
+    """Updated rows are returned; unmatched criteria return None."""
+    repo = SubmissionRepository(db)
+    submission = seeded["submission"]
+
+    updated = await repo.update(submission.id, {"teacher_feedback": "Good", "grade": None})
+    assert updated.teacher_feedback == "Good"
+    assert (await repo.update(submission.id, {"grade": None})).id == submission.id
+    assert await repo.update(submission.id, {"grade": 2.0}, Submission.grade.is_not(None)) is None
+
+
+@pytest.mark.asyncio
+async def test_update_homework(db, seeded):
+    """Ownership criteria limit the update to the homework's teacher."""
+    repo = HomeworkRepository(db)
+    homework = seeded["homework"]
+
+    updated = await repo.update(
+        homework.id, {"title": "Geometry"}, Homework.teacher_id == seeded["owner"].id
+    )
+    assert updated.title == "Geometry"
+    assert await repo.update(homework.id, {"title": "X"}, Homework.teacher_id == seeded["other"].id) is None
+    assert await repo.update(homework.id, {}, Homework.teacher_id == seeded["other"].id) is None
+    assert (await repo.update(homework.id, {"description": None})).title == "Geometry"
+
+
+@pytest.mark.asyncio
+async def test_update_user(db, seeded):
+    """Unknown fields and None values are skipped."""
+    repo = UserRepository(db)
+    user_id = seeded["owner"].user_id
+
+    updated = await repo.update(user_id, {"first_name": "Rui", "phone": None, "unknown": 1})
+    assert updated.first_name == "Rui"
+    assert (await repo.update(user_id, {"unknown": 1})).first_name == "Rui"
+    assert await repo.update(user_id, {"first_name": "Eva"}, User.is_active.is_(False)) is None
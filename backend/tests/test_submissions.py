@@ -9,6 +9,123 @@ Submission Tests
 - test_submit_after_deadline
 - test_grade_submission_teacher
 - test_ai_analysis_trigger
+- test_feedback_suggestion_streams_extracted_text
+- test_feedback_suggestion_uses_request_text
 """
 
+import json
+from types import SimpleNamespace
+from uuid import uuid4
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import get_db
+from app.core.security import get_current_user_id, require_teacher
+from app.main import app
+from app.repositories.homework_repository import HomeworkRepository
+from app.repositories.submission_repository import SubmissionRepository
+from app.services import submission_service
+from app.services.user_service import UserService
+
 # TODO: Implement submission tests
+
+
+@pytest.fixture
+def feedback_client(monkeypatch):
+    """
+    Client for the feedback suggestion route with a fake AI provider.
+
+    The database, the teacher lookup and the repositories are replaced
+    by in-memory stand-ins. Requests to the AI service are answered by a
+    mock transport that streams three tokens and records the payload.
+    """
+    teacher_id = uuid4()
+    homework = SimpleNamespace(id=uuid4(), teacher_id=teacher_id, title="Fractions", description="Exercise 3")
+    submission = SimpleNamespace(id=uuid4(), homework_id=homework.id, grade=80.0, ai_analysis=None)
+    ai_requests = []
+
+    async def fake_db():
+        yield None
+
+    async def get_user(self, user_id):
+        return SimpleNamespace(teacher=SimpleNamespace(id=teacher_id))
+
+    async def get_submission(self, submission_id):
+        return submission if submission_id == submission.id else None
+
+    async def get_homework(self, homework_id):
+        return homework
+
+    async def tokens():
+        for text in ("Good ", "use of ", "units."):
+            yield f"event: token\ndata: {json.dumps({'text': text})}\n\n".encode()
+        yield b"event: done\ndata: {}\n\n"
+
+    def ai_service(request: httpx.Request) -> httpx.Response:
+        ai_requests.append(json.loads(request.content))
+        return httpx.Response(200, content=tokens(), headers={"content-type": "text/event-stream"})
+
+    real_async_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        submission_service.httpx,
+        "AsyncClient",
+        lambda **kwargs: real_async_client(transport=httpx.MockTransport(ai_service), **kwargs)
+    )
+    monkeypatch.setattr(UserService, "get_user_by_id", get_user)
+    monkeypatch.setattr(SubmissionRepository, "get_by_id", get_submission)
+    monkeypatch.setattr(HomeworkRepository, "get_by_id", get_homework)
+    app.dependency_overrides[get_db] = fake_db
+    app.dependency_overrides[get_current_user_id] = lambda: str(uuid4())
+    app.dependency_overrides[require_teacher] = lambda: True
+
+    yield TestClient(app), submission, ai_requests
+
+    app.dependency_overrides.clear()
+
+
+def _sse_events(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_feedback_suggestion_streams_extracted_text(feedback_client):
+    """Text stored by AI analysis is sent to the provider and tokens stream back."""
+    client, submission, ai_requests = feedback_client
+    url = f"/api/v1/submissions/{submission.id}/feedback/suggest"
+
+    assert client.post(url).status_code == 409
+
+    submission.ai_analysis = json.dumps({"status": "completed", "extracted_text": "3/4 + 1/4 = 1 m"})
+    response = client.post(url)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _sse_events(response.text)
+    assert [data["text"] for kind, data in events if kind == "token"] == ["Good ", "use of ", "units."]
+    assert events[-1] == ("done", {})
+    assert ai_requests == [{
+        "submission_text": "3/4 + 1/4 = 1 m",
+        "homework_description": "Fractions\nExercise 3",
+        "grade": 80.0
+    }]
+
+
+def test_feedback_suggestion_uses_request_text(feedback_client):
+    """Text passed in the request is used without a prior AI analysis."""
+    client, submission, ai_requests = feedback_client
+
+    response = client.post(
+        f"/api/v1/submissions/{submission.id}/feedback/suggest",
+        params={"grade": 65},
+        json={"submission_text": "typed answer"}
+    )
+
+    assert response.status_code == 200
+    assert _sse_events(response.text)[-1] == ("done", {})
+    assert ai_requests[0]["submission_text"] == "typed answer"
+    assert ai_requests[0]["grade"] == 65